@@ -0,0 +1,192 @@
+import numpy as np
+import pandas as pd
+
+
+def _codes(values):
+    """Koduje kolumnę liczbami całkowitymi w porządku posortowanym (-1 dla braków)."""
+    codes, uniques = pd.factorize(values, sort=True)
+    # Jak groupby: klucze z kolumny typu object dostają wywnioskowany typ (np. str)
+    if isinstance(uniques, pd.Index):
+        uniques = uniques.infer_objects()
+    return codes, uniques
+
+
+def _day_codes(data):
+    """
+    Koduje doby jako kolejne liczby całkowite od pierwszej doby w danych (-1 dla NaT).
+
+    Zwraca też indeks wszystkich dób z tego zakresu (w jednostce czasu kolumny 'data').
+    """
+    day_numbers = data.to_numpy().astype('datetime64[D]')
+    valid = ~np.isnat(day_numbers)
+    day_numbers = day_numbers.view(np.int64)
+    if not valid.any():
+        return np.full(len(data), -1, dtype=np.int64), pd.DatetimeIndex([]).as_unit(data.dt.unit)
+
+    first = day_numbers[valid].min()
+    last = day_numbers[valid].max()
+    codes = np.where(valid, day_numbers - first, -1)
+    days = pd.DatetimeIndex(np.arange(first, last + 1).astype('datetime64[D]')).as_unit(data.dt.unit)
+    return codes, days
+
+
+def _bincount(keys, weights, size):
+    return np.bincount(keys, weights=weights, minlength=size)
+
+
+def _kahan_sums(keys, values, size):
+    """
+    Sumy i liczby wartości dla każdej grupy z kompensacją Kahana, w kolejności wierszy.
+
+    groupby().mean() w pandas sumuje wartości grupy po kolei z kompensacją Kahana,
+    więc zwykła suma (np.bincount) różni się czasem o ostatni bit, a to zmienia
+    wynik zaokrąglenia do 2 miejsc. Tutaj ta sama rekurencja wykonywana jest
+    wektorowo: w k-tym kroku dla wszystkich grup naraz dodawany jest k-ty element
+    grupy, więc liczba kroków równa się długości najdłuższej grupy (np. 24 dla dób).
+    """
+    counts = np.bincount(keys, minlength=size)
+    sums = np.zeros(size)
+    if len(keys) == 0:
+        return sums, counts
+
+    # Stabilne sortowanie zachowuje kolejność wierszy w obrębie grupy
+    if np.all(keys[1:] >= keys[:-1]):
+        sorted_values = values
+    else:
+        sorted_values = values[np.argsort(keys, kind='stable')]
+
+    # Grupy uporządkowane od najdłuższej, więc w k-tym kroku aktywne są pierwsze grupy
+    groups = np.flatnonzero(counts)
+    groups = groups[np.argsort(-counts[groups], kind='stable')]
+    lengths = counts[groups]
+    group_starts = (np.cumsum(counts) - counts)[groups]
+
+    group_sums = np.zeros(len(groups))
+    compensation = np.zeros(len(groups))
+    active_counts = np.searchsorted(-lengths, -np.arange(lengths[0]), side='left')
+    for k, m in enumerate(active_counts):
+        s = group_sums[:m]
+        y = sorted_values[group_starts[:m] + k] - compensation[:m]
+        t = s + y
+        c = t - s - y
+        compensation[:m] = np.where(np.isnan(c), 0, c)
+        group_sums[:m] = t
+
+    sums[groups] = group_sums
+    return sums, counts
+
+
+def aggregate_stats(df, norm_threshold=15, daily=True, monthly=True, value_column='pm25'):
+    """
+    Oblicza średnie dobowe, przekroczenia normy i średnie miesięczne w jednym przebiegu.
+
+    Stacje (pary miejscowość, kod stacji) i doby są kodowane liczbami całkowitymi
+    tylko raz; klucze miesięcy wynikają z kodów dób. Sumy i liczby pomiarów liczone
+    są wektorowo na tablicach liczb (bez groupby po kolumnach tekstowych), a progi
+    przekroczeń sprawdzane na gotowych średnich dobowych. DataFrame wejściowy nie jest
+    modyfikowany.
+
+    Parametry:
+    df - dane godzinowe w formacie długim
+    norm_threshold - próg normy dobowej
+    daily, monthly - które statystyki obliczyć (pominięta jest zwracana jako None)
+    value_column - kolumna z wartościami wskaźnika (np. 'pm10'); od niej pochodzą nazwy
+                   kolumn wynikowych ('pm10_srednia_dobowa', 'pm10_srednia_miesieczna')
+
+    Zwraca krotkę (daily, monthly) w formatach calculate_daily_stats i calculate_monthly_stats.
+    """
+    city_codes, cities = _codes(df['Miejscowość'])
+    station_codes, stations = _codes(df['kod_stacji'])
+    day_codes, days = _day_codes(df['data'])
+    values = df[value_column].to_numpy(dtype='float64', na_value=np.nan)
+
+    # Wiersze bez miejscowości, kodu stacji lub daty są pomijane, tak jak w groupby
+    valid_keys = (city_codes >= 0) & (station_codes >= 0) & (day_codes >= 0)
+    if not valid_keys.all():
+        city_codes, station_codes = city_codes[valid_keys], station_codes[valid_keys]
+        day_codes, values = day_codes[valid_keys], values[valid_keys]
+
+    # Pary (miejscowość, stacja) numerowane gęsto w porządku posortowanym, bez haszowania
+    combined = city_codes.astype(np.int64) * len(stations) + station_codes
+    pairs = np.flatnonzero(np.bincount(combined, minlength=len(cities) * len(stations)))
+    pair_lookup = np.full(len(cities) * len(stations), -1, dtype=np.int64)
+    pair_lookup[pairs] = np.arange(len(pairs))
+    pair_codes = pair_lookup.take(combined)
+    pair_city = pairs // len(stations)
+    pair_station = pairs % len(stations)
+
+    has_value = ~np.isnan(values)
+    measured = values[has_value]
+
+    def reduce(keys, size):
+        """Średnie dla grup obecnych w danych: (indeksy grup, średnie)."""
+        sums, counts = _kahan_sums(keys[has_value], measured, size)
+        present = np.flatnonzero(_bincount(keys, None, size))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return present, sums[present] / counts[present]
+
+    daily_stats = None
+    if daily:
+        n_days = len(days)
+        present, means = reduce(pair_codes * n_days + day_codes, len(pairs) * n_days)
+        daily_pair = present // n_days
+        daily_stats = pd.DataFrame({
+            'Miejscowość': cities.take(pair_city.take(daily_pair)),
+            'kod_stacji': stations.take(pair_station.take(daily_pair)),
+            'data_dzien': days.take(present % n_days),
+            f'{value_column}_srednia_dobowa': np.round(means, 2),
+        })
+        daily_stats['przekroczenie_normy'] = daily_stats[f'{value_column}_srednia_dobowa'] >= norm_threshold
+
+    monthly_stats = None
+    if monthly:
+        # Klucz miesiąca wynika wprost z zakodowanej doby
+        month_codes, months = _codes(days.year.to_numpy() * 12 + days.month.to_numpy() - 1)
+        n_months = len(months)
+        present, means = reduce(pair_codes * n_months + month_codes.take(day_codes), len(pairs) * n_months)
+        monthly_pair = present // n_months
+        monthly_month = months.take(present % n_months)
+        monthly_stats = pd.DataFrame({
+            'Miejscowość': cities.take(pair_city.take(monthly_pair)),
+            'kod_stacji': stations.take(pair_station.take(monthly_pair)),
+            'rok': pd.array(monthly_month // 12, dtype='Int64'),
+            'miesiac': (monthly_month % 12 + 1).astype('int32'),
+            f'{value_column}_srednia_miesieczna': np.round(means, 2),
+        })
+
+    return daily_stats, monthly_stats
+
+
+def exceedance_counts(group_codes, values, thresholds, n_groups):
+    """
+    Liczba wartości >= próg w każdej grupie, dla wielu progów naraz.
+
+    Progi są sortowane raz, a każda wartość trafia przez searchsorted do przedziału
+    między progami (liczba progów, które przekracza). Histogram przedziałów w grupach
+    zsumowany od końca daje liczby przekroczeń dla wszystkich progów, więc koszt to
+    O(n log k + grupy * k) zamiast osobnego przebiegu dla każdego progu.
+
+    Parametry:
+    group_codes - kody grup (0 .. n_groups - 1) dla każdej wartości
+    values - wartości (NaN nigdy nie przekracza progu)
+    thresholds - progi (dowolna kolejność)
+    n_groups - liczba grup
+
+    Zwraca tablicę int64 o wymiarach (n_groups, len(thresholds)) w kolejności podanych progów.
+    """
+    thresholds = np.asarray(thresholds, dtype='float64')
+    order = np.argsort(thresholds, kind='stable')
+    sorted_thresholds = thresholds[order]
+    k = len(thresholds)
+
+    # Liczba progów <= wartość; NaN (sortowany na końcu) nie przekracza żadnego
+    bins = np.searchsorted(sorted_thresholds, values, side='right')
+    bins[np.isnan(values)] = 0
+
+    histogram = np.bincount(group_codes * (k + 1) + bins, minlength=n_groups * (k + 1)).reshape(n_groups, k + 1)
+    # Wartość przekracza j-ty próg (w kolejności rosnącej), jeśli trafiła do przedziału > j
+    at_least = np.cumsum(histogram[:, ::-1], axis=1)[:, ::-1][:, 1:]
+
+    counts = np.empty((n_groups, k), dtype=np.int64)
+    counts[:, order] = at_least
+    return counts
@@ -0,0 +1,142 @@
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import matplotlib
+
+import visualizations
+from rollup import as_rollup
+from visualizations import HEATMAPS_PER_PAGE, heatmap_pages
+
+
+BACKEND = 'Agg'
+DEFAULT_FORMATS = ('png', 'svg')
+
+# Indeks przekazywany raz do każdego procesu roboczego (zamiast z każdym zadaniem)
+_worker_index = None
+
+
+def _slug(text):
+    """Nazwa pliku z nazwy wykresu (bez spacji i znaków niedozwolonych w ścieżkach)."""
+    return re.sub(r'[^\w.-]+', '_', str(text)).strip('_')
+
+
+def plan_charts(index, cities=None, years=None):
+    """
+    Lista wykresów do wygenerowania: (nazwa pliku, nazwa funkcji z visualizations, argumenty).
+
+    Obejmuje wykres trendów, heatmapy (po HEATMAPS_PER_PAGE miejscowości na stronie),
+    wykres dni z przekroczeniem normy dla każdego roku, wykres województw (jeśli indeks
+    je zawiera) oraz wykres trendów każdej miejscowości ze wszystkich lat.
+
+    Parametry:
+    index - RollupIndex
+    cities - miejscowości dla wykresów trendów (domyślnie wszystkie)
+    years - lata dla wykresów trendów i dni z przekroczeniem (domyślnie wszystkie)
+    """
+    if cities is None:
+        cities = index.members('city')['Miejscowość'].tolist()
+    if years is None:
+        years = index.years
+
+    charts = [('trendy', 'plot_monthly_trends', {})]
+    n_pages = heatmap_pages(index, HEATMAPS_PER_PAGE)
+    if n_pages == 1:
+        charts.append(('heatmapy', 'heatmaps', {}))
+    else:
+        for page in range(n_pages):
+            charts.append((f'heatmapy_{page + 1}', 'heatmaps', {'page': page, 'per_page': HEATMAPS_PER_PAGE}))
+    for year in years:
+        charts.append((f'dni_powyzej_normy_{year}', 'days_over_norm', {'year': year, 'verbose': False}))
+    if index.has_voivodeships:
+        charts.append(('dni_powyzej_normy_wojewodztwa', 'days_over_norm_by_voivodeship', {}))
+    for city in cities:
+        charts.append((f'trendy_{_slug(city)}', 'plot_monthly_trends', {'cities': (city,), 'years': tuple(years)}))
+    return charts
+
+
+def _init_worker(index):
+    global _worker_index
+    matplotlib.use(BACKEND, force=True)
+    _worker_index = index
+
+
+def _render_chart(name, function_name, kwargs, output_dir, formats, index=None):
+    """
+    Rysuje jeden wykres, zapisuje go we wszystkich formatach i zamyka figurę.
+
+    Zwraca krotkę (nazwa, lista ścieżek, komunikat błędu lub None).
+    """
+    import matplotlib.pyplot as plt
+
+    index = _worker_index if index is None else index
+    fig = None
+    try:
+        fig = getattr(visualizations, function_name)(index, show=False, **kwargs)
+        paths = []
+        for fmt in formats:
+            path = Path(output_dir) / f'{name}.{fmt}'
+            fig.savefig(path, format=fmt)
+            paths.append(str(path))
+        return name, paths, None
+    except Exception as e:
+        return name, [], f"{type(e).__name__}: {e}"
+    finally:
+        # Zamykamy też figury, które funkcja utworzyła przed błędem
+        if fig is not None:
+            plt.close(fig)
+        plt.close('all')
+
+
+def render_all(index, output_dir, formats=DEFAULT_FORMATS, max_workers=None, df_metadata=None,
+               cities=None, years=None, charts=None):
+    """
+    Zapisuje wszystkie wykresy do plików bez wyświetlania (nieinteraktywny backend Agg).
+
+    Niezależne wykresy są rysowane równolegle w puli procesów, a każda figura jest
+    zamykana zaraz po zapisie, więc pamięć nie rośnie z liczbą wykresów.
+
+    Parametry:
+    index - RollupIndex (albo dane godzinowe lub EnrichedView)
+    output_dir - katalog docelowy (tworzony, jeśli nie istnieje)
+    formats - formaty plików (np. ('png', 'svg'))
+    max_workers - liczba procesów (domyślnie liczba rdzeni; 1 - rysowanie w bieżącym procesie)
+    df_metadata - opcjonalne metadane do wykresu województw
+    cities, years - zakres wariantów wykresów (patrz plan_charts)
+    charts - gotowa lista wykresów w formacie plan_charts (zastępuje cities i years)
+
+    Zwraca krotkę (paths, errors): słownik nazwa wykresu -> lista zapisanych plików
+    oraz słownik nazwa wykresu -> komunikat błędu.
+    """
+    index = as_rollup(index, df_metadata)
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    formats = tuple(formats)
+    if charts is None:
+        charts = plan_charts(index, cities, years)
+    if max_workers is None:
+        max_workers = min(len(charts), os.cpu_count() or 1) or 1
+
+    if max_workers == 1:
+        import matplotlib.pyplot as plt
+
+        previous_backend = matplotlib.get_backend()
+        plt.switch_backend(BACKEND)
+        try:
+            results = [_render_chart(*chart, output_dir, formats, index) for chart in charts]
+        finally:
+            plt.switch_backend(previous_backend)
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker, initargs=(index,)) as executor:
+            futures = [executor.submit(_render_chart, *chart, output_dir, formats) for chart in charts]
+            results = [future.result() for future in futures]
+
+    paths = {}
+    errors = {}
+    for name, chart_paths, error in results:
+        if error is not None:
+            errors[name] = error
+        else:
+            paths[name] = chart_paths
+    return paths, errors
@@ -0,0 +1,308 @@
+import argparse
+import contextlib
+import io
+import json
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from data_analysis import calculate_daily_stats, calculate_monthly_stats, merge_stats, load_data
+from instrumentation import instrumentation
+from read_and_clean_data import filter_rows_by_content, find_data_start_row, clean_data, save_cleaned_data
+from rollup import RollupIndex
+from synthetic_gios import generate_metadata, generate_sheet, sheet_to_xlsx
+
+
+# Kolejność etapów w raporcie
+STAGES = [
+    'read',
+    'filter_rows_by_content',
+    'find_data_start_row',
+    'clean_data',
+    'melt',
+    'remap',
+    'calculate_daily_stats',
+    'calculate_monthly_stats',
+    'merge_stats',
+    'save_csv',
+    'load_csv',
+    'figure_prep',
+]
+
+# Etapy wewnątrz clean_data mierzone przez instrumentation.stage: nazwa pomiaru -> etap raportu
+# (zamiana starych kodów stacji i przypisanie miejscowości to jeden etap 'remap')
+CLEAN_DATA_STAGES = {'melt': 'melt', 'remap': 'remap', 'city_lookup': 'remap'}
+
+
+def _measure(function, repeat=1, memory=True):
+    """
+    Mierzy czas (najlepszy z repeat przebiegów) i szczytowe zużycie pamięci funkcji.
+
+    Pamięć mierzona jest w osobnym przebiegu pod tracemalloc, żeby śledzenie alokacji
+    nie zawyżało czasu. Komunikaty wypisywane przez funkcje pipeline'u są wyciszane.
+
+    Zwraca krotkę (wynik ostatniego wywołania, sekundy, szczytowa pamięć w bajtach lub None).
+    """
+    best = float('inf')
+    result = None
+    for _ in range(max(1, repeat)):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            result = function()
+            best = min(best, time.perf_counter() - start)
+
+    peak = None
+    if memory:
+        tracemalloc.start()
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                function()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return result, best, peak
+
+
+def _measure_clean_data_stages(sheets, metadata, repeat=1):
+    """
+    Mierzy etapy wewnątrz clean_data (CLEAN_DATA_STAGES) z pomiarów instrumentation.stage.
+
+    clean_data uruchamiane jest repeat razy z włączonymi pomiarami; dla każdego etapu
+    raportowany jest najlepszy łączny czas ze wszystkich lat. Pamięci nie mierzymy
+    (tracemalloc obejmuje całe clean_data), więc peak_bytes to None.
+
+    Zwraca słownik etap -> {'seconds', 'peak_bytes', 'rows'}.
+    """
+    was_enabled = instrumentation.enabled
+    instrumentation.enable()
+    first = len(instrumentation.records)
+    stages = {}
+    try:
+        for _ in range(max(1, repeat)):
+            with contextlib.redirect_stdout(io.StringIO()):
+                for year, sheet in sheets.items():
+                    clean_data(sheet, year, metadata)
+            records = instrumentation.records[first:]
+            del instrumentation.records[first:]
+
+            seconds, rows = {}, {}
+            for record in records:
+                name = CLEAN_DATA_STAGES.get(record['stage'])
+                if name is None:
+                    continue
+                seconds[name] = seconds.get(name, 0.0) + record['seconds']
+                # Wiersze wejściowe etapu w danym roku (bez podwójnego liczenia remap i city_lookup)
+                year_rows = rows.setdefault(name, {})
+                year_rows[record['year']] = max(year_rows.get(record['year'], 0), record['rows_in'] or 0)
+
+            for name, value in seconds.items():
+                if name not in stages or value < stages[name]['seconds']:
+                    stages[name] = {'seconds': round(value, 6), 'peak_bytes': None, 'rows': int(sum(rows[name].values()))}
+    finally:
+        if not was_enabled:
+            instrumentation.disable()
+    return stages
+
+
+def run_benchmarks(n_stations=20, years=(2014, 2019), missing_rate=0.05, repeat=1, memory=True,
+                   include_read=True, seed=0, workdir=None):
+    """
+    Uruchamia wszystkie etapy pipeline'u na syntetycznych danych GIOŚ i mierzy każdy z nich.
+
+    Dane są generowane lokalnie (synthetic_gios), więc benchmark nie wymaga sieci.
+    Etapy melt i remap (zamiana kodów stacji i przypisanie miejscowości) to części
+    clean_data, mierzone osobno z pomiarów instrumentation.stage.
+
+    Parametry:
+    n_stations - liczba stacji
+    years - lata danych (2014 sprawdza układ arkusza z dodatkowym wierszem 'PM2.5')
+    missing_rate - część brakujących pomiarów
+    repeat - liczba przebiegów czasowych każdego etapu (raportowany jest najlepszy)
+    memory - czy mierzyć szczytowe zużycie pamięci (tracemalloc)
+    include_read - czy mierzyć wczytywanie plików XLSX (zapis XLSX przy generowaniu jest wolny)
+    seed - ziarno generatora danych
+    workdir - katalog na pliki tymczasowe (domyślnie katalog tymczasowy systemu)
+
+    Zwraca raport jako słownik (gotowy do zapisu w JSON).
+    """
+    years = [int(year) for year in years]
+    metadata = generate_metadata(n_stations, seed=seed)
+    sheets = {year: generate_sheet(year, metadata, missing_rate, seed) for year in years}
+    sheet_rows = sum(len(sheet) for sheet in sheets.values())
+    stages = {}
+
+    def record(name, function, rows):
+        """Mierzy etap; rows to liczba wierszy wejściowych przetwarzanych przez etap."""
+        result, seconds, peak = _measure(function, repeat, memory)
+        stages[name] = {'seconds': round(seconds, 6), 'peak_bytes': peak, 'rows': int(rows)}
+        return result
+
+    with tempfile.TemporaryDirectory(dir=workdir) as tmp:
+        tmp = Path(tmp)
+
+        if include_read:
+            files = {year: sheet_to_xlsx(sheet) for year, sheet in sheets.items()}
+            sheets = record('read', lambda: {
+                year: pd.read_excel(io.BytesIO(content), header=None) for year, content in files.items()
+            }, sheet_rows)
+
+        record('filter_rows_by_content', lambda: {
+            year: filter_rows_by_content(sheet, year) for year, sheet in sheets.items()
+        }, sheet_rows)
+        record('find_data_start_row', lambda: [find_data_start_row(sheet) for sheet in sheets.values()], sheet_rows)
+        cleaned = record('clean_data', lambda: {
+            year: clean_data(sheet, year, metadata) for year, sheet in sheets.items()
+        }, sheet_rows)
+        stages.update(_measure_clean_data_stages(sheets, metadata, repeat))
+        df_all = pd.concat([cleaned[year] for year in years], ignore_index=True)
+
+        n_hourly = len(df_all)
+        daily = record('calculate_daily_stats', lambda: calculate_daily_stats(df_all), n_hourly)
+        monthly = record('calculate_monthly_stats', lambda: calculate_monthly_stats(df_all), n_hourly)
+        record('merge_stats', lambda: merge_stats(df_all.copy(), daily, monthly), n_hourly)
+
+        csv_path = tmp / 'pm25_cleaned.csv'
+        record('save_csv', lambda: save_cleaned_data(df_all, csv_path), n_hourly)
+        stages['save_csv']['file_bytes'] = csv_path.stat().st_size
+        record('load_csv', lambda: load_data(csv_path), n_hourly)
+
+        def figure_prep():
+            index = RollupIndex.from_hourly(df_all, metadata)
+            return [
+                index.monthly_series('city'),
+                index.monthly_matrix('city')[2],
+                index.exceedance_days('station'),
+                index.exceedance_days('voivodeship'),
+            ]
+
+        record('figure_prep', figure_prep, n_hourly)
+
+    return {
+        'config': {
+            'n_stations': n_stations,
+            'years': years,
+            'missing_rate': missing_rate,
+            'repeat': repeat,
+            'memory': memory,
+            'include_read': include_read,
+            'seed': seed,
+            'hourly_rows': n_hourly,
+        },
+        'environment': {
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+        },
+        'stages': {name: stages[name] for name in STAGES if name in stages},
+        'total_seconds': round(sum(stage['seconds'] for stage in stages.values()), 6),
+    }
+
+
+def check_thresholds(report, thresholds):
+    """
+    Sprawdza raport względem bezwzględnych progów.
+
+    thresholds - słownik etap -> {'max_seconds': ..., 'max_peak_bytes': ...}
+                 (pominięty klucz oznacza brak limitu)
+
+    Zwraca listę komunikatów o przekroczeniach (pusta, jeśli wszystko mieści się w progach).
+    """
+    violations = []
+    for name, limits in thresholds.items():
+        stage = report['stages'].get(name)
+        if stage is None:
+            continue
+        for metric, limit_key in [('seconds', 'max_seconds'), ('peak_bytes', 'max_peak_bytes')]:
+            value = stage.get(metric)
+            limit = limits.get(limit_key)
+            if limit is not None and value is not None and value > limit:
+                violations.append(f"{name}: {metric} = {value} > {limit}")
+    return violations
+
+
+def compare_reports(report, baseline, tolerance=1.5):
+    """
+    Porównuje raport z raportem bazowym (np. z poprzedniej wersji kodu).
+
+    Etap jest regresją, jeśli jego czas lub pamięć przekracza wartość bazową
+    pomnożoną przez tolerance.
+
+    Zwraca listę komunikatów o regresjach.
+    """
+    if baseline.get('config', {}).get('hourly_rows') != report['config']['hourly_rows']:
+        print("Ostrzeżenie: raport bazowy dotyczy innej liczby wierszy, porównanie może być mylące")
+
+    regressions = []
+    for name, stage in report['stages'].items():
+        base = baseline['stages'].get(name)
+        if base is None:
+            continue
+        for metric in ['seconds', 'peak_bytes']:
+            value, base_value = stage.get(metric), base.get(metric)
+            if value is None or not base_value:
+                continue
+            if value > base_value * tolerance:
+                regressions.append(f"{name}: {metric} = {value} (bazowo {base_value}, x{value / base_value:.2f})")
+    return regressions
+
+
+def save_report(report, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    return str(path)
+
+
+def print_summary(report):
+    """Wypisuje czytelne podsumowanie raportu."""
+    config = report['config']
+    print(f"Benchmark: {config['n_stations']} stacji, lata {config['years']}, {config['hourly_rows']} wierszy godzinowych")
+    for name, stage in report['stages'].items():
+        peak = stage['peak_bytes']
+        peak_text = f"{peak / 2**20:9.1f} MiB" if peak is not None else "        -"
+        print(f"  {name:<25} {stage['seconds']:9.3f} s {peak_text}")
+    print(f"  {'razem':<25} {report['total_seconds']:9.3f} s")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark pipeline'u PM2.5 na syntetycznych danych GIOŚ")
+    parser.add_argument('--stations', type=int, default=20, help="liczba stacji")
+    parser.add_argument('--years', type=int, nargs='+', default=[2014, 2019], help="lata danych")
+    parser.add_argument('--missing-rate', type=float, default=0.05, help="część brakujących pomiarów")
+    parser.add_argument('--repeat', type=int, default=1, help="liczba przebiegów czasowych etapu")
+    parser.add_argument('--no-memory', action='store_true', help="bez pomiaru pamięci")
+    parser.add_argument('--no-read', action='store_true', help="bez zapisu i wczytywania plików XLSX")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='benchmark_report.json', help="plik raportu JSON")
+    parser.add_argument('--thresholds', help="plik JSON z progami bezwzględnymi dla etapów")
+    parser.add_argument('--baseline', help="raport bazowy do wykrywania regresji")
+    parser.add_argument('--tolerance', type=float, default=1.5, help="dopuszczalny wzrost względem raportu bazowego")
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(args.stations, args.years, args.missing_rate, args.repeat,
+                            memory=not args.no_memory, include_read=not args.no_read, seed=args.seed)
+    problems = []
+    if args.thresholds:
+        with open(args.thresholds, encoding='utf-8') as f:
+            problems += check_thresholds(report, json.load(f))
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            problems += compare_reports(report, json.load(f), args.tolerance)
+    report['regressions'] = problems
+
+    save_report(report, args.output)
+    print_summary(report)
+    print(f"Raport zapisany do: {args.output}")
+    for problem in problems:
+        print(f"Regresja: {problem}")
+    return 1 if problems else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,188 @@
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+
+from data_analysis import merge_stats
+from aggregation import aggregate_stats
+from pollutants import DEFAULT_POLLUTANT, value_column
+from quantiles import DEFAULT_RELATIVE_ACCURACY, QuantileSketches
+from snapshot import is_snapshot_path, open_snapshot
+from storage import is_dataset_path, open_dataset, table_to_frame, _build_filter, _dataset_columns
+from timestamps import decode_timestamps
+
+
+# Kolumny kluczy potrzebne do statystyk (oprócz kolumny wartości wskaźnika)
+KEY_COLUMNS = ['Miejscowość', 'kod_stacji', 'data']
+
+DEFAULT_CHUNK_ROWS = 500_000
+
+KEY_DTYPES = {'Miejscowość': 'str', 'kod_stacji': 'str', 'data': 'datetime64[us]'}
+
+
+def _empty_frame(column):
+    """Pusty DataFrame z kolumnami kluczy i kolumną wartości column."""
+    dtypes = {**KEY_DTYPES, column: 'float64'}
+    return pd.DataFrame({name: pd.Series(dtype=dtype) for name, dtype in dtypes.items()})
+
+
+def iter_chunks(filepath, chunk_rows=DEFAULT_CHUNK_ROWS, columns=None, years=None, cities=None, stations=None):
+    """
+    Czyta zapisane dane godzinowe fragmentami po około chunk_rows wierszy.
+
+    Obsługuje formaty z save_cleaned_data: plik CSV (pd.read_csv z chunksize), zbiór
+    Parquet (wsady pyarrow; filtry po roku i stacji odcinają całe partycje) i migawkę
+    (fragmenty to widoki na pliki mapowane z dysku).
+
+    Parametry:
+    filepath - plik CSV, katalog zbioru Parquet albo migawki
+    chunk_rows - liczba wierszy fragmentu (dla zbioru Parquet fragment kończy się na granicy pliku partycji)
+    columns - kolumny do wczytania (domyślnie wszystkie)
+    years, cities, stations - opcjonalne filtry jak w load_data
+    """
+    if is_snapshot_path(filepath):
+        df = open_snapshot(filepath, columns=columns, years=years, cities=cities, stations=stations)
+        for start in range(0, len(df), chunk_rows):
+            yield df.iloc[start:start + chunk_rows].reset_index(drop=True)
+        return
+
+    if is_dataset_path(filepath):
+        dataset = open_dataset(filepath)
+        batches = dataset.to_batches(
+            columns=_dataset_columns(dataset, columns),
+            filter=_build_filter(years=years, cities=cities, stations=stations),
+            batch_size=chunk_rows,
+        )
+        # Pliki partycji (rok, stacja) są małe, więc wsady łączymy do rozmiaru fragmentu
+        pending, n_pending = [], 0
+        for batch in batches:
+            pending.append(batch)
+            n_pending += batch.num_rows
+            if n_pending >= chunk_rows:
+                yield table_to_frame(pa.Table.from_batches(pending))
+                pending, n_pending = [], 0
+        if n_pending:
+            yield table_to_frame(pa.Table.from_batches(pending))
+        return
+
+    usecols = None
+    if columns is not None:
+        usecols = set(columns) | {'data'}
+        if cities is not None:
+            usecols.add('Miejscowość')
+        if stations is not None:
+            usecols.add('kod_stacji')
+
+    for chunk in pd.read_csv(filepath, usecols=usecols, chunksize=chunk_rows):
+        chunk['data'] = decode_timestamps(chunk['data'])
+        mask = pd.Series(True, index=chunk.index)
+        if years is not None:
+            mask &= chunk['data'].dt.year.isin(list(years))
+        if cities is not None:
+            mask &= chunk['Miejscowość'].isin(list(cities))
+        if stations is not None:
+            mask &= chunk['kod_stacji'].isin(list(stations))
+        if not mask.all():
+            chunk = chunk[mask]
+        if columns is not None:
+            chunk = chunk[list(columns)]
+        if len(chunk):
+            yield chunk.reset_index(drop=True)
+
+
+def _month_keys(chunk):
+    """Klucze (miejscowość, stacja, miesiąc) wierszy jako jedna kolumna tekstowa."""
+    month = chunk['data'].dt.year * 12 + chunk['data'].dt.month
+    return chunk['Miejscowość'].astype(str) + '|' + chunk['kod_stacji'].astype(str) + '|' + month.astype(str)
+
+
+def chunked_stats(filepath, norm_threshold=15, chunk_rows=DEFAULT_CHUNK_ROWS, sketches=False,
+                  relative_accuracy=DEFAULT_RELATIVE_ACCURACY, pollutant=DEFAULT_POLLUTANT, **filters):
+    """
+    Odpowiednik calculate_daily_stats i calculate_monthly_stats dla danych większych niż pamięć.
+
+    Dane są czytane fragmentami po chunk_rows wierszy. Wiersze ostatniej grupy
+    (miejscowość, stacja, miesiąc) fragmentu, która może mieć ciąg dalszy w następnym,
+    są przenoszone do kolejnego fragmentu, więc każda doba i każdy miesiąc stacji
+    są liczone przez aggregate_stats w całości i w kolejności wierszy - wynik jest
+    identyczny z obliczeniami na całych danych (także zaokrąglenia średnich), a zużycie
+    pamięci zależy od chunk_rows, nie od rozmiaru zbioru. Wymaga danych uporządkowanych
+    po stacji i czasie, tak jak zapisuje je save_cleaned_data.
+
+    Parametry:
+    filepath - plik CSV, zbiór Parquet albo migawka zapisane przez save_cleaned_data
+    norm_threshold - próg normy dobowej
+    chunk_rows - liczba wierszy godzinowych wczytywanych naraz
+    sketches - jeśli True, w tym samym przebiegu buduje też szkice percentyli
+               (QuantileSketches) stacji i miesięcy, scalane między fragmentami
+    relative_accuracy - względny błąd szkiców percentyli
+    pollutant - wskaźnik (np. 'PM10' dla pm10_cleaned.csv; patrz pollutants.py)
+    filters - opcjonalne filtry years, cities, stations (jak w load_data)
+
+    Zwraca krotkę (daily, monthly) w formatach calculate_daily_stats i calculate_monthly_stats,
+    a przy sketches=True krotkę (daily, monthly, szkice).
+    """
+    column = value_column(pollutant)
+    daily_parts, monthly_parts, sketch_parts = [], [], []
+    finished = set()
+    carry = None
+
+    def aggregate(rows, keys):
+        duplicated = finished.intersection(keys.dropna().unique())
+        if duplicated:
+            raise ValueError(
+                f"Dane nie są uporządkowane po stacji i czasie (np. {sorted(duplicated)[0]}); "
+                "zapisz je przez save_cleaned_data albo użyj calculate_daily_stats"
+            )
+        finished.update(keys.dropna().unique())
+        daily, monthly = aggregate_stats(rows, norm_threshold, value_column=column)
+        daily_parts.append(daily)
+        monthly_parts.append(monthly)
+        if sketches:
+            sketch_parts.append(QuantileSketches.from_hourly(rows, relative_accuracy=relative_accuracy,
+                                                             pollutant=pollutant))
+
+    for chunk in iter_chunks(filepath, chunk_rows, KEY_COLUMNS + [column], **filters):
+        if carry is not None:
+            chunk = pd.concat([carry, chunk], ignore_index=True)
+        keys = _month_keys(chunk)
+        tail = (keys == keys.iloc[-1]).to_numpy()
+        carry = chunk[tail]
+        if not tail.all():
+            aggregate(chunk[~tail], keys[~tail])
+    if carry is not None:
+        aggregate(carry, _month_keys(carry))
+
+    if not daily_parts:
+        empty = _empty_frame(column)
+        stats = aggregate_stats(empty, norm_threshold, value_column=column)
+        if sketches:
+            return stats + (QuantileSketches.from_hourly(empty, relative_accuracy=relative_accuracy, pollutant=pollutant),)
+        return stats
+    daily = pd.concat(daily_parts, ignore_index=True)
+    monthly = pd.concat(monthly_parts, ignore_index=True)
+    # Kolejność wierszy jak w aggregate_stats: stacje (miejscowość, kod), potem czas
+    daily = daily.sort_values(['Miejscowość', 'kod_stacji', 'data_dzien'], kind='stable', ignore_index=True)
+    monthly = monthly.sort_values(['Miejscowość', 'kod_stacji', 'rok', 'miesiac'], kind='stable', ignore_index=True)
+    if sketches:
+        return daily, monthly, QuantileSketches.merge(sketch_parts)
+    return daily, monthly
+
+
+def merge_stats_chunked(filepath, daily, monthly, output_path, chunk_rows=DEFAULT_CHUNK_ROWS, pollutant=DEFAULT_POLLUTANT):
+    """
+    Łączy dane godzinowe ze statystykami fragmentami i dopisuje wynik do pliku CSV.
+
+    Wynik jest taki sam jak save_to_csv(merge_stats(load_data(filepath), daily, monthly)),
+    ale w pamięci jest naraz tylko jeden fragment danych godzinowych.
+    pollutant - wskaźnik danych (wyznacza kolumnę wartości pustego wyniku)
+    """
+    output_path = Path(output_path)
+    first = True
+    for chunk in iter_chunks(filepath, chunk_rows):
+        merged = merge_stats(chunk, daily, monthly)
+        merged.to_csv(output_path, index=False, mode='w' if first else 'a', header=first)
+        first = False
+    if first:
+        merge_stats(_empty_frame(value_column(pollutant)), daily, monthly).to_csv(output_path, index=False)
+    return str(output_path)
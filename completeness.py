@@ -0,0 +1,190 @@
+import numpy as np
+import pandas as pd
+
+from pollutants import DEFAULT_POLLUTANT, value_column
+
+
+HOURS_PER_DAY = 24
+
+# Doba jest ważna, jeśli ma co najmniej 75% ważnych godzin (18 z 24)
+MIN_VALID_HOURS = 18
+
+
+class CompletenessIndex:
+    """
+    Indeks kompletności danych: dla każdej stacji i doby 24-bitowa maska godzin
+    z ważnym pomiarem (bit h ustawiony, jeśli pomiar z godziny h istnieje i nie jest NaN).
+
+    Maski zajmują 4 bajty na stację i dobę (ok. 15 KB na stację na 10 lat), więc indeks
+    można trzymać w pamięci i zapisać obok danych. Pytania o pokrycie (ważne doby,
+    pokrycie w miesiącach i latach, stacje spełniające próg w każdym roku) liczone są
+    operacjami bitowymi na maskach zamiast ponownego przeglądania danych godzinowych.
+
+    Atrybuty:
+    bits - macierz uint32 [stacja, doba] z maskami godzin
+    origin - pierwsza doba indeksu (pd.Timestamp, północ)
+    stations - indeks kodów stacji (wiersze macierzy)
+    """
+
+    def __init__(self, bits, origin, stations):
+        self.bits = np.asarray(bits, dtype=np.uint32)
+        self.origin = pd.Timestamp(origin)
+        self.stations = pd.Index(stations, name='kod_stacji')
+
+    @classmethod
+    def from_hourly(cls, df, pollutant=DEFAULT_POLLUTANT):
+        """
+        Buduje indeks z danych godzinowych w formacie długim ('kod_stacji', 'data' i kolumna wartości).
+
+        pollutant - wskaźnik, którego pomiary są sprawdzane (np. 'PM10' - kolumna 'pm10')
+        """
+        df = df[df['data'].notna() & df['kod_stacji'].notna()]
+        if df.empty:
+            return cls(np.empty((0, 0), dtype=np.uint32), pd.Timestamp(0), [])
+
+        hours = df['data'].to_numpy().astype('datetime64[h]').view(np.int64)
+        first_day = hours.min() // HOURS_PER_DAY
+        day_idx = hours // HOURS_PER_DAY - first_day
+        hour_of_day = hours % HOURS_PER_DAY
+        station_idx, stations = pd.factorize(df['kod_stacji'].astype(str), sort=True)
+
+        # Maska [stacja, doba, godzina] pakowana do 3 bajtów, uzupełniona do uint32
+        valid = np.zeros((len(stations), int(day_idx.max()) + 1, HOURS_PER_DAY), dtype=bool)
+        has_value = df[value_column(pollutant)].notna().to_numpy()
+        valid[station_idx[has_value], day_idx[has_value], hour_of_day[has_value]] = True
+        packed = np.packbits(valid, axis=2, bitorder='little')
+        packed = np.concatenate([packed, np.zeros(packed.shape[:2] + (1,), dtype=np.uint8)], axis=2)
+        bits = packed.view('<u4')[:, :, 0]
+
+        origin = pd.Timestamp(np.datetime64(int(first_day), 'D'))
+        return cls(bits, origin, stations)
+
+    @classmethod
+    def combine(cls, indexes):
+        """Łączy indeksy (np. zbudowane osobno dla każdego roku) w jeden; maski nakładających się dób są sumowane bitowo."""
+        indexes = [index for index in indexes if index.n_stations and index.n_days]
+        if not indexes:
+            return cls(np.empty((0, 0), dtype=np.uint32), pd.Timestamp(0), [])
+
+        stations = pd.Index(sorted(set().union(*(index.stations for index in indexes))))
+        origin = min(index.origin for index in indexes)
+        end = max(index.origin + pd.Timedelta(days=index.n_days) for index in indexes)
+        bits = np.zeros((len(stations), (end - origin).days), dtype=np.uint32)
+        for index in indexes:
+            rows = stations.get_indexer(index.stations)
+            start = (index.origin - origin).days
+            bits[rows, start:start + index.n_days] |= index.bits
+        return cls(bits, origin, stations)
+
+    @property
+    def n_stations(self):
+        return self.bits.shape[0]
+
+    @property
+    def n_days(self):
+        return self.bits.shape[1]
+
+    @property
+    def days(self):
+        return pd.date_range(self.origin, periods=self.n_days, freq='D')
+
+    @property
+    def years(self):
+        """Lata, w których co najmniej jedna stacja ma ważny pomiar (rosnąco)."""
+        has_data = (self.bits != 0).any(axis=0)
+        return sorted(int(year) for year in np.unique(self.days.year.to_numpy()[has_data]))
+
+    def nbytes(self):
+        """Rozmiar masek w pamięci (w bajtach)."""
+        return self.bits.nbytes
+
+    def valid_hours(self):
+        """Liczba ważnych godzin dla każdej stacji i doby: macierz [stacja, doba]."""
+        return np.bitwise_count(self.bits)
+
+    def valid_days(self, min_hours=MIN_VALID_HOURS, hours=None):
+        """
+        Maska ważnych dób [stacja, doba].
+
+        min_hours - minimalna liczba ważnych godzin w dobie
+        hours - opcjonalna lista godzin doby (0-23), które muszą mieć pomiar (np. godziny szczytu)
+        """
+        if hours is not None:
+            required = np.uint32(sum(1 << int(hour) for hour in hours))
+            return ((self.bits & required) == required) & (self.valid_hours() >= min_hours)
+        return self.valid_hours() >= min_hours
+
+    def coverage(self, period='year', min_hours=MIN_VALID_HOURS):
+        """
+        Część ważnych dób każdej stacji w kolejnych okresach.
+
+        Mianownikiem jest liczba dni kalendarzowych okresu (także dni spoza zakresu
+        indeksu), więc stacja bez danych w części roku ma odpowiednio mniejsze pokrycie.
+
+        Parametry:
+        period - 'year' albo 'month'
+        min_hours - minimalna liczba ważnych godzin w ważnej dobie
+
+        Zwraca DataFrame: wiersze - kody stacji, kolumny - lata (dla 'month' pary (rok, miesiąc)).
+        """
+        if period not in ('year', 'month'):
+            raise ValueError(f"Nieznany okres '{period}', dostępne: year, month")
+        days = self.days
+        if period == 'year':
+            keys = days.year.to_numpy()
+        else:
+            keys = days.year.to_numpy() * 12 + days.month.to_numpy() - 1
+        period_codes, periods = pd.factorize(keys, sort=True)
+
+        valid = self.valid_days(min_hours)
+        # Liczba ważnych dób w okresie: sumy kolumn w obrębie kolejnych okresów
+        counts = np.zeros((self.n_stations, len(periods)), dtype=np.int64)
+        if self.n_days:
+            starts = np.flatnonzero(np.r_[True, period_codes[1:] != period_codes[:-1]])
+            counts = np.add.reduceat(valid.astype(np.int64), starts, axis=1)
+
+        if period == 'year':
+            calendar_days = np.array([366 if pd.Timestamp(year=int(y), month=1, day=1).is_leap_year else 365 for y in periods])
+            columns = pd.Index(periods, name='rok')
+        else:
+            years, months = periods // 12, periods % 12 + 1
+            calendar_days = np.array([pd.Period(year=int(y), month=int(m), freq='M').days_in_month for y, m in zip(years, months)])
+            columns = pd.MultiIndex.from_arrays([years, months], names=['rok', 'miesiac'])
+        return pd.DataFrame(counts / calendar_days, index=self.stations, columns=columns)
+
+    def stations_with_coverage(self, min_fraction=0.75, years=None, min_hours=MIN_VALID_HOURS):
+        """
+        Stacje, które w każdym z podanych lat mają co najmniej min_fraction ważnych dób.
+
+        Parametry:
+        min_fraction - minimalna część ważnych dób roku (np. 0.75)
+        years - lata (domyślnie lata, w których jakakolwiek stacja ma pomiary); rok bez
+                danych stacji oznacza pokrycie 0
+        min_hours - minimalna liczba ważnych godzin w ważnej dobie
+
+        Zwraca posortowaną listę kodów stacji.
+        """
+        coverage = self.coverage('year', min_hours)
+        if years is None:
+            years = self.years
+        coverage = coverage.reindex(columns=sorted(int(year) for year in years), fill_value=0.0)
+        return coverage.index[(coverage >= min_fraction).all(axis=1)].tolist()
+
+    def save(self, path):
+        """Zapisuje indeks do pliku .npz (maski, kody stacji i pierwsza doba)."""
+        np.savez_compressed(
+            path,
+            bits=self.bits,
+            stations=self.stations.to_numpy(dtype=str),
+            origin=np.array(self.origin.strftime('%Y-%m-%d')),
+        )
+        return str(path)
+
+    @classmethod
+    def load(cls, path):
+        """Wczytuje indeks zapisany przez save."""
+        with np.load(path) as data:
+            return cls(data['bits'], pd.Timestamp(str(data['origin'])), data['stations'].tolist())
+
+    def __repr__(self):
+        return f"CompletenessIndex(stations={self.n_stations}, days={self.n_days}, origin={self.origin.date()})"
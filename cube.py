@@ -0,0 +1,186 @@
+import numpy as np
+import pandas as pd
+
+from timestamps import shift_midnight
+
+
+HOURS_PER_DAY = 24
+
+
+class PM25Cube:
+    """
+    Gęsta reprezentacja godzinowych danych PM2.5: macierz float32 [stacja, godzina].
+
+    Kolumny są w porządku rzeczywistego czasu: doba zajmuje 24 kolejne kolumny z godzinami
+    01:00-24:00. Pomiar z godziny 24:00, który clean_data zapisuje jako 00:00 tej samej doby,
+    trafia do ostatniej kolumny doby, więc okna kroczące (rolling.py) są chronologiczne,
+    a doby odpowiadają grupowaniu w calculate_daily_stats.
+
+    Atrybuty:
+    values - macierz float32 o wymiarach (liczba stacji, liczba godzin); NaN dla braków
+    origin - północ rozpoczynająca pierwszą dobę (pierwsza kolumna to godzina 01:00 tej doby)
+    stations - indeks kodów stacji (wiersze macierzy)
+    cities - miejscowości wyrównane ze stacjami
+    present - maska komórek, które występowały w danych w formacie długim
+              (odróżnia godziny z brakiem pomiaru od okresów spoza zbioru, np. lat przerwy)
+    """
+
+    def __init__(self, values, origin, stations, cities=None, present=None):
+        self.values = np.asarray(values, dtype=np.float32)
+        self.origin = pd.Timestamp(origin)
+        self.stations = pd.Index(stations, name='kod_stacji')
+        if cities is None:
+            cities = np.full(len(self.stations), np.nan, dtype=object)
+        self.cities = np.asarray(cities, dtype=object)
+        if present is None:
+            present = np.ones(self.values.shape, dtype=bool)
+        self.present = np.asarray(present, dtype=bool)
+
+    @classmethod
+    def from_long(cls, df):
+        """Buduje kostkę z danych w formacie długim ('Miejscowość', 'kod_stacji', 'data', 'pm25')."""
+        df = df[df['data'].notna()]
+        if df.empty:
+            return cls(np.empty((0, 0), dtype=np.float32), pd.Timestamp(0), [])
+
+        data = df['data'].dt.floor('h')
+        origin = data.min().floor('D')
+        # Godzina 00:00 (w konwencji clean_data koniec doby) to ostatnia kolumna swojej doby
+        day_idx = ((data.dt.floor('D') - origin) // pd.Timedelta(days=1)).to_numpy(dtype=np.int64)
+        hour_idx = day_idx * HOURS_PER_DAY + (data.dt.hour.to_numpy(dtype=np.int64) - 1) % HOURS_PER_DAY
+        n_hours = int(hour_idx.max()) + 1
+        n_hours += (-n_hours) % HOURS_PER_DAY  # pełne doby
+
+        station_idx, stations = pd.factorize(df['kod_stacji'].astype(str), sort=True)
+
+        values = np.full((len(stations), n_hours), np.nan, dtype=np.float32)
+        values[station_idx, hour_idx] = df['pm25'].to_numpy(dtype=np.float32)
+        present = np.zeros((len(stations), n_hours), dtype=bool)
+        present[station_idx, hour_idx] = True
+
+        cities = np.full(len(stations), np.nan, dtype=object)
+        if 'Miejscowość' in df.columns:
+            cities[station_idx] = df['Miejscowość'].to_numpy(dtype=object)
+
+        return cls(values, origin, stations, cities, present)
+
+    @property
+    def n_stations(self):
+        return self.values.shape[0]
+
+    @property
+    def n_hours(self):
+        return self.values.shape[1]
+
+    @property
+    def n_days(self):
+        return self.n_hours // HOURS_PER_DAY
+
+    @property
+    def mask(self):
+        """Maska godzin bez ważnego pomiaru (NaN)."""
+        return np.isnan(self.values)
+
+    @property
+    def true_hours(self):
+        """Rzeczywiste godziny kolejnych kolumn (rosnące; 24:00 to północ następnej doby)."""
+        return pd.date_range(self.origin + pd.Timedelta(hours=1), periods=self.n_hours, freq='h')
+
+    @property
+    def hours(self):
+        """Znaczniki czasu kolejnych kolumn w konwencji kolumny 'data' (24:00 jako 00:00 tej samej doby)."""
+        return pd.DatetimeIndex(shift_midnight(self.true_hours.to_numpy()))
+
+    @property
+    def days(self):
+        return pd.date_range(self.origin, periods=self.n_days, freq='D')
+
+    def nbytes(self):
+        """Rozmiar kostki w pamięci (w bajtach)."""
+        return self.values.nbytes + self.present.nbytes
+
+    def to_long(self):
+        """Zamienia kostkę z powrotem na dane w formacie długim (tylko komórki z present)."""
+        station_idx, hour_idx = np.nonzero(self.present)
+        return pd.DataFrame({
+            'Miejscowość': self.cities.take(station_idx),
+            'kod_stacji': self.stations.to_numpy().take(station_idx),
+            'data': self.hours.take(hour_idx),
+            'pm25': self.values[station_idx, hour_idx].astype('float64'),
+        })
+
+    def _daily_sums_counts(self):
+        """Sumy i liczby ważnych pomiarów dla każdej doby: tablice [stacja, doba]."""
+        shape = (self.n_stations, self.n_days, HOURS_PER_DAY)
+        values = self.values.reshape(shape)
+        valid = ~np.isnan(values)
+        sums = np.where(valid, values, 0).sum(axis=2, dtype=np.float64)
+        counts = valid.sum(axis=2)
+        return sums, counts
+
+    def daily_means(self):
+        """Średnie dobowe [stacja, doba] (NaN dla dób bez pomiarów)."""
+        sums, counts = self._daily_sums_counts()
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return sums / counts
+
+    def _month_starts(self):
+        """Indeksy dób rozpoczynających kolejne miesiące oraz te miesiące."""
+        days = self.days
+        month_keys = days.year * 12 + days.month - 1
+        starts = np.flatnonzero(np.r_[True, month_keys[1:] != month_keys[:-1]])
+        return starts, days[starts]
+
+    def monthly_means(self):
+        """Średnie miesięczne [stacja, miesiąc] oraz pierwsze dni tych miesięcy."""
+        sums, counts = self._daily_sums_counts()
+        starts, month_days = self._month_starts()
+        if len(starts) == 0:
+            return np.empty((self.n_stations, 0)), month_days
+        month_sums = np.add.reduceat(sums, starts, axis=1)
+        month_counts = np.add.reduceat(counts, starts, axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return month_sums / month_counts, month_days
+
+    def _present_days(self):
+        """Maska dób [stacja, doba], w których stacja miała choć jeden wiersz danych."""
+        return self.present.reshape(self.n_stations, self.n_days, HOURS_PER_DAY).any(axis=2)
+
+    def _has_city(self):
+        # Tak jak groupby w data_analysis, pomijamy stacje bez przypisanej miejscowości
+        return pd.notna(self.cities)
+
+    def daily_stats(self, norm_threshold=15):
+        """Średnie dobowe w tym samym formacie co calculate_daily_stats."""
+        means = self.daily_means()
+        present = self._present_days() & self._has_city()[:, None]
+        station_idx, day_idx = np.nonzero(present)
+
+        daily = pd.DataFrame({
+            'Miejscowość': self.cities.take(station_idx),
+            'kod_stacji': self.stations.to_numpy().take(station_idx),
+            'data_dzien': self.days.take(day_idx),
+            'pm25_srednia_dobowa': np.round(means[station_idx, day_idx], 2),
+        })
+        daily['przekroczenie_normy'] = daily['pm25_srednia_dobowa'] >= norm_threshold
+        return daily.sort_values(['Miejscowość', 'kod_stacji', 'data_dzien'], ignore_index=True)
+
+    def monthly_stats(self):
+        """Średnie miesięczne w tym samym formacie co calculate_monthly_stats."""
+        means, month_days = self.monthly_means()
+        starts, _ = self._month_starts()
+        if len(starts):
+            present = np.logical_or.reduceat(self._present_days(), starts, axis=1)
+        else:
+            present = np.empty((self.n_stations, 0), dtype=bool)
+        present &= self._has_city()[:, None]
+        station_idx, month_idx = np.nonzero(present)
+
+        monthly = pd.DataFrame({
+            'Miejscowość': self.cities.take(station_idx),
+            'kod_stacji': self.stations.to_numpy().take(station_idx),
+            'rok': pd.array(month_days.year.to_numpy().take(month_idx), dtype='Int64'),
+            'miesiac': month_days.month.to_numpy().take(month_idx),
+            'pm25_srednia_miesieczna': np.round(means[station_idx, month_idx], 2),
+        })
+        return monthly.sort_values(['Miejscowość', 'kod_stacji', 'rok', 'miesiac'], ignore_index=True)
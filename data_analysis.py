@@ -1,47 +1,83 @@
 import pandas as pd
-
-
-def load_data(filepath='pm25_cleaned.csv'):
-    """Wczytuje dane z pliku CSV."""
-    df = pd.read_csv(filepath, low_memory=False)
-    df['data'] = pd.to_datetime(df['data'], errors='coerce')
+from aggregation import aggregate_stats
+from enriched_view import EnrichedView
+from instrumentation import instrumented
+from pollutants import DEFAULT_POLLUTANT, value_column
+from station_registry import as_registry
+from snapshot import is_fresh, is_snapshot_path, open_snapshot, save_snapshot, snapshot_path
+from storage import is_dataset_path, load_dataset
+from timestamps import decode_timestamps
+
+
+@instrumented()
+def load_data(filepath='pm25_cleaned.csv', columns=None, years=None, cities=None, stations=None,
+              use_snapshot=False):
+    """
+    Wczytuje dane z pliku CSV, z partycjonowanego zbioru Parquet lub z migawki.
+
+    Parametry:
+    filepath - plik CSV, katalog zbioru (.parquet) zapisanego przez storage.save_dataset
+               albo katalog migawki (.snapshot) zapisanej przez snapshot.save_snapshot
+    columns - lista kolumn do wczytania (domyślnie wszystkie)
+    years, cities, stations - opcjonalne filtry: lata, miejscowości, kody stacji
+    use_snapshot - czy użyć migawki zapisanej obok pliku (np. pm25_cleaned.snapshot);
+                   jeśli jej nie ma albo plik się zmienił, dane są wczytywane z pliku
+                   i zapisywane do nowej migawki. Migawka jest mapowana z dysku, więc
+                   kolejne wczytania trwają milisekundy (stacje i miejscowości jako
+                   kategorie, pm25 jako float32).
+    """
+    filters = dict(columns=columns, years=years, cities=cities, stations=stations)
+    if is_snapshot_path(filepath):
+        return open_snapshot(filepath, **filters)
+    if use_snapshot:
+        snapshot = snapshot_path(filepath)
+        if not is_fresh(snapshot, filepath):
+            save_snapshot(load_data(filepath), snapshot, source=filepath)
+        return open_snapshot(snapshot, **filters)
+
+    if is_dataset_path(filepath):
+        return load_dataset(filepath, columns=columns, years=years, cities=cities, stations=stations)
+
+    usecols = None
+    if columns is not None:
+        # Kolumny potrzebne do filtrowania wczytujemy zawsze, a potem je odrzucamy
+        usecols = set(columns) | {'data'}
+        if cities is not None:
+            usecols.add('Miejscowość')
+        if stations is not None:
+            usecols.add('kod_stacji')
+
+    df = pd.read_csv(filepath, low_memory=False, usecols=usecols)
+    df['data'] = decode_timestamps(df['data'])
+
+    mask = pd.Series(True, index=df.index)
+    if years is not None:
+        mask &= df['data'].dt.year.isin(list(years))
+    if cities is not None:
+        mask &= df['Miejscowość'].isin(list(cities))
+    if stations is not None:
+        mask &= df['kod_stacji'].isin(list(stations))
+    if not mask.all():
+        df = df[mask].reset_index(drop=True)
+
+    if columns is not None:
+        df = df[list(columns)]
     return df
 
 
-def calculate_daily_stats(df, norm_threshold=15):
-    """Oblicza średnie dobowe i sprawdza przekroczenia normy."""
-    df['data_dzien'] = df['data'].dt.floor('D')
-
-    daily = (
-        df.groupby(['Miejscowość', 'kod_stacji', 'data_dzien'])['pm25']
-        .mean()
-        .round(2)
-        .reset_index()
-    )
-
-    daily.rename(columns={'pm25': 'pm25_srednia_dobowa'}, inplace=True)
-    daily['przekroczenie_normy'] = daily['pm25_srednia_dobowa'] >= norm_threshold
-
+@instrumented()
+def calculate_daily_stats(df, norm_threshold=15, pollutant=DEFAULT_POLLUTANT):
+    """Oblicza średnie dobowe i sprawdza przekroczenia normy (pollutant - wskaźnik, np. 'PM10'; patrz pollutants.py)."""
+    daily, _ = aggregate_stats(df, norm_threshold, monthly=False, value_column=value_column(pollutant))
     return daily
 
-def calculate_monthly_stats(df):
-    """Oblicza średnie miesięczne."""
-    df['rok'] = df['data'].dt.year.astype('Int64')
-    df['miesiac'] = df['data'].dt.month
-
-    total_measurements = len(df)
-
-    monthly = (
-        df.groupby(['Miejscowość', 'kod_stacji', 'rok', 'miesiac'])['pm25']
-        .mean()
-        .round(2)
-        .reset_index()
-    )
-
-    monthly.rename(columns={'pm25': 'pm25_srednia_miesieczna'}, inplace=True)
-
+@instrumented()
+def calculate_monthly_stats(df, pollutant=DEFAULT_POLLUTANT):
+    """Oblicza średnie miesięczne (pollutant - wskaźnik, np. 'PM10'; patrz pollutants.py)."""
+    _, monthly = aggregate_stats(df, daily=False, value_column=value_column(pollutant))
     return monthly
 
+@instrumented()
 def merge_stats(df, daily, monthly):
     """Łączy średnie dobowe i miesięczne z oryginalnym DataFrame."""
     # Klucze czasowe
@@ -65,14 +101,23 @@ def merge_stats(df, daily, monthly):
 
     return df
 
+def enrich_stats(df, daily, monthly):
+    """
+    Zwraca leniwy widok danych godzinowych ze statystykami (EnrichedView).
+
+    W przeciwieństwie do merge_stats nie kopiuje danych godzinowych ani nie powiela
+    średnich w każdym wierszu; pełną tabelę daje dopiero materialize() lub to_csv().
+    """
+    return EnrichedView(df, daily, monthly)
+
+@instrumented()
 def save_to_csv(df, filepath='pm25_cleaned.csv'):
     df.to_csv(filepath, index=False)
 
 def get_voivodeship_mapping(df_metadata):
-    """Tworzy mapowanie kodów stacji na województwa."""
-    if 'Kod stacji' in df_metadata.columns and 'Województwo' in df_metadata.columns:
-        df_metadata['Województwo'] = df_metadata['Województwo'].str.capitalize()
-        station_to_voivodeship = df_metadata.set_index('Kod stacji')['Województwo'].to_dict()
-        return station_to_voivodeship
+    """Tworzy mapowanie kodów stacji na województwa (z metadanych lub StationRegistry)."""
+    registry = as_registry(df_metadata)
+    if registry.has_voivodeships:
+        return registry.station_to_voivodeship()
     else:
         raise KeyError("Brak kolumny 'Kod stacji' lub 'Województwo' w metadanych")
\ No newline at end of file
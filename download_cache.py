@@ -0,0 +1,207 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+from downloader import CHUNK_SIZE, default_downloader
+
+
+class DownloadCache:
+    """
+    Trwała pamięć podręczna pobieranych plików (archiwa ZIP, metadane XLSX).
+
+    Zawartość przechowywana jest pod nazwą równą skrótowi SHA-256 (adresowanie treścią),
+    a indeks mapuje klucz (URL lub identyfikator archiwum) na skrót, rozmiar i czas
+    ostatniego użycia. Po przekroczeniu limitu rozmiaru usuwane są najdawniej używane wpisy.
+
+    Parametry:
+    cache_dir - katalog pamięci podręcznej
+    max_size_bytes - limit łącznego rozmiaru plików (None - bez limitu)
+    offline - jeśli True, nigdy nie łączy się z siecią; brak wpisu kończy się błędem
+    """
+
+    INDEX_FILE = 'index.json'
+    OBJECTS_DIR = 'objects'
+
+    def __init__(self, cache_dir='.gios_cache', max_size_bytes=None, offline=False):
+        self.cache_dir = Path(cache_dir)
+        self.max_size_bytes = max_size_bytes
+        self.offline = offline
+        self.hits = 0
+        self.misses = 0
+
+        (self.cache_dir / self.OBJECTS_DIR).mkdir(parents=True, exist_ok=True)
+        self._index = self._read_index()
+        # Z pamięci podręcznej mogą naraz korzystać wątki Downloader.fetch_many
+        self._lock = threading.RLock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.RLock()
+
+    def _read_index(self):
+        """Wczytuje indeks z dysku (pusty, jeśli plik nie istnieje lub jest uszkodzony)."""
+        index_path = self.cache_dir / self.INDEX_FILE
+        if not index_path.exists():
+            return {}
+        try:
+            with open(index_path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            print(f"Ostrzeżenie: uszkodzony indeks pamięci podręcznej {index_path}, tworzę nowy")
+            return {}
+
+    def _write_index(self):
+        """Zapisuje indeks atomowo (zapis do pliku tymczasowego i podmiana)."""
+        index_path = self.cache_dir / self.INDEX_FILE
+        tmp_path = index_path.with_suffix(f'.{os.getpid()}.{threading.get_ident()}.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._index, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, index_path)
+
+    def _object_path(self, digest):
+        return self.cache_dir / self.OBJECTS_DIR / digest
+
+    def _valid_path(self, key):
+        """Zwraca ścieżkę pliku wpisu, jeśli istnieje i zgadza się jego skrót; inaczej None."""
+        entry = self._index.get(key)
+        if entry is None:
+            return None
+
+        path = self._object_path(entry['sha256'])
+        digest = hashlib.sha256()
+        try:
+            with open(path, 'rb') as f:
+                for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+                    digest.update(chunk)
+        except OSError:
+            digest = None
+
+        if digest is None or digest.hexdigest() != entry['sha256']:
+            print(f"Ostrzeżenie: nieprawidłowy wpis pamięci podręcznej dla {key}, zostanie usunięty")
+            self._remove(key)
+            return None
+
+        entry['last_access'] = time.time()
+        return path
+
+    def _remove(self, key):
+        """Usuwa wpis z indeksu oraz plik, jeśli nie wskazuje na niego inny klucz."""
+        entry = self._index.pop(key, None)
+        if entry is None:
+            return
+        still_used = any(e['sha256'] == entry['sha256'] for e in self._index.values())
+        if not still_used:
+            self._object_path(entry['sha256']).unlink(missing_ok=True)
+        self._write_index()
+
+    def _store_file(self, key, url, source):
+        """Kopiuje otwarty plik fragmentami pod skrótem SHA-256 i aktualizuje indeks."""
+        tmp_path = self.cache_dir / self.OBJECTS_DIR / f'{os.getpid()}.{id(source)}.tmp'
+        digest = hashlib.sha256()
+        size = 0
+        with open(tmp_path, 'wb') as out:
+            for chunk in iter(lambda: source.read(CHUNK_SIZE), b''):
+                digest.update(chunk)
+                out.write(chunk)
+                size += len(chunk)
+        digest = digest.hexdigest()
+        path = self._object_path(digest)
+        if path.exists():
+            tmp_path.unlink()
+        else:
+            os.replace(tmp_path, path)
+
+        # Indeks mógł zostać zmieniony przez inny proces korzystający z tego katalogu
+        on_disk = self._read_index()
+        on_disk.update(self._index)
+        self._index = on_disk
+
+        self._index[key] = {
+            'url': url,
+            'sha256': digest,
+            'size': size,
+            'last_access': time.time(),
+        }
+        self._evict(keep=key)
+        self._write_index()
+
+    def total_size(self):
+        """Łączny rozmiar unikalnych plików w pamięci podręcznej (w bajtach)."""
+        sizes = {entry['sha256']: entry['size'] for entry in self._index.values()}
+        return sum(sizes.values())
+
+    def _evict(self, keep=None):
+        """
+        Usuwa najdawniej używane wpisy, dopóki rozmiar przekracza limit.
+
+        Wpis keep (właśnie zapisany) nie jest usuwany, nawet jeśli sam przekracza limit -
+        zostanie usunięty przy kolejnym zapisie.
+        """
+        if self.max_size_bytes is None:
+            return
+        by_age = sorted((k for k in self._index if k != keep), key=lambda k: self._index[k]['last_access'])
+        for key in by_age:
+            if self.total_size() <= self.max_size_bytes:
+                break
+            print(f"Pamięć podręczna: usuwanie wpisu {key}")
+            self._remove(key)
+
+    def open_file(self, url, key=None, downloader=None, timeout=None):
+        """
+        Zwraca plik spod adresu URL otwarty z pamięci podręcznej (tylko do odczytu).
+
+        Przy braku wpisu plik jest pobierany strumieniowo (downloader, domyślnie wspólny
+        Downloader procesu) i kopiowany fragmentami do pamięci podręcznej, więc nawet
+        duże archiwum nie jest w całości w pamięci.
+
+        Parametry:
+        url - adres pliku
+        key - klucz wpisu (domyślnie URL), np. 'archive:236'
+        downloader - Downloader używany przy braku wpisu
+        timeout - opcjonalny limit czasu pobrania (domyślnie limit downloadera)
+        """
+        key = key or url
+        with self._lock:
+            path = self._valid_path(key)
+            if path is not None:
+                self.hits += 1
+                self._write_index()
+                return open(path, 'rb')
+
+            self.misses += 1
+            if self.offline:
+                raise ConnectionError(f"Tryb offline: brak pliku {key} w pamięci podręcznej")
+
+        with (downloader or default_downloader()).download(url, key, timeout) as downloaded:
+            with self._lock:
+                self._store_file(key, url, downloaded)
+                return open(self._object_path(self._index[key]['sha256']), 'rb')
+
+    def fetch(self, url, key=None, timeout=None):
+        """
+        Zwraca zawartość spod adresu URL, korzystając z pamięci podręcznej.
+
+        Parametry:
+        url - adres pliku
+        key - klucz wpisu (domyślnie URL), np. 'archive:236'
+        timeout - limit czasu żądania HTTP w sekundach
+        """
+        with self.open_file(url, key=key, timeout=timeout) as f:
+            return f.read()
+
+    def stats(self):
+        """Zwraca liczniki trafień i chybień oraz stan pamięci podręcznej."""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'entries': len(self._index),
+            'size_bytes': self.total_size(),
+        }
@@ -0,0 +1,194 @@
+import tempfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+# Rozmiar fragmentu czytanego z odpowiedzi HTTP
+CHUNK_SIZE = 1 << 20
+
+# Do tego rozmiaru pobrany plik trzymany jest w pamięci, większy trafia do pliku tymczasowego
+SPOOL_MAX_SIZE = 32 << 20
+
+DEFAULT_MAX_DOWNLOADS = 4
+
+# Liczba ostatnich pobrań zapamiętywanych w Downloader.transfers
+MAX_TRANSFERS = 1000
+
+# Kody HTTP, po których warto ponowić żądanie (przeciążenie lub chwilowy błąd serwera)
+RETRY_STATUS = frozenset({429, 500, 502, 503, 504})
+
+_RETRY_ERRORS = (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError)
+
+
+class _RetryableStatus(requests.HTTPError):
+    """Odpowiedź HTTP z kodem z RETRY_STATUS."""
+
+
+def file_size(f):
+    """Rozmiar otwartego pliku w bajtach (pozycja w pliku nie zmienia się)."""
+    position = f.tell()
+    size = f.seek(0, 2)
+    f.seek(position)
+    return size
+
+
+class Downloader:
+    """
+    Strumieniowe pobieranie plików przez wspólną sesję HTTP (pula połączeń).
+
+    Treść odpowiedzi czytana jest fragmentami do pliku tymczasowego (w pamięci do
+    SPOOL_MAX_SIZE, potem na dysku), więc archiwum nigdy nie jest w pamięci dwa razy.
+    Chwilowe błędy (zerwane połączenie, przekroczony czas, kody z RETRY_STATUS) są
+    ponawiane z wykładniczo rosnącym opóźnieniem, a fetch_many pobiera wiele plików
+    naraz w puli wątków.
+
+    Parametry:
+    max_workers - maksymalna liczba równoczesnych pobrań (i połączeń w puli)
+    timeout - limit czasu połączenia i odczytu w sekundach (krotka albo liczba)
+    retries - liczba ponowień po chwilowym błędzie
+    backoff - opóźnienie przed pierwszym ponowieniem w sekundach (potem 2x, 4x, ...)
+    chunk_size - rozmiar fragmentu odpowiedzi
+    progress - opcjonalna funkcja progress(key, pobrane_bajty, rozmiar_lub_None)
+               wywoływana po każdym fragmencie
+    """
+
+    def __init__(self, max_workers=DEFAULT_MAX_DOWNLOADS, timeout=(10, 60), retries=3, backoff=0.5,
+                 chunk_size=CHUNK_SIZE, progress=None):
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.chunk_size = chunk_size
+        self.progress = progress
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        # Ostatnie pobrania (ograniczona historia) i łączne liczniki do przepustowości
+        self.transfers = deque(maxlen=MAX_TRANSFERS)
+        self.downloaded_bytes = 0
+        self.download_seconds = 0.0
+        self.download_count = 0
+        self._lock = threading.Lock()
+
+    def _get(self, url, key, out, timeout):
+        """Jedno podejście: zapisuje treść odpowiedzi do out, zwraca liczbę bajtów."""
+        with self.session.get(url, stream=True, timeout=timeout) as response:
+            if response.status_code in RETRY_STATUS:
+                raise _RetryableStatus(f"{response.status_code} dla {url}", response=response)
+            response.raise_for_status()  # jeśli błąd HTTP, zatrzymaj
+            total = int(response.headers.get('Content-Length') or 0) or None
+            done = 0
+            for chunk in response.iter_content(self.chunk_size):
+                out.write(chunk)
+                done += len(chunk)
+                if self.progress is not None:
+                    self.progress(key, done, total)
+        return done
+
+    def download(self, url, key=None, timeout=None):
+        """
+        Pobiera plik spod adresu URL i zwraca go jako otwarty plik tymczasowy (ustawiony na początek).
+
+        timeout - opcjonalny limit czasu tego pobrania (domyślnie self.timeout)
+
+        Po wyczerpaniu ponowień zgłasza ostatni błąd requests.
+        """
+        key = key or url
+        timeout = self.timeout if timeout is None else timeout
+        start = time.perf_counter()
+        out = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+        for attempt in range(self.retries + 1):
+            try:
+                size = self._get(url, key, out, timeout)
+                break
+            except (_RetryableStatus, *_RETRY_ERRORS) as e:
+                if attempt == self.retries:
+                    out.close()
+                    raise
+                delay = self.backoff * 2 ** attempt
+                print(f"Ponawianie pobierania {key} za {delay:.1f} s ({type(e).__name__}: {e})")
+                time.sleep(delay)
+                out.seek(0)
+                out.truncate()
+            except Exception:
+                out.close()
+                raise
+
+        seconds = time.perf_counter() - start
+        with self._lock:
+            self.transfers.append({'key': key, 'url': url, 'bytes': size, 'seconds': seconds, 'attempts': attempt + 1})
+            self.downloaded_bytes += size
+            self.download_seconds += seconds
+            self.download_count += 1
+        out.seek(0)
+        return out
+
+    def fetch(self, url, key=None, cache=None, timeout=None):
+        """
+        Zwraca otwarty plik z zawartością spod adresu URL.
+
+        Jeśli podano cache (DownloadCache), plik czytany jest z pamięci podręcznej,
+        a pobierany tylko przy braku wpisu.
+        """
+        if cache is not None:
+            return cache.open_file(url, key=key, downloader=self, timeout=timeout)
+        return self.download(url, key, timeout)
+
+    def fetch_many(self, urls, cache=None):
+        """
+        Pobiera wiele plików równocześnie (najwyżej max_workers naraz).
+
+        Parametry:
+        urls - słownik klucz -> URL (np. 'archive:236' -> adres archiwum)
+        cache - opcjonalna pamięć podręczna (DownloadCache)
+
+        Zwraca krotkę (files, errors): słownik klucz -> otwarty plik dla udanych pobrań
+        oraz słownik klucz -> komunikat błędu.
+        """
+        files, errors = {}, {}
+        if not urls:
+            return files, errors
+        with self._lock:
+            first_bytes, first_count = self.downloaded_bytes, self.download_count
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {executor.submit(self.fetch, url, key, cache): key for key, url in urls.items()}
+            for future in as_completed(futures):
+                key = futures[future]
+                try:
+                    files[key] = future.result()
+                except Exception as e:
+                    errors[key] = f"{type(e).__name__}: {e}"
+
+        downloaded = self.downloaded_bytes - first_bytes
+        seconds = time.perf_counter() - start
+        if downloaded:
+            print(f"Pobrano {self.download_count - first_count} plików: {downloaded / 2**20:.1f} MB "
+                  f"w {seconds:.1f} s ({downloaded / 2**20 / max(seconds, 1e-9):.1f} MB/s)")
+        return files, errors
+
+    def throughput(self):
+        """Łączna liczba pobranych bajtów i średnia przepustowość pojedynczego pobrania (B/s)."""
+        seconds = self.download_seconds
+        return {'bytes': self.downloaded_bytes, 'bytes_per_second': self.downloaded_bytes / seconds if seconds else 0.0}
+
+
+_default_downloader = None
+_default_lock = threading.Lock()
+
+
+def default_downloader():
+    """Wspólny Downloader procesu, żeby kolejne pobrania korzystały z tej samej puli połączeń."""
+    global _default_downloader
+    with _default_lock:
+        if _default_downloader is None:
+            _default_downloader = Downloader()
+        return _default_downloader
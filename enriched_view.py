@@ -0,0 +1,133 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from pandas.api.extensions import take
+
+
+DAILY_KEYS = ['Miejscowość', 'kod_stacji', 'data_dzien']
+MONTHLY_KEYS = ['Miejscowość', 'kod_stacji', 'rok', 'miesiac']
+
+
+class EnrichedView:
+    """
+    Widok danych godzinowych wzbogaconych o statystyki dobowe i miesięczne bez łączenia tabel.
+
+    Zamiast kopiować każdą średnią dobową i miesięczną do każdego wiersza godzinowego
+    (jak merge_stats), widok przechowuje dla każdego wiersza godzinowego tylko pozycję
+    odpowiadającego wiersza w tabeli dobowej i miesięcznej. Kolumny są składane dopiero
+    przy odczycie, a pełną tabelę można jawnie zmaterializować do eksportu.
+
+    Parametry:
+    df - dane godzinowe w formacie długim
+    daily - wynik calculate_daily_stats
+    monthly - wynik calculate_monthly_stats
+    """
+
+    TIME_COLUMNS = ['data_dzien', 'rok', 'miesiac']
+    HOURLY_FILE = 'hourly.parquet'
+    DAILY_FILE = 'daily.parquet'
+    MONTHLY_FILE = 'monthly.parquet'
+
+    def __init__(self, df, daily, monthly):
+        self.hourly = df
+        self.daily = daily.reset_index(drop=True)
+        self.monthly = monthly.reset_index(drop=True)
+
+        self.daily_columns = [c for c in self.daily.columns if c not in DAILY_KEYS]
+        self.monthly_columns = [c for c in self.monthly.columns if c not in MONTHLY_KEYS]
+
+        # Klucze czasowe potrzebne są tylko do wyznaczenia pozycji i nie są przechowywane
+        self._daily_pos = self._positions(self.daily, DAILY_KEYS)
+        self._monthly_pos = self._positions(self.monthly, MONTHLY_KEYS)
+
+    @staticmethod
+    def _time_column(data, name):
+        """Klucz czasowy liczony z kolumny 'data' (bez modyfikacji danych godzinowych)."""
+        if name == 'data_dzien':
+            values = data.dt.floor('D')
+        elif name == 'rok':
+            values = data.dt.year.astype('Int64')
+        else:
+            values = data.dt.month
+        return values.rename(name)
+
+    def _key_column(self, name):
+        if name in self.TIME_COLUMNS:
+            return self._time_column(self.hourly['data'], name)
+        return self.hourly[name]
+
+    def _positions(self, table, keys):
+        """Pozycja wiersza tabeli statystyk dla każdego wiersza godzinowego (-1, jeśli brak)."""
+        table_index = pd.MultiIndex.from_frame(table[keys])
+        hourly_index = pd.MultiIndex.from_arrays([self._key_column(k) for k in keys], names=keys)
+        return table_index.get_indexer(hourly_index).astype(np.int32)
+
+    @property
+    def columns(self):
+        base = list(self.hourly.columns)
+        extra = [c for c in self.TIME_COLUMNS if c not in base]
+        return base + extra + self.daily_columns + self.monthly_columns
+
+    def __len__(self):
+        return len(self.hourly)
+
+    def _column(self, name, rows=slice(None)):
+        """Kolumna widoku dla wierszy rows (wycinka); składane są tylko te wiersze."""
+        hourly = self.hourly.iloc[rows]
+        if name in self.daily_columns:
+            values = take(self.daily[name].to_numpy(), self._daily_pos[rows], allow_fill=True)
+        elif name in self.monthly_columns:
+            values = take(self.monthly[name].to_numpy(), self._monthly_pos[rows], allow_fill=True)
+        elif name in self.TIME_COLUMNS:
+            return self._time_column(hourly['data'], name)
+        else:
+            return hourly[name]
+        return pd.Series(values, index=hourly.index, name=name)
+
+    def __getitem__(self, name):
+        if isinstance(name, list):
+            return self.select(name)
+        return self._column(name)
+
+    def select(self, columns, rows=slice(None)):
+        """Materializuje tylko wybrane kolumny (np. te potrzebne do wykresu), opcjonalnie dla wycinka wierszy."""
+        return pd.DataFrame({name: self._column(name, rows) for name in columns},
+                            index=self.hourly.index[rows])
+
+    def materialize(self):
+        """Zwraca pełną tabelę, taką jak wynik merge_stats (np. do eksportu)."""
+        return self.select(self.columns).reset_index(drop=True)
+
+    def to_csv(self, filepath, index=False, chunk_rows=500_000):
+        """Zapisuje pełną tabelę do CSV fragmentami; w pamięci jest naraz tylko jeden fragment."""
+        columns = self.columns
+        for start in range(0, max(len(self), 1), chunk_rows):
+            chunk = self.select(columns, slice(start, start + chunk_rows))
+            chunk.to_csv(filepath, index=index, mode='w' if start == 0 else 'a', header=start == 0)
+
+    def save(self, path):
+        """Zapisuje dane godzinowe i statystyki jako trzy osobne tabele Parquet (bez powielania)."""
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        self.hourly.to_parquet(path / self.HOURLY_FILE, index=False)
+        self.daily.to_parquet(path / self.DAILY_FILE, index=False)
+        self.monthly.to_parquet(path / self.MONTHLY_FILE, index=False)
+        return str(path)
+
+    @classmethod
+    def load(cls, path):
+        """Wczytuje widok zapisany przez save."""
+        path = Path(path)
+        return cls(
+            pd.read_parquet(path / cls.HOURLY_FILE),
+            pd.read_parquet(path / cls.DAILY_FILE),
+            pd.read_parquet(path / cls.MONTHLY_FILE),
+        )
+
+
+def as_frame(df, columns):
+    """Zwraca DataFrame z potrzebnymi kolumnami; dla EnrichedView materializuje tylko je."""
+    if isinstance(df, EnrichedView):
+        return df.select([c for c in columns if c in df.columns])
+    return df
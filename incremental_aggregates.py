@@ -0,0 +1,150 @@
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+DAILY_KEYS = ['Miejscowość', 'kod_stacji', 'data_dzien']
+MONTHLY_KEYS = ['Miejscowość', 'kod_stacji', 'rok', 'miesiac']
+
+
+def _daily_partials(df):
+    """Sumy i liczby ważnych pomiarów dla każdej stacji i doby."""
+    partial = pd.DataFrame({
+        'Miejscowość': df['Miejscowość'],
+        'kod_stacji': df['kod_stacji'],
+        'data_dzien': df['data'].dt.floor('D'),
+        'suma': df['pm25'].fillna(0).astype('float64'),
+        'liczba': df['pm25'].notna().astype('int64'),
+    })
+    return partial.groupby(DAILY_KEYS).sum()
+
+
+class IncrementalAggregates:
+    """
+    Zmaterializowane agregaty dobowe i miesięczne aktualizowane przyrostowo.
+
+    Agregaty przechowywane są jako sumy częściowe (suma, liczba pomiarów, liczba dni
+    z przekroczeniem normy) dla każdej stacji i okresu, więc nowe dane wymagają
+    przeliczenia tylko dotkniętych dób i miesięcy, a nie całego zbioru.
+
+    Parametry:
+    norm_threshold - próg normy dobowej (μg/m^3)
+    """
+
+    DAILY_FILE = 'daily.parquet'
+    MONTHLY_FILE = 'monthly.parquet'
+    META_FILE = 'meta.json'
+
+    def __init__(self, norm_threshold=15):
+        self.norm_threshold = norm_threshold
+        self.daily = pd.DataFrame(
+            {'suma': pd.Series(dtype='float64'), 'liczba': pd.Series(dtype='int64')},
+            index=pd.MultiIndex.from_arrays([[], [], pd.DatetimeIndex([])], names=DAILY_KEYS),
+        )
+        self.monthly = pd.DataFrame(
+            {'suma': pd.Series(dtype='float64'), 'liczba': pd.Series(dtype='int64'),
+             'dni_przekroczen': pd.Series(dtype='int64')},
+            index=pd.MultiIndex.from_arrays([[], [], [], []], names=MONTHLY_KEYS),
+        )
+
+    def update(self, df):
+        """
+        Wprowadza nowe lub poprawione dane godzinowe (format długi).
+
+        Doby (stacja, dzień) obecne w df zastępują wcześniej zapisane partiale,
+        więc ponowne wczytanie poprawionego okresu nie dubluje pomiarów. Każda
+        paczka powinna zawierać pełne doby dla stacji, których dotyczy.
+        """
+        new = _daily_partials(df)
+        kept = self.daily[~self.daily.index.isin(new.index)]
+        self.daily = pd.concat([kept, new]).sort_index()
+        self._refresh_months(new.index)
+        return self
+
+    def append(self, df):
+        """
+        Dokłada nowe pomiary godzinowe do istniejących partiali (sumowanie).
+
+        Przeznaczone dla strumienia pojedynczych godzin, które nie były jeszcze
+        wczytane; do poprawek wcześniej wczytanych okresów służy update.
+        """
+        new = _daily_partials(df)
+        self.daily = self.daily.add(new, fill_value=0).astype({'liczba': 'int64'})
+        self._refresh_months(new.index)
+        return self
+
+    def _month_keys(self, daily_index):
+        days = daily_index.get_level_values('data_dzien')
+        return pd.MultiIndex.from_arrays([
+            daily_index.get_level_values('Miejscowość'),
+            daily_index.get_level_values('kod_stacji'),
+            days.year,
+            days.month,
+        ], names=MONTHLY_KEYS)
+
+    def _refresh_months(self, touched_daily_index):
+        """Przelicza partiale miesięczne tylko dla miesięcy, których dotyczyła zmiana."""
+        touched = self._month_keys(touched_daily_index).unique()
+        all_month_keys = self._month_keys(self.daily.index)
+        subset = self.daily[all_month_keys.isin(touched)]
+
+        exceeded = self._daily_means(subset) >= self.norm_threshold
+        recomputed = pd.DataFrame({
+            'suma': subset['suma'].to_numpy(),
+            'liczba': subset['liczba'].to_numpy(),
+            'dni_przekroczen': exceeded.to_numpy().astype('int64'),
+        }, index=self._month_keys(subset.index)).groupby(level=MONTHLY_KEYS).sum()
+
+        kept = self.monthly[~self.monthly.index.isin(touched)]
+        self.monthly = pd.concat([kept, recomputed]).sort_index()
+
+    @staticmethod
+    def _daily_means(daily):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return (daily['suma'] / daily['liczba'].where(daily['liczba'] > 0)).round(2)
+
+    def set_threshold(self, norm_threshold):
+        """Zmienia próg normy i przelicza liczby dni z przekroczeniem (bez danych godzinowych)."""
+        self.norm_threshold = norm_threshold
+        self.monthly = self.monthly.iloc[0:0]
+        self._refresh_months(self.daily.index)
+        return self
+
+    def daily_stats(self):
+        """Średnie dobowe w formacie calculate_daily_stats."""
+        daily = self._daily_means(self.daily).rename('pm25_srednia_dobowa').reset_index()
+        daily['przekroczenie_normy'] = daily['pm25_srednia_dobowa'] >= self.norm_threshold
+        return daily
+
+    def monthly_stats(self):
+        """Średnie miesięczne w formacie calculate_monthly_stats."""
+        monthly = self._daily_means(self.monthly).rename('pm25_srednia_miesieczna').reset_index()
+        monthly['rok'] = monthly['rok'].astype('Int64')
+        return monthly
+
+    def monthly_exceedance_days(self):
+        """Liczba dni z przekroczeniem normy dla każdej stacji i miesiąca."""
+        return self.monthly['dni_przekroczen'].reset_index()
+
+    def save(self, path):
+        """Zapisuje partiale do katalogu (pliki Parquet i metadane JSON)."""
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        self.daily.reset_index().to_parquet(path / self.DAILY_FILE, index=False)
+        self.monthly.reset_index().to_parquet(path / self.MONTHLY_FILE, index=False)
+        with open(path / self.META_FILE, 'w', encoding='utf-8') as f:
+            json.dump({'norm_threshold': self.norm_threshold}, f)
+        return str(path)
+
+    @classmethod
+    def load(cls, path):
+        """Wczytuje partiale zapisane przez save."""
+        path = Path(path)
+        with open(path / cls.META_FILE, encoding='utf-8') as f:
+            meta = json.load(f)
+        aggregates = cls(norm_threshold=meta['norm_threshold'])
+        aggregates.daily = pd.read_parquet(path / cls.DAILY_FILE).set_index(DAILY_KEYS)
+        aggregates.monthly = pd.read_parquet(path / cls.MONTHLY_FILE).set_index(MONTHLY_KEYS)
+        return aggregates
@@ -0,0 +1,174 @@
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+
+import pandas as pd
+
+from download_cache import DownloadCache
+from downloader import DEFAULT_MAX_DOWNLOADS, Downloader
+from instrumentation import instrumentation, stage
+from pollutants import DEFAULT_POLLUTANT, member_name
+from read_and_clean_data import download_gios_pollutants, clean_data, get_common_stations
+from station_registry import as_registry
+
+
+GIOS_ARCHIVE_URL = "https://powietrze.gios.gov.pl/pjp/archives/downloadFile/"
+
+
+def _ingest_year(year, config, df_metadata, gios_archive_url, cache, instrument=False, pollutants=(DEFAULT_POLLUTANT,)):
+    """
+    Pobiera i czyści dane jednego roku dla wskaźników pollutants (uruchamiane w procesie roboczym).
+
+    Archiwum roku otwierane jest raz, a arkusze wszystkich wskaźników czytane są
+    z tego samego otwarcia (download_gios_pollutants).
+
+    Zwraca krotkę (rok, słownik wskaźnik -> DataFrame, słownik wskaźnik -> komunikat błędu,
+    pomiary etapów). Pomiary są zbierane lokalnie w procesie i przekazywane do procesu głównego.
+    """
+    if instrument:
+        instrumentation.enable()
+    first_record = len(instrumentation.records)
+    frames, errors = {}, {}
+    try:
+        raw_frames = download_gios_pollutants(year, config, pollutants, gios_archive_url, cache=cache)
+        for pollutant in pollutants:
+            if pollutant not in raw_frames:
+                errors[pollutant] = f"Brak pliku {member_name(year, config, pollutant)} w archiwum roku {year}"
+            else:
+                frames[pollutant] = clean_data(raw_frames.pop(pollutant), year, df_metadata, pollutant=pollutant)
+    except Exception as e:
+        for pollutant in pollutants:
+            if pollutant not in frames:
+                errors.setdefault(pollutant, f"{type(e).__name__}: {e}")
+
+    records = instrumentation.records[first_record:]
+    del instrumentation.records[first_record:]
+    return year, frames, errors, records
+
+
+def prefetch_archives(year_config, gios_archive_url=GIOS_ARCHIVE_URL, cache=None, max_downloads=DEFAULT_MAX_DOWNLOADS):
+    """
+    Pobiera archiwa wielu lat równocześnie do pamięci podręcznej.
+
+    Pobieranie (wątki, ograniczone max_downloads) jest oddzielone od czyszczenia
+    (procesy), więc wszystkie archiwa pobierają się naraz niezależnie od liczby procesów.
+
+    Zwraca słownik rok -> komunikat błędu dla archiwów, których nie udało się pobrać.
+    """
+    keys = {year: f"archive:{config['archive_id']}" for year, config in year_config.items()}
+    urls = {keys[year]: f"{gios_archive_url}{config['archive_id']}" for year, config in year_config.items()}
+    with stage('prefetch', rows_in=len(urls)) as measured:
+        downloader = Downloader(max_workers=max_downloads)
+        files, errors = downloader.fetch_many(urls, cache=cache)
+        for f in files.values():
+            f.close()
+        measured.bytes = downloader.throughput()['bytes']
+    return {year: errors[key] for year, key in keys.items() if key in errors}
+
+
+def ingest_pollutants(year_config, df_metadata, pollutants, gios_archive_url=GIOS_ARCHIVE_URL, max_workers=None,
+                      cache=None, max_downloads=DEFAULT_MAX_DOWNLOADS):
+    """
+    Pobiera i czyści dane wielu wskaźników dla wielu lat w jednym przebiegu po archiwach.
+
+    Każde archiwum roku pobierane jest raz (prefetch_archives), a potem w puli procesów
+    - jedno zadanie na rok - otwierane raz, z którego czytane i czyszczone są arkusze
+    wszystkich wskaźników (np. PM25, PM10, NO2; patrz pollutants.py).
+
+    Parametry:
+    year_config - słownik rok -> konfiguracja ('archive_id', opcjonalnie 'pm25_filename'
+                  i 'pollutants': wskaźnik -> nazwa pliku w archiwum)
+    pollutants - lista wskaźników
+    pozostałe jak w ingest_years
+
+    Zwraca krotkę (frames, errors): słownik wskaźnik -> {rok -> DataFrame w formacie
+    długim z kolumną wartości value_column(wskaźnik)} oraz słownik wskaźnik -> {rok -> komunikat błędu}
+    (także dla wskaźników, których pliku nie ma w archiwum roku).
+    """
+    years = sorted(year_config)
+    pollutants = list(pollutants)
+    frames = {pollutant: {} for pollutant in pollutants}
+    errors = {pollutant: {} for pollutant in pollutants}
+
+    # Bez pamięci podręcznej archiwa trafiają do tymczasowej, usuwanej po przetworzeniu
+    with tempfile.TemporaryDirectory() if cache is None else nullcontext() as tmp_dir:
+        if cache is None:
+            cache = DownloadCache(tmp_dir)
+        download_errors = prefetch_archives(year_config, gios_archive_url, cache, max_downloads)
+        for year, error in download_errors.items():
+            for pollutant in pollutants:
+                errors[pollutant][year] = f"Nie udało się pobrać danych dla roku {year}: {error}"
+        years = [year for year in years if year not in download_errors]
+
+        # Rejestr stacji budujemy raz i przekazujemy do wszystkich procesów
+        registry = as_registry(df_metadata)
+        args = [(year, year_config[year], registry, gios_archive_url, cache, instrumentation.enabled, tuple(pollutants))
+                for year in years]
+        if max_workers is None:
+            max_workers = min(len(years), os.cpu_count() or 1) or 1
+
+        if max_workers == 1:
+            results = [_ingest_year(*a) for a in args]
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                futures = [executor.submit(_ingest_year, *a) for a in args]
+                results = [future.result() for future in futures]
+
+    for year, year_frames, year_errors, records in results:
+        instrumentation.extend(records)
+        for pollutant, df_clean in year_frames.items():
+            frames[pollutant][year] = df_clean
+        for pollutant, error in year_errors.items():
+            errors[pollutant][year] = error
+    return frames, {pollutant: dict(sorted(errors[pollutant].items())) for pollutant in pollutants}
+
+
+def ingest_year_frames(year_config, df_metadata, gios_archive_url=GIOS_ARCHIVE_URL, max_workers=None, cache=None,
+                       max_downloads=DEFAULT_MAX_DOWNLOADS):
+    """
+    Pobiera i czyści dane dla wielu lat równolegle, zwracając osobny DataFrame dla każdego roku.
+
+    Parametry jak w ingest_years. Zwraca krotkę (frames, errors): słownik rok -> DataFrame
+    dla lat, które się powiodły, oraz słownik rok -> komunikat błędu.
+    """
+    frames, errors = ingest_pollutants(year_config, df_metadata, [DEFAULT_POLLUTANT], gios_archive_url,
+                                       max_workers, cache, max_downloads)
+    return frames[DEFAULT_POLLUTANT], errors[DEFAULT_POLLUTANT]
+
+
+def ingest_years(year_config, df_metadata, gios_archive_url=GIOS_ARCHIVE_URL, max_workers=None,
+                 cache=None, common_only=False, min_coverage=None, max_downloads=DEFAULT_MAX_DOWNLOADS):
+    """
+    Pobiera i czyści dane dla wielu lat równolegle w puli procesów.
+
+    Parametry:
+    year_config - słownik rok -> konfiguracja ('archive_id', 'pm25_filename')
+    df_metadata - metadane ze stacjami (DataFrame lub StationRegistry)
+    gios_archive_url - adres bazowy archiwów GIOŚ
+    max_workers - liczba procesów (domyślnie liczba rdzeni; 1 - przetwarzanie w bieżącym procesie)
+    cache - opcjonalna pamięć podręczna pobrań (DownloadCache); bez niej archiwa trafiają
+            do katalogu tymczasowego usuwanego po przetworzeniu
+    common_only - jeśli True, zostawia tylko stacje występujące we wszystkich latach
+    min_coverage - przy common_only: minimalna część ważnych dób stacji w każdym roku
+                   (np. 0.75; domyślnie wystarczy, że stacja występuje w danych)
+    max_downloads - maksymalna liczba archiwów pobieranych równocześnie (przed czyszczeniem)
+
+    Zwraca krotkę (df_all, errors), gdzie df_all to dane ze wszystkich lat połączone
+    w kolejności rosnących lat (None, jeśli żaden rok się nie powiódł), a errors to
+    słownik rok -> komunikat błędu.
+    """
+    years = sorted(year_config)
+    cleaned_data_dict, errors = ingest_year_frames(year_config, df_metadata, gios_archive_url, max_workers, cache,
+                                                   max_downloads)
+
+    if not cleaned_data_dict:
+        return None, errors
+
+    df_all = pd.concat([cleaned_data_dict[year] for year in years if year in cleaned_data_dict], ignore_index=True)
+
+    if common_only:
+        common_stations = get_common_stations(cleaned_data_dict, min_coverage)
+        df_all = df_all[df_all['kod_stacji'].isin(common_stations)].reset_index(drop=True)
+
+    return df_all, errors
@@ -0,0 +1,222 @@
+import functools
+import inspect
+import json
+import os
+import time
+
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # np. Windows
+    resource = None
+
+
+# Ustawienie zmiennej środowiskowej włącza pomiary od startu programu
+ENV_VARIABLE = 'PM25_INSTRUMENT'
+
+COLUMNS = ['stage', 'year', 'seconds', 'rows_in', 'rows_out', 'bytes', 'rss_bytes', 'rss_delta_bytes', 'peak_rss_bytes']
+
+
+def _rss_bytes():
+    """Bieżące zużycie pamięci procesu (RSS) w bajtach lub None, jeśli niedostępne."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _peak_rss_bytes():
+    """Szczytowe zużycie pamięci procesu od jego startu (ru_maxrss) w bajtach lub None."""
+    if resource is None:
+        return None
+    # Na Linuksie ru_maxrss jest w KiB
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class _NoopStage:
+    """Etap zwracany przy wyłączonych pomiarach: nic nie mierzy i ignoruje przypisania."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def __setattr__(self, name, value):
+        pass
+
+
+_NOOP_STAGE = _NoopStage()
+
+
+class Stage:
+    """
+    Mierzony etap przetwarzania (menedżer kontekstu).
+
+    W bloku with można uzupełnić rows_out (wiersze wyjściowe), bytes (np. rozmiar
+    pobranego lub zapisanego pliku) oraz dowolne dodatkowe pola w extra.
+    """
+
+    def __init__(self, recorder, name, year=None, rows_in=None, **extra):
+        self.recorder = recorder
+        self.name = name
+        self.year = year
+        self.rows_in = rows_in
+        self.rows_out = None
+        self.bytes = None
+        self.extra = extra
+
+    def __enter__(self):
+        self._rss_start = _rss_bytes()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        seconds = time.perf_counter() - self._start
+        rss = _rss_bytes()
+        record = {
+            'stage': self.name,
+            'year': self.year,
+            'seconds': seconds,
+            'rows_in': self.rows_in,
+            'rows_out': self.rows_out,
+            'bytes': self.bytes,
+            'rss_bytes': rss,
+            'rss_delta_bytes': rss - self._rss_start if rss is not None and self._rss_start is not None else None,
+            'peak_rss_bytes': _peak_rss_bytes(),
+        }
+        if exc_type is not None:
+            record['error'] = exc_type.__name__
+        record.update(self.extra)
+        self.recorder.records.append(record)
+        return False
+
+
+class Instrumentation:
+    """
+    Rejestr pomiarów etapów pipeline'u: czas, wiersze wejściowe i wyjściowe, bajty oraz pamięć.
+
+    Domyślnie wyłączony; wtedy stage zwraca współdzielony pusty obiekt, a dekorowane
+    funkcje wywoływane są bezpośrednio, więc koszt pomiarów jest pomijalny.
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.records = []
+
+    def enable(self):
+        self.enabled = True
+        return self
+
+    def disable(self):
+        self.enabled = False
+        return self
+
+    def reset(self):
+        self.records = []
+        return self
+
+    def stage(self, name, year=None, rows_in=None, **extra):
+        """Zwraca menedżer kontekstu mierzący etap (albo pusty, gdy pomiary są wyłączone)."""
+        if not self.enabled:
+            return _NOOP_STAGE
+        return Stage(self, name, year, rows_in, **extra)
+
+    def extend(self, records):
+        """Dołącza pomiary zebrane gdzie indziej (np. w procesach roboczych)."""
+        self.records.extend(records)
+
+    def to_frame(self):
+        """Pomiary jako DataFrame (jeden wiersz na wykonanie etapu)."""
+        frame = pd.DataFrame(self.records)
+        for column in COLUMNS:
+            if column not in frame.columns:
+                frame[column] = None
+        extra = [c for c in frame.columns if c not in COLUMNS]
+        return frame[COLUMNS + extra]
+
+    def summary(self, by_year=True):
+        """
+        Tabela podsumowująca: suma czasu, wierszy i bajtów oraz maksimum pamięci dla każdego
+        etapu (i roku), posortowana malejąco po czasie.
+        """
+        frame = self.to_frame()
+        keys = ['stage', 'year'] if by_year else ['stage']
+        if frame.empty:
+            return pd.DataFrame(columns=keys + ['calls', 'seconds', 'rows_in', 'rows_out', 'bytes', 'peak_rss_bytes'])
+        frame['year'] = frame['year'].astype('object').where(frame['year'].notna(), '-')
+        numeric = ['seconds', 'rows_in', 'rows_out', 'bytes', 'peak_rss_bytes']
+        frame[numeric] = frame[numeric].apply(pd.to_numeric, errors='coerce')
+        summary = frame.groupby(keys, sort=False).agg(
+            calls=('seconds', 'size'),
+            seconds=('seconds', 'sum'),
+            rows_in=('rows_in', 'sum'),
+            rows_out=('rows_out', 'sum'),
+            bytes=('bytes', 'sum'),
+            peak_rss_bytes=('peak_rss_bytes', 'max'),
+        )
+        return summary.sort_values('seconds', ascending=False).reset_index()
+
+    def print_summary(self, by_year=True):
+        print(self.summary(by_year).to_string(index=False))
+
+    def to_json(self, path=None):
+        """Zwraca pomiary jako tekst JSON; jeśli podano path, zapisuje je też do pliku."""
+        text = json.dumps(self.records, indent=2, ensure_ascii=False, default=str)
+        if path is not None:
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(text)
+        return text
+
+
+# Globalny rejestr używany przez moduły pipeline'u
+instrumentation = Instrumentation(enabled=os.environ.get(ENV_VARIABLE, '') not in ('', '0'))
+
+
+def stage(name, year=None, rows_in=None, **extra):
+    """Menedżer kontekstu mierzący etap w globalnym rejestrze."""
+    return instrumentation.stage(name, year, rows_in, **extra)
+
+
+def _length(value):
+    if isinstance(value, tuple) and value:
+        value = value[0]
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return len(value)
+    return None
+
+
+def instrumented(name=None):
+    """
+    Dekorator mierzący wywołania funkcji jako etap globalnego rejestru.
+
+    Wiersze wejściowe to długość pierwszego argumentu będącego DataFrame'em, wiersze
+    wyjściowe - długość wyniku (lub pierwszego elementu zwróconej krotki). Rok jest
+    brany z argumentu 'year', jeśli funkcja go ma.
+    """
+    def decorator(function):
+        stage_name = name or function.__name__
+        signature = inspect.signature(function)
+        has_year = 'year' in signature.parameters
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not instrumentation.enabled:
+                return function(*args, **kwargs)
+
+            year = None
+            if has_year:
+                year = signature.bind_partial(*args, **kwargs).arguments.get('year')
+            rows_in = next((len(a) for a in args if isinstance(a, pd.DataFrame)), None)
+            with Stage(instrumentation, stage_name, year, rows_in) as measured:
+                result = function(*args, **kwargs)
+                measured.rows_out = _length(result)
+            return result
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,455 @@
+import argparse
+import ast
+import hashlib
+import importlib.util
+import json
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from data_analysis import load_data, calculate_daily_stats, calculate_monthly_stats, merge_stats, save_to_csv
+from chunked import chunked_stats, merge_stats_chunked
+from completeness import CompletenessIndex
+from download_cache import DownloadCache
+from ingestion import GIOS_ARCHIVE_URL, ingest_year_frames
+from read_and_clean_data import download_metadata, get_common_stations, save_cleaned_data
+from snapshot import snapshot_path
+from storage import is_dataset_path
+
+
+METADATA_URL = "https://powietrze.gios.gov.pl/pjp/archives/downloadFile/622"
+
+YEAR_CONFIG = {
+    2015: {'archive_id': '236', 'pm25_filename': '2015_PM25_1g.xlsx'},
+    2018: {'archive_id': '603', 'pm25_filename': '2018_PM25_1g.xlsx'},
+    2021: {'archive_id': '486', 'pm25_filename': '2021_PM25_1g.xlsx'},
+    2024: {'archive_id': '582', 'pm25_filename': '2024_PM25_1g.xlsx'},
+}
+
+# Zmiana tej wartości unieważnia wszystkie artefakty (np. po zmianie formatu plików pośrednich)
+PIPELINE_VERSION = 1
+
+# Moduły wywoływane bezpośrednio przez każdy rodzaj etapu; wersję kodu etapu wyznaczają
+# one razem ze wszystkimi modułami projektu, które importują (stage_modules)
+STAGE_MODULES = {
+    'metadata': ['read_and_clean_data'],
+    'clean': ['ingestion', 'read_and_clean_data'],
+    'combined': ['read_and_clean_data', 'storage', 'completeness', 'snapshot'],
+    'daily': ['data_analysis', 'chunked'],
+    'monthly': ['data_analysis', 'chunked'],
+    'merged': ['data_analysis', 'chunked'],
+}
+
+PROJECT_DIR = Path(__file__).resolve().parent
+
+MANIFEST_FILE = 'manifest.json'
+
+
+def _module_hash(name):
+    """Skrót kodu źródłowego modułu (wersja kodu etapu)."""
+    spec = importlib.util.find_spec(name)
+    with open(spec.origin, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _project_module(name):
+    """Zwraca nazwę modułu projektu (plik w PROJECT_DIR) dla importu name albo None."""
+    top = name.split('.')[0]
+    try:
+        spec = importlib.util.find_spec(top)
+    except (ImportError, ValueError):
+        return None
+    if spec is None or not spec.has_location or Path(spec.origin).resolve().parent != PROJECT_DIR:
+        return None
+    return top
+
+
+def _imported_modules(name):
+    """Moduły projektu importowane przez moduł name (także importy wewnątrz funkcji)."""
+    spec = importlib.util.find_spec(name)
+    with open(spec.origin, 'rb') as f:
+        tree = ast.parse(f.read(), filename=spec.origin)
+    imported = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            imported.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+            imported.add(node.module)
+    return {module for module in map(_project_module, imported) if module is not None}
+
+
+def stage_modules(kind):
+    """
+    Moduły, od których kodu zależy wynik etapu rodzaju kind: moduły z STAGE_MODULES
+    i wszystkie moduły projektu importowane przez nie pośrednio lub bezpośrednio.
+    """
+    modules = set()
+    pending = list(STAGE_MODULES[kind])
+    while pending:
+        name = pending.pop()
+        if name not in modules:
+            modules.add(name)
+            pending.extend(_imported_modules(name) - modules)
+    return sorted(modules)
+
+
+def _digest(payload):
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+class Pipeline:
+    """
+    Pipeline pobieranie → czyszczenie → łączenie lat → statystyki → łączenie ze statystykami,
+    uruchamiany jak make: wykonywane są tylko etapy, których artefakty są nieaktualne.
+
+    Każdy etap ma odcisk (fingerprint) liczony z jego parametrów, kodu modułów, od których
+    zależy, i odcisków etapów wejściowych. Odciski zbudowanych artefaktów zapisywane są
+    w manifeście w katalogu build_dir; etap jest wykonywany ponownie tylko wtedy, gdy jego
+    odcisk się zmienił albo brakuje plików wynikowych. Dane każdego roku są osobnym
+    artefaktem, więc np. zmiana progu normy przelicza tylko statystyki dobowe i wynik
+    końcowy, bez ponownego pobierania i czyszczenia lat.
+
+    Parametry:
+    year_config - słownik rok -> konfiguracja ('archive_id', 'pm25_filename')
+    build_dir - katalog artefaktów pośrednich i manifestu
+    output_path - plik z oczyszczonymi danymi (CSV albo zbiór Parquet, jak w save_cleaned_data)
+    stats_output_path - plik CSV z danymi połączonymi ze statystykami
+    norm_threshold - próg normy dobowej
+    common_only - czy zostawić tylko stacje występujące we wszystkich latach
+    min_coverage - przy common_only: minimalna część ważnych dób stacji w każdym roku (np. 0.75)
+    chunk_rows - jeśli podano, statystyki i plik wynikowy liczone są fragmentami po tyle
+                 wierszy (chunked.py), bez wczytywania całych danych do pamięci
+    gios_archive_url, metadata_url - adresy źródeł danych
+    max_workers - liczba procesów przy czyszczeniu lat
+    cache - pamięć podręczna pobrań (domyślnie DownloadCache w build_dir)
+    """
+
+    def __init__(self, year_config=None, build_dir='.pipeline', output_path='pm25_cleaned.csv',
+                 stats_output_path='pm25_with_stats.csv', norm_threshold=15, common_only=True,
+                 gios_archive_url=GIOS_ARCHIVE_URL, metadata_url=METADATA_URL, max_workers=None, cache=None,
+                 min_coverage=None, chunk_rows=None):
+        self.year_config = {int(year): config for year, config in (year_config or YEAR_CONFIG).items()}
+        self.build_dir = Path(build_dir)
+        self.output_path = str(output_path)
+        self.stats_output_path = str(stats_output_path)
+        self.norm_threshold = norm_threshold
+        self.common_only = common_only
+        self.min_coverage = min_coverage
+        self.chunk_rows = chunk_rows
+        self.gios_archive_url = gios_archive_url
+        self.metadata_url = metadata_url
+        self.max_workers = max_workers
+        self.cache = cache if cache is not None else DownloadCache(self.build_dir / 'downloads')
+
+        self.manifest = self._read_manifest()
+        self.errors = {}
+        self._code_hashes = {}
+        self._frames = {}
+
+    # --- Graf etapów ---
+
+    @property
+    def years(self):
+        return sorted(self.year_config)
+
+    def stage_names(self):
+        """Etapy w kolejności wykonywania (porządek topologiczny)."""
+        return ['metadata'] + [f'clean_{year}' for year in self.years] + ['combined', 'daily', 'monthly', 'merged']
+
+    def _kind(self, name):
+        return 'clean' if name.startswith('clean_') else name
+
+    def _year(self, name):
+        return int(name.split('_', 1)[1])
+
+    def dependencies(self, name, built_only=False):
+        """Etapy wejściowe; dla 'combined' z built_only=True tylko lata, które się zbudowały."""
+        kind = self._kind(name)
+        if kind == 'metadata':
+            return []
+        if kind == 'clean':
+            return ['metadata']
+        if kind == 'combined':
+            years = [f'clean_{year}' for year in self.years]
+            return [y for y in years if self.is_fresh(y)] if built_only else years
+        if kind in ('daily', 'monthly'):
+            return ['combined']
+        return ['combined', 'daily', 'monthly']
+
+    def parameters(self, name):
+        """Parametry etapu, które wpływają na jego wynik."""
+        kind = self._kind(name)
+        if kind == 'metadata':
+            return {'url': self.metadata_url}
+        if kind == 'clean':
+            return {'year': self._year(name), 'config': self.year_config[self._year(name)], 'url': self.gios_archive_url}
+        if kind == 'combined':
+            return {'common_only': self.common_only, 'min_coverage': self.min_coverage, 'output_path': self.output_path}
+        if kind == 'daily':
+            return {'norm_threshold': self.norm_threshold}
+        if kind == 'merged':
+            return {'stats_output_path': self.stats_output_path}
+        return {}
+
+    def outputs(self, name):
+        """Pliki wynikowe etapu."""
+        kind = self._kind(name)
+        if kind == 'metadata':
+            return [self.build_dir / 'metadata.pkl']
+        if kind == 'clean':
+            year = self._year(name)
+            return [self.build_dir / 'clean' / f'{year}.parquet', self.build_dir / 'clean' / f'{year}.completeness.npz']
+        if kind == 'combined':
+            outputs = [Path(self.output_path), self.build_dir / 'completeness.npz']
+            if not is_dataset_path(self.output_path):
+                # Migawka obok pliku CSV do szybkiego wczytywania w notebookach
+                outputs.append(snapshot_path(self.output_path))
+            return outputs
+        if kind in ('daily', 'monthly'):
+            return [self.build_dir / f'{kind}.parquet']
+        return [Path(self.stats_output_path)]
+
+    def _code_hash(self, kind):
+        if kind not in self._code_hashes:
+            self._code_hashes[kind] = _digest({module: _module_hash(module) for module in stage_modules(kind)})
+        return self._code_hashes[kind]
+
+    def fingerprint(self, name, built_only=True):
+        """Odcisk etapu: parametry, wersja kodu i odciski etapów wejściowych."""
+        return _digest({
+            'stage': name,
+            'version': PIPELINE_VERSION,
+            'parameters': self.parameters(name),
+            'code': self._code_hash(self._kind(name)),
+            'inputs': {dep: self.fingerprint(dep, built_only) for dep in self.dependencies(name, built_only)},
+        })
+
+    # --- Manifest ---
+
+    def _read_manifest(self):
+        path = self.build_dir / MANIFEST_FILE
+        if path.exists():
+            with open(path, encoding='utf-8') as f:
+                return json.load(f)
+        return {}
+
+    def _write_manifest(self):
+        self.build_dir.mkdir(parents=True, exist_ok=True)
+        tmp = self.build_dir / (MANIFEST_FILE + '.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, indent=2, ensure_ascii=False)
+        tmp.replace(self.build_dir / MANIFEST_FILE)
+
+    def is_fresh(self, name, built_only=True):
+        """Czy artefakt etapu jest aktualny (zgodny odcisk i istniejące pliki)."""
+        entry = self.manifest.get(name)
+        return (
+            entry is not None
+            and entry.get('fingerprint') == self.fingerprint(name, built_only)
+            and all(Path(p).exists() for p in self.outputs(name))
+        )
+
+    def failed_before(self, name):
+        """Czy ostatnia próba zbudowania etapu z tym samym odciskiem się nie powiodła (np. brak archiwum roku)."""
+        entry = self.manifest.get(name)
+        return entry is not None and entry.get('failed') == self.fingerprint(name)
+
+    def plan(self):
+        """
+        Etapy, które wykona run(), wyznaczone z tymi samymi odciskami co w run().
+
+        Etap jest nieaktualny, jeśli jego odcisk nie zgadza się z manifestem albo
+        nieaktualny jest któryś z etapów wejściowych. Lata, których ostatnia próba
+        z tym samym odciskiem się nie powiodła, run() ponawia, ale nie trafiają do
+        planu - zakładamy, że znów się nie powiodą i nie zmienią etapów zależnych.
+        """
+        stale = set()
+        for name in self.stage_names():
+            if self.failed_before(name):
+                continue
+            deps = self.dependencies(name)
+            if any(dep in stale for dep in deps) or not self.is_fresh(name):
+                stale.add(name)
+        return [name for name in self.stage_names() if name in stale]
+
+    def _mark_built(self, name, seconds):
+        self.manifest[name] = {
+            'fingerprint': self.fingerprint(name),
+            'outputs': [str(p) for p in self.outputs(name)],
+            'seconds': round(seconds, 3),
+            'built_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        }
+        self._write_manifest()
+
+    def _mark_failed(self, name, error):
+        """Zapisuje w manifeście nieudaną próbę (odcisk i błąd), zachowując poprzedni wpis."""
+        entry = self.manifest.setdefault(name, {})
+        entry['failed'] = self.fingerprint(name)
+        entry['error'] = error
+        self._write_manifest()
+
+    # --- Budowanie artefaktów ---
+
+    def _metadata(self):
+        if 'metadata' not in self._frames:
+            self._frames['metadata'] = pd.read_pickle(self.outputs('metadata')[0])
+        return self._frames['metadata']
+
+    def _combined(self):
+        if 'combined' not in self._frames:
+            self._frames['combined'] = load_data(self.output_path)
+        return self._frames['combined']
+
+    def _chunked_stats(self):
+        """Statystyki liczone fragmentami (jeden przebieg dla statystyk dobowych i miesięcznych)."""
+        if 'chunked_stats' not in self._frames:
+            self._frames['chunked_stats'] = chunked_stats(self.output_path, self.norm_threshold, self.chunk_rows)
+        return self._frames['chunked_stats']
+
+    def _build_metadata(self):
+        df_metadata = download_metadata(self.metadata_url, cache=self.cache)
+        if df_metadata is None:
+            raise RuntimeError("Nie udało się pobrać metadanych")
+        path = self.outputs('metadata')[0]
+        path.parent.mkdir(parents=True, exist_ok=True)
+        df_metadata.to_pickle(path)
+        self._frames['metadata'] = df_metadata
+
+    def _build_years(self, names):
+        """Czyści wszystkie nieaktualne lata naraz (równolegle w puli procesów)."""
+        config = {self._year(name): self.year_config[self._year(name)] for name in names}
+        start = time.perf_counter()
+        frames, errors = ingest_year_frames(config, self._metadata(), self.gios_archive_url,
+                                            max_workers=self.max_workers, cache=self.cache)
+        seconds = (time.perf_counter() - start) / max(len(names), 1)
+        for year, error in errors.items():
+            self.errors[f'clean_{year}'] = error
+            self._mark_failed(f'clean_{year}', error)
+            print(f"Błąd dla roku {year}: {error}")
+        for year, df_clean in frames.items():
+            path, completeness_path = self.outputs(f'clean_{year}')
+            path.parent.mkdir(parents=True, exist_ok=True)
+            df_clean.to_parquet(path, index=False)
+            CompletenessIndex.from_hourly(df_clean).save(completeness_path)
+            self._mark_built(f'clean_{year}', seconds)
+
+    def _build_combined(self):
+        years = [self._year(name) for name in self.dependencies('combined', built_only=True)]
+        if not years:
+            raise RuntimeError("Brak danych do połączenia")
+        cleaned_data_dict = {year: pd.read_parquet(self.outputs(f'clean_{year}')[0]) for year in years}
+        completeness = CompletenessIndex.combine([CompletenessIndex.load(self.outputs(f'clean_{year}')[1]) for year in years])
+        completeness.save(self.outputs('combined')[1])
+        df_all = pd.concat(cleaned_data_dict.values(), ignore_index=True)
+        if self.common_only:
+            common_stations = get_common_stations(cleaned_data_dict, self.min_coverage, completeness)
+            df_all = df_all[df_all['kod_stacji'].isin(common_stations)].reset_index(drop=True)
+        save_cleaned_data(df_all, self.output_path, snapshot=True)
+        self._frames.pop('combined', None)
+        self._frames.pop('chunked_stats', None)
+
+    def _build_daily(self):
+        if self.chunk_rows:
+            daily = self._chunked_stats()[0]
+        else:
+            daily = calculate_daily_stats(self._combined(), self.norm_threshold)
+        daily.to_parquet(self.outputs('daily')[0], index=False)
+
+    def _build_monthly(self):
+        if self.chunk_rows:
+            monthly = self._chunked_stats()[1]
+        else:
+            monthly = calculate_monthly_stats(self._combined())
+        monthly.to_parquet(self.outputs('monthly')[0], index=False)
+
+    def _build_merged(self):
+        daily = pd.read_parquet(self.outputs('daily')[0])
+        monthly = pd.read_parquet(self.outputs('monthly')[0])
+        if self.chunk_rows:
+            merge_stats_chunked(self.output_path, daily, monthly, self.stats_output_path, self.chunk_rows)
+        else:
+            save_to_csv(merge_stats(self._combined().copy(), daily, monthly), self.stats_output_path)
+
+    def run(self, force=False, dry_run=False):
+        """
+        Wykonuje nieaktualne etapy w kolejności zależności.
+
+        Parametry:
+        force - wykonaj wszystkie etapy niezależnie od manifestu
+        dry_run - tylko zwróć listę etapów do wykonania
+
+        Zwraca listę wykonanych (lub, przy dry_run, zaplanowanych) etapów.
+        """
+        planned = self.stage_names() if force else self.plan()
+        if dry_run:
+            return planned
+
+        self.build_dir.mkdir(parents=True, exist_ok=True)
+        executed = []
+        # Lata z nieudaną poprzednią próbą też są ponawiane
+        stale_years = [name for name in self.stage_names()
+                       if self._kind(name) == 'clean' and (force or not self.is_fresh(name))]
+        for name in self.stage_names():
+            kind = self._kind(name)
+            if kind == 'clean':
+                if stale_years and name == stale_years[0]:
+                    print(f"Etap: czyszczenie lat {[self._year(n) for n in stale_years]}")
+                    self._build_years(stale_years)
+                    executed += [n for n in stale_years if n not in self.errors]
+                continue
+            if not force and self.is_fresh(name):
+                continue
+
+            print(f"Etap: {name}")
+            start = time.perf_counter()
+            getattr(self, f'_build_{kind}')()
+            self._mark_built(name, time.perf_counter() - start)
+            executed.append(name)
+        return executed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pipeline danych PM2.5 (wykonuje tylko nieaktualne etapy)")
+    parser.add_argument('--years', type=int, nargs='+', help="lata do przetworzenia (domyślnie wszystkie z konfiguracji)")
+    parser.add_argument('--config', help="plik JSON z konfiguracją lat: {rok: {archive_id, pm25_filename}}")
+    parser.add_argument('--build-dir', default='.pipeline', help="katalog artefaktów pośrednich")
+    parser.add_argument('--output', default='pm25_cleaned.csv', help="plik z oczyszczonymi danymi")
+    parser.add_argument('--stats-output', default='pm25_with_stats.csv', help="plik z danymi i statystykami")
+    parser.add_argument('--norm-threshold', type=float, default=15, help="próg normy dobowej (μg/m^3)")
+    parser.add_argument('--all-stations', action='store_true', help="nie ograniczaj danych do stacji wspólnych dla wszystkich lat")
+    parser.add_argument('--min-coverage', type=float, help="minimalna część ważnych dób stacji w każdym roku (np. 0.75)")
+    parser.add_argument('--archive-url', default=GIOS_ARCHIVE_URL)
+    parser.add_argument('--metadata-url', default=METADATA_URL)
+    parser.add_argument('--workers', type=int, help="liczba procesów przy czyszczeniu lat")
+    parser.add_argument('--chunk-rows', type=int, help="licz statystyki fragmentami po tyle wierszy (dla danych większych niż pamięć)")
+    parser.add_argument('--force', action='store_true', help="wykonaj wszystkie etapy")
+    parser.add_argument('--dry-run', action='store_true', help="tylko pokaż etapy do wykonania")
+    args = parser.parse_args(argv)
+
+    year_config = YEAR_CONFIG
+    if args.config:
+        with open(args.config, encoding='utf-8') as f:
+            year_config = {int(year): config for year, config in json.load(f).items()}
+    if args.years:
+        missing = [year for year in args.years if year not in year_config]
+        if missing:
+            print(f"Brak konfiguracji dla lat: {missing}")
+            return 2
+        year_config = {year: year_config[year] for year in args.years}
+
+    pipeline = Pipeline(year_config, args.build_dir, args.output, args.stats_output, args.norm_threshold,
+                        not args.all_stations, args.archive_url, args.metadata_url, args.workers,
+                        min_coverage=args.min_coverage, chunk_rows=args.chunk_rows)
+    stages = pipeline.run(force=args.force, dry_run=args.dry_run)
+
+    if args.dry_run:
+        print(f"Etapy do wykonania: {stages if stages else 'brak (wszystko aktualne)'}")
+    else:
+        print(f"Wykonane etapy: {stages if stages else 'brak (wszystko aktualne)'}")
+    return 1 if pipeline.errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
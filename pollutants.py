@@ -0,0 +1,56 @@
+from pathlib import Path
+
+
+# Wskaźniki z archiwów GIOŚ (nazwy jak w plikach, np. 2024_PM10_1g.xlsx) i nazwy kolumn wartości
+POLLUTANTS = {
+    'PM25': 'pm25',
+    'PM10': 'pm10',
+    'NO2': 'no2',
+    'NOx': 'nox',
+    'O3': 'o3',
+    'SO2': 'so2',
+    'CO': 'co',
+    'C6H6': 'c6h6',
+}
+
+DEFAULT_POLLUTANT = 'PM25'
+
+# Kolumny z wartościami pomiarów (zapisywane jako float32 w storage.py i snapshot.py)
+VALUE_COLUMNS = tuple(POLLUTANTS.values())
+
+
+def value_column(pollutant=DEFAULT_POLLUTANT):
+    """Nazwa kolumny z wartościami wskaźnika w danych w formacie długim (np. 'PM10' -> 'pm10')."""
+    if pollutant not in POLLUTANTS:
+        raise ValueError(f"Nieznany wskaźnik '{pollutant}', dostępne: {', '.join(POLLUTANTS)}")
+    return POLLUTANTS[pollutant]
+
+
+def member_name(year, config, pollutant=DEFAULT_POLLUTANT):
+    """
+    Nazwa pliku ze wskaźnikiem w archiwum roku.
+
+    Kolejno: config['pollutants'][pollutant], dla PM2.5 config['pm25_filename'],
+    a w pozostałych przypadkach nazwa według wzorca GIOŚ '{rok}_{wskaźnik}_1g.xlsx'.
+    """
+    value_column(pollutant)
+    members = config.get('pollutants') or {}
+    if pollutant in members:
+        return members[pollutant]
+    if pollutant == DEFAULT_POLLUTANT and 'pm25_filename' in config:
+        return config['pm25_filename']
+    return f"{year}_{pollutant}_1g.xlsx"
+
+
+def cleaned_path(pollutant, output_path='pm25_cleaned.csv'):
+    """
+    Ścieżka oczyszczonych danych wskaźnika obok output_path.
+
+    Przedrostek 'pm25' nazwy pliku zastępowany jest kolumną wskaźnika
+    (pm25_cleaned.csv -> pm10_cleaned.csv); inne nazwy dostają ją jako przyrostek.
+    """
+    path = Path(output_path)
+    prefix = value_column(DEFAULT_POLLUTANT)
+    if path.name.startswith(prefix):
+        return path.with_name(value_column(pollutant) + path.name[len(prefix):])
+    return path.with_name(f"{path.stem}_{value_column(pollutant)}{path.suffix}")
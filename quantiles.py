@@ -0,0 +1,273 @@
+import numpy as np
+import pandas as pd
+
+from aggregation import _codes
+from pollutants import DEFAULT_POLLUTANT, value_column
+from rollup import COUNTRY, LEVELS
+from station_registry import as_registry
+
+
+# Domyślny względny błąd percentyli (1%)
+DEFAULT_RELATIVE_ACCURACY = 0.01
+
+# Wartości mniejsze (także 0 i ujemne) trafiają do kubełka zerowego i są zwracane jako 0
+MIN_VALUE = 0.01
+
+# Indeks kubełka zerowego (mniejszy od indeksów wszystkich kubełków logarytmicznych)
+ZERO_BUCKET = np.iinfo(np.int32).min
+
+# Klucze grup bazowych: stacja i miesiąc
+BASE_KEYS = ['Miejscowość', 'kod_stacji', 'rok', 'miesiac']
+
+# Okresy zapytań: kolumny kluczy (None - cały zakres danych)
+PERIODS = {
+    'month': ['rok', 'miesiac'],
+    'year': ['rok'],
+    'all': [],
+}
+
+
+def _group_codes(keys, columns):
+    """Kody grup (0 .. n - 1, w porządku posortowanym; -1 dla braków w kluczach) i tabela unikalnych kluczy."""
+    groups = keys.groupby(columns, sort=True, dropna=True, observed=True)
+    codes = groups.ngroup().to_numpy(dtype=np.int64)
+    return codes, groups.size().index.to_frame(index=False)
+
+
+def _sum_counts(group, bucket, count):
+    """Sumuje liczniki powtarzających się par (grupa, kubełek); wynik posortowany po grupie i kubełku."""
+    pairs = group.astype(np.int64) << 32 | (bucket.astype(np.int64) - ZERO_BUCKET)
+    unique, inverse = np.unique(pairs, return_inverse=True)
+    counts = np.bincount(inverse, weights=count, minlength=len(unique)).astype(np.int64)
+    return unique >> 32, ((unique & 0xFFFFFFFF) + ZERO_BUCKET).astype(np.int32), counts
+
+
+class QuantileSketches:
+    """
+    Szkice rozkładu wartości (percentyle) dla każdej stacji i miesiąca, w stylu DDSketch.
+
+    Każda wartość trafia do kubełka logarytmicznego ceil(log_γ(x)), γ = (1 + α) / (1 - α),
+    a szkic to liczby wartości w kubełkach. Percentyl zwracany jest jako środek kubełka,
+    w którym wypada jego ranga, więc różni się od dokładnej statystyki pozycyjnej
+    (wartość o randze floor(q * (n - 1))) najwyżej o α względnie; wartości poniżej
+    MIN_VALUE zwracane są jako 0. Szkice łączy się przez dodawanie liczników, więc
+    można je budować fragmentami, osobno dla lat i scalać do miejscowości, województw
+    i kraju bez ponownego czytania danych godzinowych.
+
+    Liczniki przechowywane są rzadko: trójki (grupa, kubełek, liczba) posortowane
+    po grupie i kubełku (zwykle 100-200 niepustych kubełków na stację i miesiąc).
+
+    Parametry:
+    keys - tabela kluczy grup (kolumny BASE_KEYS, opcjonalnie 'Województwo'), wiersz i - grupa i
+    group, bucket, count - niepuste kubełki szkiców
+    relative_accuracy - względny błąd α
+    value_column - kolumna wskaźnika, z której zbudowano szkice (np. 'pm25')
+    """
+
+    def __init__(self, keys, group, bucket, count, relative_accuracy=DEFAULT_RELATIVE_ACCURACY, value_column='pm25'):
+        self.keys = keys.reset_index(drop=True)
+        self.group = np.asarray(group, dtype=np.int64)
+        self.bucket = np.asarray(bucket, dtype=np.int32)
+        self.count = np.asarray(count, dtype=np.int64)
+        self.relative_accuracy = float(relative_accuracy)
+        self.value_column = value_column
+        self._log_gamma = np.log((1 + self.relative_accuracy) / (1 - self.relative_accuracy))
+
+    @classmethod
+    def from_hourly(cls, df, df_metadata=None, relative_accuracy=DEFAULT_RELATIVE_ACCURACY, pollutant=DEFAULT_POLLUTANT):
+        """
+        Buduje szkice stacji i miesięcy z danych godzinowych w formacie długim (jeden przebieg).
+
+        Stacje i miesiące kodowane są liczbami całkowitymi jak w aggregation.aggregate_stats,
+        a liczniki kubełków powstają z jednego sortowania par (grupa, kubełek).
+
+        df_metadata - opcjonalne metadane (DataFrame lub StationRegistry) do przypisania województw
+        pollutant - wskaźnik (np. 'PM10'; patrz pollutants.py)
+        """
+        column = value_column(pollutant)
+        city_codes, cities = _codes(df['Miejscowość'])
+        station_codes, stations = _codes(df['kod_stacji'])
+        months = df['data'].to_numpy().astype('datetime64[M]')
+        values = df[column].to_numpy(dtype='float64', na_value=np.nan)
+
+        # Wiersze bez klucza lub wartości są pomijane
+        valid = (city_codes >= 0) & (station_codes >= 0) & ~np.isnat(months) & ~np.isnan(values)
+        month_numbers = months.view(np.int64)[valid]
+        first_month = int(month_numbers.min()) if len(month_numbers) else 0
+        n_months = int(month_numbers.max()) - first_month + 1 if len(month_numbers) else 1
+
+        # Pary (miejscowość, stacja) numerowane gęsto, jak w aggregate_stats
+        combined = city_codes[valid].astype(np.int64) * len(stations) + station_codes[valid]
+        pairs = np.flatnonzero(np.bincount(combined, minlength=len(cities) * len(stations)))
+        pair_lookup = np.full(len(cities) * len(stations), -1, dtype=np.int64)
+        pair_lookup[pairs] = np.arange(len(pairs))
+        keys = pair_lookup.take(combined) * n_months + (month_numbers - first_month)
+
+        sketches = cls(pd.DataFrame(columns=BASE_KEYS), [], [], [], relative_accuracy, column)
+        group, bucket, count = _sum_counts(keys, sketches._buckets(values[valid]), np.ones(len(keys), dtype=np.int64))
+        # Numery grup tylko dla par (stacja, miesiąc) obecnych w danych
+        present, group = np.unique(group, return_inverse=True)
+        pair, month = pairs.take(present // n_months), present % n_months + first_month
+        sketches.keys = pd.DataFrame({
+            'Miejscowość': cities.take(pair // len(stations)),
+            'kod_stacji': stations.take(pair % len(stations)),
+            'rok': month // 12 + 1970,
+            'miesiac': month % 12 + 1,
+        })
+        sketches.group, sketches.bucket, sketches.count = group.astype(np.int64), bucket, count
+        return sketches.with_metadata(df_metadata) if df_metadata is not None else sketches
+
+    def _buckets(self, values):
+        """Indeksy kubełków dla wartości."""
+        buckets = np.full(len(values), ZERO_BUCKET, dtype=np.int32)
+        positive = values >= MIN_VALUE
+        buckets[positive] = np.ceil(np.log(values[positive]) / self._log_gamma).astype(np.int32)
+        return buckets
+
+    def _bucket_values(self, buckets):
+        """Wartości reprezentujące kubełki: środek przedziału (γ^(i-1), γ^i] w sensie błędu względnego."""
+        gamma = np.exp(self._log_gamma)
+        values = 2 * np.exp(buckets.astype(np.float64) * self._log_gamma) / (gamma + 1)
+        return np.where(buckets == ZERO_BUCKET, 0.0, values)
+
+    def with_metadata(self, df_metadata):
+        """Zwraca szkice z kolumną 'Województwo' w kluczach (z metadanych lub StationRegistry)."""
+        registry = as_registry(df_metadata)
+        keys = self.keys.copy()
+        if registry.has_voivodeships:
+            keys['Województwo'] = registry.voivodeship(keys['kod_stacji'])
+        return QuantileSketches(keys, self.group, self.bucket, self.count, self.relative_accuracy, self.value_column)
+
+    @property
+    def n_groups(self):
+        return len(self.keys)
+
+    @property
+    def has_voivodeships(self):
+        return 'Województwo' in self.keys.columns
+
+    def nbytes(self):
+        """Rozmiar liczników w pamięci (w bajtach)."""
+        return self.group.nbytes + self.bucket.nbytes + self.count.nbytes
+
+    @classmethod
+    def merge(cls, sketches):
+        """
+        Łączy szkice (np. z kolejnych fragmentów danych albo lat) w jeden zbiór.
+
+        Szkice tej samej stacji i miesiąca są sumowane. Wszystkie muszą mieć ten sam
+        względny błąd i kolumnę wskaźnika.
+        """
+        sketches = list(sketches)
+        if not sketches:
+            raise ValueError("Brak szkiców do połączenia")
+        first = sketches[0]
+        if any(s.relative_accuracy != first.relative_accuracy or s.value_column != first.value_column
+               for s in sketches):
+            raise ValueError("Szkice mają różny błąd względny lub wskaźnik")
+
+        keys = pd.concat([s.keys for s in sketches], ignore_index=True)
+        offsets = np.cumsum([0] + [s.n_groups for s in sketches])
+        codes, unique_keys = _group_codes(keys[BASE_KEYS], BASE_KEYS)
+        if first.has_voivodeships and all(s.has_voivodeships for s in sketches):
+            unique_keys['Województwo'] = keys.groupby(codes)['Województwo'].first().to_numpy()
+
+        group = np.concatenate([codes[offset + s.group] for offset, s in zip(offsets, sketches)])
+        bucket = np.concatenate([s.bucket for s in sketches])
+        count = np.concatenate([s.count for s in sketches])
+        group, bucket, count = _sum_counts(group, bucket, count)
+        return cls(unique_keys, group, bucket, count, first.relative_accuracy, first.value_column)
+
+    def quantiles(self, q=(0.5, 0.9, 0.98), level='station', period='month', names=None, years=None):
+        """
+        Przybliżone percentyle dla jednostek danego poziomu w kolejnych okresach.
+
+        Każda wartość różni się od dokładnej statystyki pozycyjnej (ranga floor(q * (n - 1))
+        wśród pomiarów grupy) najwyżej o relative_accuracy względnie (wartości poniżej
+        MIN_VALUE zwracane są jako 0). Błąd zapisany jest też w attrs['blad_wzgledny'] wyniku.
+
+        Parametry:
+        q - lista kwantyli z przedziału [0, 1] (np. 0.5 - mediana, 0.98 - P98)
+        level - 'station', 'city', 'voivodeship' lub 'country'
+        period - 'month', 'year' lub 'all'
+        names - opcjonalna lista jednostek (np. miejscowości; dla stacji - miejscowości stacji)
+        years - opcjonalna lista lat
+
+        Zwraca DataFrame z kolumnami kluczy poziomu i okresu, 'liczba_pomiarow'
+        oraz kolumną dla każdego kwantyla (np. 'pm25_p50', 'pm25_p98').
+        """
+        if level not in LEVELS:
+            raise ValueError(f"Nieznany poziom '{level}', dostępne: {', '.join(LEVELS)}")
+        if level == 'voivodeship' and not self.has_voivodeships:
+            raise KeyError("Szkice zbudowano bez metadanych z województwami")
+        if period not in PERIODS:
+            raise ValueError(f"Nieznany okres '{period}', dostępne: {', '.join(PERIODS)}")
+        q = np.atleast_1d(np.asarray(q, dtype=np.float64))
+        if ((q < 0) | (q > 1)).any():
+            raise ValueError("Kwantyle muszą należeć do przedziału [0, 1]")
+
+        keys = self.keys.assign(Kraj=COUNTRY)
+        selected = np.ones(self.n_groups, dtype=bool)
+        if names is not None:
+            selected &= keys[LEVELS[level][0]].isin(list(np.atleast_1d(names))).to_numpy()
+        if years is not None:
+            selected &= keys['rok'].isin(list(np.atleast_1d(years))).to_numpy()
+
+        # Grupy bazowe (stacja, miesiąc) przypisane do grup wyniku; odrzucone mają kod -1
+        columns = LEVELS[level] + PERIODS[period]
+        target = np.full(self.n_groups, -1, dtype=np.int64)
+        target[selected], result = _group_codes(keys[selected], columns)
+        mapped = target[self.group]
+        keep = mapped >= 0
+        group, bucket, count = _sum_counts(mapped[keep], self.bucket[keep], self.count[keep])
+
+        totals = np.bincount(group, weights=count, minlength=len(result)).astype(np.int64)
+        cumulative = np.cumsum(count)
+        starts = np.cumsum(totals) - totals
+        result['liczba_pomiarow'] = totals
+        for quantile in q:
+            # Pierwszy kubełek grupy, w którym skumulowana liczba przekracza rangę
+            rank = np.floor(quantile * (totals - 1))
+            position = np.searchsorted(cumulative, starts + rank, side='right')
+            values = self._bucket_values(bucket[np.minimum(position, len(bucket) - 1)])
+            result[f'{self.value_column}_p{100 * quantile:g}'] = np.where(totals > 0, values, np.nan)
+        result = result[result['liczba_pomiarow'] > 0].reset_index(drop=True)
+        result.attrs['blad_wzgledny'] = self.relative_accuracy
+        return result
+
+    def save(self, path):
+        """Zapisuje szkice do pliku .npz (liczniki, klucze grup i parametry)."""
+        keys = {}
+        for column in self.keys.columns:
+            values = self.keys[column]
+            if pd.api.types.is_numeric_dtype(values):
+                keys[f'klucz_{column}'] = values.to_numpy()
+            else:
+                # Braki (np. stacja bez województwa) zapisywane jako pusty tekst
+                keys[f'klucz_{column}'] = values.astype(object).where(values.notna(), '').to_numpy(dtype=str)
+        np.savez_compressed(
+            path,
+            group=self.group,
+            bucket=self.bucket,
+            count=self.count,
+            relative_accuracy=np.array(self.relative_accuracy),
+            value_column=np.array(self.value_column),
+            **keys,
+        )
+        return str(path)
+
+    @classmethod
+    def load(cls, path):
+        """Wczytuje szkice zapisane przez save."""
+        with np.load(path) as data:
+            keys = pd.DataFrame({
+                name[len('klucz_'):]: (pd.Series(data[name]).replace('', np.nan) if data[name].dtype.kind == 'U'
+                                       else data[name])
+                for name in data.files if name.startswith('klucz_')
+            })
+            return cls(keys, data['group'], data['bucket'], data['count'],
+                       float(data['relative_accuracy']), str(data['value_column']))
+
+    def __repr__(self):
+        return (f"QuantileSketches(groups={self.n_groups}, buckets={len(self.bucket)}, "
+                f"relative_accuracy={self.relative_accuracy})")
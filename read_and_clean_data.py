@@ -1,33 +1,89 @@
 import pandas as pd
-import requests
 import zipfile
-import io
-import re
+import os
+import numpy as np
+from completeness import CompletenessIndex
+from downloader import default_downloader, file_size
+from instrumentation import stage, instrumented
+from pollutants import DEFAULT_POLLUTANT, cleaned_path, member_name, value_column
+from sheet_layout import detect_layout, date_row_mask, header_regex
+from snapshot import is_snapshot_path, save_snapshot, snapshot_path
+from station_registry import as_registry
+from storage import is_dataset_path, save_dataset
+from timestamps import decode_hours
 
 
-def download_gios_archive(year, config, gios_archive_url="https://powietrze.gios.gov.pl/pjp/archives/downloadFile/"):
-    """Pobiera archiwum ZIP z danymi pomiarowymi dla danego roku."""
-    archive_id = config['archive_id']
-    filename = config['pm25_filename']
-    
-    # Pobranie archiwum ZIP do pamięci
-    url = f"{gios_archive_url}{archive_id}"
-    
-    try:
-        response = requests.get(url)
-        response.raise_for_status()  # jeśli błąd HTTP, zatrzymaj
-        
-        # Otwórz zip w pamięci
-        with zipfile.ZipFile(io.BytesIO(response.content)) as z:
+def _open(url, cache=None, key=None):
+    """Pobiera plik spod adresu URL strumieniowo (opcjonalnie przez pamięć podręczną) i zwraca go jako otwarty plik."""
+    return default_downloader().fetch(url, key=key, cache=cache)
+
+
+def read_gios_archive(year, archive, filename):
+    """
+    Wczytuje arkusz z danymi pomiarowymi z otwartego archiwum ZIP (plik albo ścieżka).
+
+    Zwraca None, jeśli w archiwum nie ma pliku filename.
+    """
+    return read_gios_members(year, archive, {None: filename}).get(None)
+
+
+def read_gios_members(year, archive, filenames):
+    """
+    Wczytuje kilka arkuszy (np. różne wskaźniki) z jednego otwarcia archiwum ZIP.
+
+    Arkusze jednego roku są parsowane po kolei: pd.read_excel działa w Pythonie pod GIL,
+    więc wątki nie przyspieszyłyby parsowania, a równoległość zapewnia ingest_pollutants,
+    uruchamiając osobny proces dla każdego roku. Czas roku rośnie więc z liczbą wskaźników.
+
+    Parametry:
+    year - rok danych
+    archive - otwarty plik archiwum albo ścieżka
+    filenames - słownik wskaźnik -> nazwa pliku w archiwum
+
+    Zwraca słownik wskaźnik -> DataFrame; brakujące pliki są pomijane z ostrzeżeniem.
+    """
+    frames = {}
+    with zipfile.ZipFile(archive) as z:
+        names = set(z.namelist())
+        for pollutant, filename in filenames.items():
             # Sprawdź czy plik istnieje w archiwum
-            if filename not in z.namelist():
+            if filename not in names:
                 print(f"Ostrzeżenie: Plik {filename} nie znaleziony w archiwum.")
                 print(f"Dostępne pliki: {z.namelist()[:5]}...")  # pokaż pierwsze 5
-                return None
-            
+                continue
+
             # wczytaj plik do pandas
-            with z.open(filename) as f:
-                df = pd.read_excel(f, header=None)
+            with z.open(filename) as f, stage('parse', year=year) as measured:
+                frames[pollutant] = pd.read_excel(f, header=None)
+                measured.rows_out = len(frames[pollutant])
+    return frames
+
+
+def _open_archive(year, config, gios_archive_url, cache):
+    """Pobiera archiwum roku (strumieniowo, opcjonalnie przez pamięć podręczną) i zwraca otwarty plik."""
+    url = f"{gios_archive_url}{config['archive_id']}"
+    with stage('download', year=year) as measured:
+        archive = _open(url, cache=cache, key=f"archive:{config['archive_id']}")
+        measured.bytes = file_size(archive)
+    return archive
+
+
+def download_gios_archive(year, config, gios_archive_url="https://powietrze.gios.gov.pl/pjp/archives/downloadFile/", cache=None,
+                          pollutant=DEFAULT_POLLUTANT):
+    """
+    Pobiera archiwum ZIP z danymi pomiarowymi dla danego roku.
+
+    Archiwum pobierane jest strumieniowo do pliku tymczasowego (nie do pamięci).
+    Jeśli podano cache (DownloadCache), archiwum jest pobierane z sieci tylko raz.
+    pollutant - wskaźnik do wczytania z archiwum (domyślnie PM2.5, patrz pollutants.py)
+    """
+    filename = member_name(year, config, pollutant)
+    
+    try:
+        with _open_archive(year, config, gios_archive_url, cache) as archive:
+            df = read_gios_archive(year, archive, filename)
+        if df is None:
+            return None
                 
         print(f"Dane dla roku {year} pobrane pomyślnie")
         return df
@@ -37,14 +93,33 @@ def download_gios_archive(year, config, gios_archive_url="https://powietrze.gios
         return None
 
 
-def download_metadata(metadata_url="https://powietrze.gios.gov.pl/pjp/archives/downloadFile/622"):
-    """Pobiera metadane i zwraca je jako DataFrame."""
+def download_gios_pollutants(year, config, pollutants, gios_archive_url="https://powietrze.gios.gov.pl/pjp/archives/downloadFile/",
+                             cache=None):
+    """
+    Pobiera archiwum roku raz i wczytuje z niego arkusze wielu wskaźników.
+
+    Zwraca słownik wskaźnik -> DataFrame z surowym arkuszem (bez wskaźników,
+    których nie ma w archiwum). Błędy pobierania i odczytu (np. uszkodzone archiwum)
+    nie są przechwytywane, aby wywołujący mógł podać ich przyczynę.
+    """
+    filenames = {pollutant: member_name(year, config, pollutant) for pollutant in pollutants}
+    with _open_archive(year, config, gios_archive_url, cache) as archive:
+        frames = read_gios_members(year, archive, filenames)
+    print(f"Dane dla roku {year} pobrane pomyślnie: {', '.join(frames)}")
+    return frames
+
+
+def download_metadata(metadata_url="https://powietrze.gios.gov.pl/pjp/archives/downloadFile/622", cache=None):
+    """Pobiera metadane i zwraca je jako DataFrame (opcjonalnie przez pamięć podręczną)."""
     try:
-        response = requests.get(metadata_url)
-        response.raise_for_status()  # jeśli błąd HTTP, zatrzymaj
+        with stage('download_metadata') as measured:
+            metadata = _open(metadata_url, cache=cache)
+            measured.bytes = file_size(metadata)
         
         # Wczytaj metadane jako DataFrame
-        df = pd.read_excel(io.BytesIO(response.content))
+        with metadata, stage('parse_metadata') as measured:
+            df = pd.read_excel(metadata)
+            measured.rows_out = len(df)
         print(f"Metadane pobrane pomyślnie: {df.shape[0]} wierszy, {df.shape[1]} kolumn")
         
         return df
@@ -55,126 +130,109 @@ def download_metadata(metadata_url="https://powietrze.gios.gov.pl/pjp/archives/d
 
 def find_data_start_row(df):
     """Znajduje wiersz, w którym zaczynają się dane pomiarowe z datami."""
-    date_pattern = r'\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}'
-    
-    for idx in range(len(df)):
-        first_cell = str(df.iloc[idx, 0])
-        if re.match(date_pattern, first_cell):
-            return idx
+    date_rows = np.flatnonzero(date_row_mask(df))
     
-    return None
+    if len(date_rows) == 0:
+        return None
+    return int(date_rows[0])
+
+
+def is_header_row(cell_value, year):
+    """Sprawdza, czy wiersz o danej pierwszej komórce jest zbędnym nagłówkiem."""
+    return header_regex(year).search(cell_value) is not None
 
 
-def filter_rows_by_content(df, year):
+@instrumented('filter')
+def filter_rows_by_content(df, year, layout=None):
     """
     Filtruje wiersze na podstawie zawartości zamiast indeksów.
-    Usuwa niepotrzebne wiersze
+    Usuwa niepotrzebne wiersze (wzorce zależą od profilu formatu danego roku)
     """
-    df = df.copy()
-    
-    # Szukamy wzorców w pierwszej kolumnie
-    patterns_to_remove = [
-        r'Kod stanowiska',  
-        r'Jednostka',
-        r'Nr',  
-        r'Wskaźnik',
-        r'Czas uśredniania'          
-    ]
-    
-    rows_to_keep = []
-    
-    for idx in range(len(df)):
-        cell_value = str(df.iloc[idx, 0])
-        should_keep = True
-        
-        # Sprawdzamy czy wiersz zawiera coś co chcemy usunąć
-        for pattern in patterns_to_remove:
-            if re.search(pattern, cell_value, re.IGNORECASE):
-                should_keep = False
-                break
-        
-        # Dodatkowo dla roku 2014 mogą być inne specyficzne wzorce
-        if year == 2014 and re.search(r'^\s*PM2.5', cell_value):
-            should_keep = False
-        
-        if should_keep:
-            rows_to_keep.append(idx)
+    if layout is None:
+        layout = detect_layout(df, year)
     
-    df_filtered = df.iloc[rows_to_keep].copy()
+    df_filtered = df.iloc[layout.kept_rows()].copy()
     df_filtered = df_filtered.reset_index(drop=True)
     
     print(f"Po filtracji: {len(df_filtered)} wierszy (usunięto {len(df) - len(df_filtered)})")
     return df_filtered
 
 
-def clean_data(df, year, df_metadata):
+@instrumented()
+def clean_data(df, year, df_metadata, layout=None, pollutant=DEFAULT_POLLUTANT):
     '''
-    Czyści dane pomiarowe PM2.5 i przekształca do formatu długiego.
+    Czyści dane pomiarowe (domyślnie PM2.5) i przekształca do formatu długiego.
     
     Parametry:
     df - dane z pomiarami
     year - rok danych
-    df_metadata - metadane ze stacjami
+    df_metadata - metadane ze stacjami (DataFrame lub gotowy StationRegistry)
+    layout - opcjonalny, wcześniej wykryty układ arkusza (SheetLayout)
+    pollutant - wskaźnik z arkusza (patrz pollutants.py); wartości trafiają do kolumny
+                o nazwie value_column(pollutant), np. 'pm25' albo 'pm10'
     '''
-    # Filtracja wierszy na podstawie zawartości
-    df_filtered = filter_rows_by_content(df, year)
-    
-    # znajdź wiersz, w którym zaczynają się dane pomiarowe (z datami)
-    data_start_row = find_data_start_row(df_filtered)
+    column = value_column(pollutant)
+
+    # Rozpoznanie układu arkusza (wiersze nagłówkowe, kody stacji, początek danych)
+    with stage('filter', year=year, rows_in=len(df)) as measured:
+        if layout is None:
+            layout = detect_layout(df, year)
+        measured.rows_out = len(layout.kept_rows())
+    print(f"Po filtracji: {len(layout.kept_rows())} wierszy (usunięto {len(layout.header_rows)})")
     
-    if data_start_row is None:
+    if layout.data_start_row is None:
         raise ValueError(f"Nie znaleziono wierszy z datami w pliku dla roku {year}")
     
     # Przygotuj nagłówki kolumn
-    # Zakładamy że kody stacji są w wierszu 0 (pierwszy wiersz po filtracji)
-    station_codes = df_filtered.iloc[0, 1:].tolist()  # Pomijamy pierwszą kolumnę
+    # Kody stacji są w pierwszym wierszu, który nie jest nagłówkiem
+    station_codes = df.iloc[layout.station_row, 1:].tolist()  # Pomijamy pierwszą kolumnę
     new_columns = ['data'] + [str(code).strip() for code in station_codes]
     
     # Wybierz tylko dane pomiarowe (od wiersza z datami)
-    data_df = df_filtered.iloc[data_start_row:].copy()
+    data_df = df.iloc[layout.data_rows()].copy()
     data_df = data_df.reset_index(drop=True)
     
     # Przypisz nowe nazwy kolumn
     data_df.columns = new_columns[:len(data_df.columns)]
     
+    # Znaczniki czasu dekodujemy przed rozwinięciem (jedna wartość na godzinę, a nie na pomiar):
+    # szybkie dekodowanie układu GIOŚ, korekta godziny 00:00 i kontrola ciągłości godzin
+    with stage('timestamps', year=year, rows_in=len(data_df)) as measured:
+        data_df['data'], hours = decode_hours(data_df['data'])
+        measured.rows_out = len(data_df)
+    if len(hours.duplicates) or len(hours.gaps):
+        print(f"Ostrzeżenie rok {year}: {len(hours.duplicates)} zduplikowanych godzin, "
+              f"{hours.n_missing_hours} brakujących godzin w {len(hours.gaps)} lukach")
+    
     # Rozwiń dane do formatu długiego
-    df_long = data_df.melt(id_vars=['data'], var_name='kod_stacji', value_name='pm25')
+    with stage('melt', year=year, rows_in=len(data_df)) as measured:
+        df_long = data_df.melt(id_vars=['data'], var_name='kod_stacji', value_name=column)
+        measured.rows_out = len(df_long)
     
     # Aktualizuj stare kody stacji na podstawie metadanych
-    if 'Stary Kod stacji \n(o ile inny od aktualnego)' in df_metadata.columns and 'Kod stacji' in df_metadata.columns:
-        station_mapping = {}
-        
-        for _, row in df_metadata.iterrows():
-            old_codes = row['Stary Kod stacji \n(o ile inny od aktualnego)']
-            new_code = str(row['Kod stacji']).strip()
-            
-            if pd.notna(old_codes) and str(old_codes).strip() != '':
-                old_code_list = str(old_codes).split(',')
-                
-                for old_code in old_code_list:
-                    old_code_clean = old_code.strip()
-                    if old_code_clean:
-                        station_mapping[old_code_clean] = new_code
-        
-        print(f"Rok {year}: Utworzono mapowanie dla {len(station_mapping)} starych kodów stacji")
+    registry = as_registry(df_metadata)
+    if registry.has_old_codes:
+        print(f"Rok {year}: Utworzono mapowanie dla {registry.n_old_codes} starych kodów stacji")
         
-        df_long['kod_stacji'] = df_long['kod_stacji'].map(
-            lambda x: station_mapping.get(str(x).strip(), str(x).strip())
-        )
+        with stage('remap', year=year, rows_in=len(df_long)) as measured:
+            df_long['kod_stacji'] = registry.remap(df_long['kod_stacji'])
+            measured.rows_out = len(df_long)
     else:
         print(f"Ostrzeżenie dla roku {year}: Brak kolumn do mapowania starych kodów stacji")
     
     # Konwersja typów danych
-    df_long['data'] = pd.to_datetime(df_long['data'], errors='coerce')
-    df_long['pm25'] = pd.to_numeric(
-        df_long['pm25'].astype(str).str.replace(',', '.'), 
-        errors='coerce'
-    )
+    with stage('convert', year=year, rows_in=len(df_long)) as measured:
+        df_long[column] = pd.to_numeric(
+            df_long[column].astype(str).str.replace(',', '.'), 
+            errors='coerce'
+        )
+        measured.rows_out = len(df_long)
     
     # Dodaj miejscowość z metadanych
-    if 'Kod stacji' in df_metadata.columns and 'Miejscowość' in df_metadata.columns:
-        station_to_city = df_metadata.set_index('Kod stacji')['Miejscowość'].to_dict()
-        df_long['Miejscowość'] = df_long['kod_stacji'].map(station_to_city)
+    if registry.has_cities:
+        with stage('city_lookup', year=year, rows_in=len(df_long)) as measured:
+            df_long['Miejscowość'] = registry.city(df_long['kod_stacji'])
+            measured.rows_out = len(df_long)
         
         # Sprawdź brakujące mapowania
         missing_count = df_long['Miejscowość'].isna().sum()
@@ -184,12 +242,8 @@ def clean_data(df, year, df_metadata):
     else:
         raise KeyError("Brak kolumn 'Kod stacji' lub 'Miejscowość' w metadanych")
     
-    # Korekta pomiarów z godziny 00:00
-    midnight_mask = df_long['data'].dt.hour == 0
-    df_long.loc[midnight_mask, 'data'] = df_long.loc[midnight_mask, 'data'] - pd.Timedelta(days=1)
-    
     # Posprzątaj kolumny
-    final_columns = ['Miejscowość', 'kod_stacji', 'data', 'pm25']
+    final_columns = ['Miejscowość', 'kod_stacji', 'data', column]
     df_long = df_long[final_columns]
     
     # Statystyki końcowe
@@ -199,8 +253,22 @@ def clean_data(df, year, df_metadata):
     return df_long
 
 
-def get_common_stations(data_dict):
-    """Znajduje wspólne stacje dla wszystkich lat."""
+def get_common_stations(data_dict, min_coverage=None, completeness=None):
+    """
+    Znajduje wspólne stacje dla wszystkich lat.
+
+    Jeśli podano min_coverage (np. 0.75), stacja musi mieć w każdym roku co najmniej
+    taką część ważnych dób (indeks kompletności z completeness.py), a nie tylko
+    występować w danych. completeness - opcjonalny gotowy CompletenessIndex
+    (domyślnie budowany z data_dict).
+    """
+    if min_coverage is not None:
+        if completeness is None:
+            completeness = CompletenessIndex.combine([CompletenessIndex.from_hourly(df) for df in data_dict.values()])
+        common_stations = set(completeness.stations_with_coverage(min_coverage, years=list(data_dict)))
+        print(f"Znaleziono {len(common_stations)} stacji z pokryciem co najmniej {min_coverage:.0%} we wszystkich latach")
+        return common_stations
+
     common_stations = None
     
     for year, df in data_dict.items():
@@ -218,9 +286,47 @@ def get_common_stations(data_dict):
     return common_stations
 
 
-def save_cleaned_data(df_all, output_path='pm25_cleaned.csv'):
-    """Zapisuje oczyszczone dane do pliku CSV."""
-    df_all = df_all.set_index(['Miejscowość', 'kod_stacji']).sort_index()
-    df_all.to_csv(output_path)
+def save_cleaned_data(df_all, output_path='pm25_cleaned.csv', snapshot=False):
+    """
+    Zapisuje oczyszczone dane do pliku CSV.
+
+    Jeśli ścieżka ma rozszerzenie .snapshot, dane trafiają do migawki mapowanej z dysku
+    (snapshot.py), a jeśli ma rozszerzenie .parquet (np. 'pm25_cleaned.parquet'),
+    do kolumnowego zbioru Parquet partycjonowanego po roku i stacji. Każda inna
+    ścieżka jest zapisywana jako plik CSV.
+
+    snapshot - czy zapisać obok pliku CSV także migawkę (np. pm25_cleaned.snapshot),
+               z której load_data(..., use_snapshot=True) wczytuje dane bez parsowania
+    """
+    with stage('save', rows_in=len(df_all), path=str(output_path)) as measured:
+        if is_snapshot_path(output_path):
+            df_all = df_all.set_index(['Miejscowość', 'kod_stacji']).sort_index()
+            return save_snapshot(df_all, output_path)
+        if is_dataset_path(output_path):
+            df_all = df_all.sort_values(['Miejscowość', 'kod_stacji', 'data'])
+            return save_dataset(df_all, output_path)
+
+        df_all = df_all.set_index(['Miejscowość', 'kod_stacji']).sort_index()
+        df_all.to_csv(output_path)
+        measured.rows_out = len(df_all)
+        measured.bytes = os.path.getsize(output_path)
+        if snapshot:
+            save_snapshot(df_all, snapshot_path(output_path), source=output_path)
     print(f"Dane zapisane do: {output_path}")
     return output_path
+
+
+def save_pollutant_data(frames, output_path='pm25_cleaned.csv', snapshot=False):
+    """
+    Zapisuje oczyszczone dane wielu wskaźników, każdy obok output_path we własnym pliku.
+
+    frames - słownik wskaźnik -> dane w formacie długim (np. z ingestion.ingest_pollutants)
+    output_path - ścieżka dla PM2.5; pozostałe wskaźniki według pollutants.cleaned_path
+                  (np. pm10_cleaned.csv)
+
+    Zwraca słownik wskaźnik -> ścieżka zapisu.
+    """
+    return {
+        pollutant: save_cleaned_data(df, cleaned_path(pollutant, output_path), snapshot=snapshot)
+        for pollutant, df in frames.items()
+    }
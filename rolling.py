@@ -0,0 +1,173 @@
+import numpy as np
+import pandas as pd
+
+from aggregation import exceedance_counts
+from cube import HOURS_PER_DAY
+
+
+# Domyślna minimalna część ważnych wartości w oknie (np. 18 z 24 godzin)
+MIN_COVERAGE = 0.75
+
+DAYS_PER_YEAR = 365
+
+
+def rolling_column(hours):
+    """Nazwa kolumny z dobowym maksimum średnich kroczących (np. 'pm25_max_kroczaca_24h')."""
+    return f'pm25_max_kroczaca_{hours}h'
+
+
+def _required(window, min_coverage):
+    """Minimalna liczba ważnych wartości w oknie (co najmniej 1)."""
+    return max(1, int(np.ceil(min_coverage * window - 1e-9)))
+
+
+def _window_sums(values, window):
+    """
+    Sumy i liczby ważnych wartości w oknach długości window kończących się w każdej kolumnie.
+
+    Liczone z sum skumulowanych wzdłuż wierszy, więc koszt nie zależy od długości okna.
+    Okna na początku serii obejmują tylko dostępne kolumny.
+    """
+    n_rows, n_columns = values.shape
+    valid = ~np.isnan(values)
+    sums = np.zeros((n_rows, n_columns + 1), dtype=np.float64)
+    np.cumsum(np.where(valid, values, 0), axis=1, dtype=np.float64, out=sums[:, 1:])
+    counts = np.zeros((n_rows, n_columns + 1), dtype=np.int64)
+    np.cumsum(valid, axis=1, out=counts[:, 1:])
+
+    # Od kolumny window odejmowana jest suma sprzed początku okna (wcześniej okno zaczyna się od początku serii)
+    window_sums, window_counts = sums[:, 1:], counts[:, 1:]
+    window_sums[:, window:] -= sums[:, 1:-window].copy()
+    window_counts[:, window:] -= counts[:, 1:-window].copy()
+    return window_sums, window_counts
+
+
+def rolling_means(values, window, min_coverage=MIN_COVERAGE):
+    """
+    Średnie kroczące (okno kończące się w danej kolumnie) dla wielu regularnych serii naraz.
+
+    Odpowiednik pd.Series.rolling(window, min_periods=...).mean() dla każdego wiersza,
+    ale w czasie O(n) dla całej macierzy: średnia okna to różnica sum skumulowanych
+    podzielona przez różnicę skumulowanych liczb ważnych wartości.
+
+    Parametry:
+    values - macierz [seria, krok] (np. PM25Cube.values); NaN dla braków
+    window - długość okna w krokach serii
+    min_coverage - minimalna część ważnych wartości w oknie; przy mniejszej wynik to NaN
+
+    Zwraca macierz float64 o tych samych wymiarach.
+    """
+    values = np.atleast_2d(np.asarray(values, dtype=np.float64))
+    sums, counts = _window_sums(values, window)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = sums / counts
+    means[counts < _required(window, min_coverage)] = np.nan
+    return means
+
+
+def running_means(cube, hours=24, min_coverage=MIN_COVERAGE):
+    """Kroczące średnie godzinowe [stacja, godzina] z okna hours godzin (np. 24 albo 8) kończącego się w danej godzinie."""
+    return rolling_means(cube.values, hours, min_coverage)
+
+
+def daily_max_running_means(cube, hours=24, min_coverage=MIN_COVERAGE):
+    """
+    Największa średnia krocząca z okien kończących się w każdej dobie: macierz [stacja, doba].
+
+    Np. hours=8 daje maksymalną dobową średnią 8-godzinną; doby bez żadnej ważnej
+    średniej mają NaN.
+    """
+    means = running_means(cube, hours, min_coverage)
+    return np.fmax.reduce(means.reshape(cube.n_stations, cube.n_days, HOURS_PER_DAY), axis=2)
+
+
+def running_annual_means(cube, days=DAYS_PER_YEAR, min_coverage=MIN_COVERAGE, min_daily_coverage=MIN_COVERAGE):
+    """
+    Kroczące średnie roczne [stacja, doba]: średnia ze średnich dobowych z ostatnich days dób.
+
+    Doba jest ważna, jeśli ma co najmniej min_daily_coverage ważnych godzin, a średnia
+    krocząca wymaga co najmniej min_coverage ważnych dób w oknie.
+    """
+    sums, counts = cube._daily_sums_counts()
+    with np.errstate(invalid='ignore', divide='ignore'):
+        daily = sums / counts
+    daily[counts < _required(HOURS_PER_DAY, min_daily_coverage)] = np.nan
+    return rolling_means(daily, days, min_coverage)
+
+
+def to_frame(cube, values, column):
+    """
+    Zamienia macierz [stacja, godzina] lub [stacja, doba] na format długi.
+
+    Zwraca DataFrame z kolumnami 'Miejscowość', 'kod_stacji', 'data' (dla godzin)
+    albo 'data_dzien' (dla dób) i column, tylko dla wartości różnych od NaN.
+    """
+    if values.shape[1] == cube.n_hours:
+        time_column, times = 'data', cube.hours
+    elif values.shape[1] == cube.n_days:
+        time_column, times = 'data_dzien', cube.days
+    else:
+        raise ValueError(f"Macierz o {values.shape[1]} kolumnach nie pasuje do godzin ani dób kostki")
+    station_idx, time_idx = np.nonzero(~np.isnan(values) & cube._has_city()[:, None])
+    return pd.DataFrame({
+        'Miejscowość': cube.cities.take(station_idx),
+        'kod_stacji': cube.stations.to_numpy().take(station_idx),
+        time_column: times.take(time_idx),
+        column: values[station_idx, time_idx],
+    })
+
+
+def _daily_maxima(cube, hours, min_coverage):
+    """Maksima dobowe średnich kroczących zaokrąglone jak średnie w calculate_daily_stats."""
+    return np.round(daily_max_running_means(cube, hours, min_coverage), 2)
+
+
+def rolling_daily_stats(cube, hours=24, min_coverage=MIN_COVERAGE, norm_threshold=15):
+    """
+    Statystyki dobowe ze średnich kroczących, z kluczami jak w calculate_daily_stats.
+
+    Kolumna rolling_column(hours) (np. 'pm25_max_kroczaca_24h') zawiera największą
+    średnią kroczącą z okien kończących się w danej dobie, a 'przekroczenie_normy' - czy
+    osiągnęła norm_threshold. Wynik można przekazać do RollupIndex zamiast
+    calculate_daily_stats: days_over_norm liczy wtedy dni z kroczącym przekroczeniem,
+    a exceedance_counts(..., column=rolling_column(hours)) - przekroczenia wielu progów.
+    Kolumny 'pm25_srednia_dobowa' nie ma, więc średnie dobowe nie mylą się z kroczącymi.
+    """
+    column = rolling_column(hours)
+    daily = to_frame(cube, _daily_maxima(cube, hours, min_coverage), column)
+    daily['przekroczenie_normy'] = daily[column] >= norm_threshold
+    return daily.sort_values(['Miejscowość', 'kod_stacji', 'data_dzien'], ignore_index=True)
+
+
+def moving_exceedances(cube, thresholds, hours=24, min_coverage=MIN_COVERAGE):
+    """
+    Liczba dni z kroczącym przekroczeniem każdego z progów dla stacji w każdym roku.
+
+    Dzień przekracza próg, jeśli przekroczyła go choć jedna średnia z okna hours godzin
+    kończącego się w tym dniu. Progi liczone są naraz przez aggregation.exceedance_counts,
+    wprost na macierzy [stacja, doba], bez grupowania danych w formacie długim.
+
+    Zwraca DataFrame jak RollupIndex.exceedance_counts(thresholds, 'station',
+    column=rolling_column(hours)) dla statystyk z rolling_daily_stats: kolumny
+    'Miejscowość', 'kod_stacji', 'rok', 'prog' i 'dni_powyzej_normy'.
+    """
+    thresholds = np.atleast_1d(np.asarray(thresholds, dtype=np.float64))
+    maxima = _daily_maxima(cube, hours, min_coverage)
+
+    # Grupy (stacja, rok) dla dób z ważną średnią u stacji z przypisaną miejscowością
+    year_codes, years = pd.factorize(cube.days.year, sort=True)
+    station_idx, day_idx = np.nonzero(~np.isnan(maxima) & cube._has_city()[:, None])
+    combined = station_idx.astype(np.int64) * len(years) + year_codes.take(day_idx)
+    groups, codes = np.unique(combined, return_inverse=True)
+    counts = exceedance_counts(codes, maxima[station_idx, day_idx], thresholds, len(groups))
+
+    stations = groups // max(len(years), 1)
+    result = pd.DataFrame({
+        'Miejscowość': np.repeat(cube.cities.take(stations), len(thresholds)),
+        'kod_stacji': np.repeat(cube.stations.to_numpy().take(stations), len(thresholds)),
+        'rok': np.repeat(np.asarray(years).take(groups % max(len(years), 1)), len(thresholds)),
+        'prog': np.tile(thresholds, len(groups)),
+        'dni_powyzej_normy': counts.ravel(),
+    })
+    # Kolejność jak w RollupIndex: stacje (miejscowość, kod), rok, progi w podanej kolejności
+    return result.sort_values(['Miejscowość', 'kod_stacji', 'rok'], kind='stable', ignore_index=True)
@@ -0,0 +1,285 @@
+import numpy as np
+import pandas as pd
+
+from aggregation import aggregate_stats, exceedance_counts
+from enriched_view import EnrichedView
+from station_registry import as_registry
+
+
+COUNTRY = 'Polska'
+
+# Poziomy hierarchii przestrzennej: kolumny kluczy dla każdego poziomu
+LEVELS = {
+    'station': ['Miejscowość', 'kod_stacji'],
+    'city': ['Miejscowość'],
+    'voivodeship': ['Województwo'],
+    'country': ['Kraj'],
+}
+
+# Kolumna statystyk dobowych, z której domyślnie liczone są przekroczenia progów
+DAILY_COLUMN = 'pm25_srednia_dobowa'
+
+# Poziomy hierarchii czasowej: kolumny kluczy dla każdego okresu
+PERIODS = {
+    'day': ['data_dzien'],
+    'month': ['rok', 'miesiac'],
+    'year': ['rok'],
+}
+
+
+def _as_tuple(values):
+    """Normalizuje listę filtrów do postaci, której można użyć jako klucza pamięci podręcznej."""
+    if values is None:
+        return None
+    if isinstance(values, (str, int)):
+        values = [values]
+    return tuple(sorted(values))
+
+
+class RollupIndex:
+    """
+    Indeks wstępnie zagregowanych statystyk PM2.5 dla hierarchii stacja → miejscowość
+    → województwo → kraj oraz doba → miesiąc → rok.
+
+    Indeks przechowuje tylko średnie dobowe i miesięczne stacji (kilkaset razy mniej
+    wierszy niż dane godzinowe); wyższe poziomy liczone są z nich na żądanie, a wyniki
+    zapytań są zapamiętywane, więc ponowne narysowanie wykresu nie wymaga żadnych obliczeń.
+
+    Poziomy powyżej stacji to średnie ze średnich stacji (jak w heatmapach), a średnia
+    roczna stacji to średnia z jej średnich dobowych. Dzień z przekroczeniem normy na
+    poziomie miejscowości, województwa lub kraju to dzień, w którym normę przekroczyła
+    co najmniej jedna stacja.
+
+    Parametry:
+    daily - wynik calculate_daily_stats
+    monthly - wynik calculate_monthly_stats
+    df_metadata - opcjonalne metadane (DataFrame lub StationRegistry) do przypisania województw
+    """
+
+    def __init__(self, daily, monthly, df_metadata=None):
+        self.daily = self._with_levels(daily, df_metadata)
+        self.daily['rok'] = self.daily['data_dzien'].dt.year.astype('Int64')
+        self.daily['miesiac'] = self.daily['data_dzien'].dt.month.astype('int32')
+        self.monthly = self._with_levels(monthly, df_metadata)
+        self._cache = {}
+
+    @classmethod
+    def from_hourly(cls, df, df_metadata=None, norm_threshold=15):
+        """Buduje indeks z danych godzinowych w formacie długim (jeden przebieg agregacji)."""
+        daily, monthly = aggregate_stats(df, norm_threshold)
+        return cls(daily, monthly, df_metadata)
+
+    @staticmethod
+    def _with_levels(stats, df_metadata):
+        stats = stats.reset_index(drop=True).copy()
+        stats['Kraj'] = COUNTRY
+        if df_metadata is not None:
+            registry = as_registry(df_metadata)
+            if registry.has_voivodeships:
+                stats['Województwo'] = registry.voivodeship(stats['kod_stacji'])
+        return stats
+
+    @property
+    def has_voivodeships(self):
+        return 'Województwo' in self.daily.columns
+
+    @property
+    def years(self):
+        """Lata obecne w indeksie (rosnąco)."""
+        return sorted(int(year) for year in self.daily['rok'].dropna().unique())
+
+    def members(self, level):
+        """Nazwy jednostek danego poziomu (np. wszystkie miejscowości), rosnąco."""
+        keys = self._level_keys(level)
+        return self.daily[keys].drop_duplicates().dropna().sort_values(keys).reset_index(drop=True)
+
+    def clear_cache(self):
+        self._cache.clear()
+
+    def _level_keys(self, level):
+        if level not in LEVELS:
+            raise ValueError(f"Nieznany poziom '{level}', dostępne: {', '.join(LEVELS)}")
+        if level == 'voivodeship' and not self.has_voivodeships:
+            raise KeyError("Indeks zbudowano bez metadanych z województwami")
+        return LEVELS[level]
+
+    def _cached(self, key, compute):
+        if key not in self._cache:
+            self._cache[key] = compute()
+        value = self._cache[key]
+        if isinstance(value, tuple):
+            return tuple(item.copy() for item in value)
+        return value.copy()
+
+    def _filtered(self, table, level, names, years):
+        if names is not None:
+            table = table[table[LEVELS[level][0]].isin(names)]
+        if years is not None:
+            table = table[table['rok'].isin(years)]
+        return table
+
+    def series(self, level='city', period='month', names=None, years=None):
+        """
+        Średnie stężenia PM2.5 dla jednostek danego poziomu w kolejnych okresach.
+
+        Parametry:
+        level - 'station', 'city', 'voivodeship' lub 'country'
+        period - 'day', 'month' lub 'year'
+        names - opcjonalna lista jednostek (np. miejscowości; dla stacji - miejscowości stacji)
+        years - opcjonalna lista lat
+
+        Zwraca DataFrame z kolumnami kluczy poziomu, kluczy okresu i 'pm25_srednia'.
+        """
+        keys = self._level_keys(level)
+        if period not in PERIODS:
+            raise ValueError(f"Nieznany okres '{period}', dostępne: {', '.join(PERIODS)}")
+        names, years = _as_tuple(names), _as_tuple(years)
+
+        def compute():
+            if period == 'month':
+                table, column = self.monthly, 'pm25_srednia_miesieczna'
+            else:
+                table, column = self.daily, 'pm25_srednia_dobowa'
+            table = self._filtered(table, level, names, years)
+            return (
+                table.groupby(keys + PERIODS[period])[column]
+                .mean()
+                .rename('pm25_srednia')
+                .reset_index()
+            )
+
+        return self._cached(('series', level, period, names, years), compute)
+
+    def monthly_series(self, level='city', names=None, years=None):
+        """Średnie miesięczne dla wybranych jednostek i lat (skrót dla series z period='month')."""
+        return self.series(level, 'month', names, years)
+
+    def monthly_matrix(self, level='city', names=None, years=None):
+        """
+        Średnie miesięczne jako tablica [jednostka, rok, miesiąc] z jawną osią lat.
+
+        Tablica budowana jest jednym wektorowym rozmieszczeniem wartości, a brakujące
+        lata i miesiące jednostki mają NaN, więc wiersze wszystkich jednostek odpowiadają
+        tym samym latom.
+
+        Parametry:
+        level - poziom hierarchii (dla 'station' jednostkami są kody stacji)
+        names - opcjonalna lista jednostek (domyślnie wszystkie z danymi)
+        years - lata osi (domyślnie wszystkie lata w indeksie)
+
+        Zwraca krotkę (jednostki, lata, tablica float64 o wymiarach (jednostki, lata, 12)).
+        """
+        key = self._level_keys(level)[-1]
+        names = _as_tuple(names)
+        years = _as_tuple(years) if years is not None else tuple(self.years)
+
+        def compute():
+            series = self.series(level, 'month', years=years)
+            units = pd.Index(names if names is not None else series[key].dropna().unique()).sort_values()
+            unit_pos = units.get_indexer(series[key])
+            year_pos = pd.Index(years).get_indexer(series['rok'].to_numpy(dtype='int64'))
+            valid = (unit_pos >= 0) & (year_pos >= 0)
+
+            matrix = np.full((len(units), len(years), 12), np.nan)
+            matrix[unit_pos[valid], year_pos[valid], series['miesiac'].to_numpy()[valid] - 1] = (
+                series['pm25_srednia'].to_numpy(dtype='float64')[valid]
+            )
+            return units, pd.Index(years, name='rok'), matrix
+
+        return self._cached(('monthly_matrix', level, names, years), compute)
+
+    def exceedance_days(self, level='station', names=None, years=None, threshold=None):
+        """
+        Liczba dni z przekroczeniem normy dobowej dla jednostek danego poziomu w każdym roku.
+
+        threshold - opcjonalny próg; domyślnie używana jest kolumna 'przekroczenie_normy'
+                    (próg, z którym policzono statystyki dobowe)
+
+        Zwraca DataFrame z kolumnami kluczy poziomu, 'rok' i 'dni_powyzej_normy'
+        (jednostki bez przekroczeń w danym roku mają 0).
+        """
+        keys = self._level_keys(level)
+        if threshold is not None:
+            counts = self.exceedance_counts([threshold], level, names, years)
+            return counts.drop(columns='prog')
+        names, years = _as_tuple(names), _as_tuple(years)
+
+        def compute():
+            table = self._filtered(self.daily, level, names, years)
+            # Czy w danej jednostce danego dnia było przekroczenie (co najmniej jedna stacja)
+            per_day = table.groupby(keys + ['rok', 'data_dzien'])['przekroczenie_normy'].any()
+            return (
+                per_day.groupby(level=keys + ['rok'])
+                .sum()
+                .astype('int64')
+                .rename('dni_powyzej_normy')
+                .reset_index()
+            )
+
+        return self._cached(('exceedance_days', level, names, years), compute)
+
+    def exceedance_counts(self, thresholds, level='station', names=None, years=None, column=DAILY_COLUMN):
+        """
+        Liczba dni z przekroczeniem każdego z progów dla jednostek danego poziomu w każdym roku.
+
+        Wszystkie progi liczone są w jednym przebiegu (aggregation.exceedance_counts):
+        dla każdej jednostki i doby brane jest maksimum średnich dobowych stacji (dzień
+        przekracza próg, jeśli przekroczyła go co najmniej jedna stacja), a potem liczone
+        są dni z maksimum >= próg dla wszystkich progów naraz. Dla progu, z którym
+        policzono statystyki, wynik jest taki sam jak w exceedance_days.
+
+        Parametry:
+        thresholds - lista progów (np. [5, 15, 25] dla norm WHO i UE)
+        level - 'station', 'city', 'voivodeship' lub 'country'
+        names, years - opcjonalne filtry jednostek i lat
+        column - kolumna wartości dobowych porównywanych z progami (domyślnie średnia
+                 dobowa; np. 'pm25_max_kroczaca_24h' dla statystyk z rolling.rolling_daily_stats)
+
+        Zwraca DataFrame z kolumnami kluczy poziomu, 'rok', 'prog' i 'dni_powyzej_normy'
+        (w kolejności jednostek, lat i podanych progów).
+        """
+        keys = self._level_keys(level)
+        if column not in self.daily.columns:
+            raise KeyError(f"Brak kolumny '{column}' w statystykach dobowych indeksu")
+        thresholds = tuple(float(t) for t in np.atleast_1d(thresholds))
+        names, years = _as_tuple(names), _as_tuple(years)
+
+        def compute():
+            table = self._filtered(self.daily, level, names, years)
+            table = table.dropna(subset=keys + ['rok'])
+            if level == 'station':
+                per_day = table[keys + ['rok', column]]
+            else:
+                per_day = (
+                    table.groupby(keys + ['rok', 'data_dzien'], sort=False)[column]
+                    .max()
+                    .reset_index()
+                )
+            groups = per_day.groupby(keys + ['rok'], sort=True)
+            codes = groups.ngroup().to_numpy()
+            counts = exceedance_counts(codes, per_day[column].to_numpy(dtype='float64', na_value=np.nan),
+                                       thresholds, groups.ngroups)
+
+            units = groups.size().index.to_frame(index=False)
+            result = units.loc[units.index.repeat(len(thresholds))].reset_index(drop=True)
+            result['prog'] = np.tile(thresholds, len(units))
+            result['dni_powyzej_normy'] = counts.ravel()
+            return result
+
+        return self._cached(('exceedance_counts', level, thresholds, names, years, column), compute)
+
+
+def as_rollup(obj, df_metadata=None, norm_threshold=15):
+    """
+    Zwraca RollupIndex dla indeksu, widoku EnrichedView lub danych godzinowych.
+
+    Dla EnrichedView wykorzystywane są gotowe statystyki widoku, a dla DataFrame'u
+    z kolumną 'pm25' statystyki są liczone od nowa.
+    """
+    if isinstance(obj, RollupIndex):
+        if df_metadata is not None and not obj.has_voivodeships:
+            return RollupIndex(obj.daily, obj.monthly, df_metadata)
+        return obj
+    if isinstance(obj, EnrichedView):
+        return RollupIndex(obj.daily, obj.monthly, df_metadata)
+    return RollupIndex.from_hourly(obj, df_metadata, norm_threshold)
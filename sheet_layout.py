@@ -0,0 +1,164 @@
+import re
+from functools import lru_cache
+
+import numpy as np
+
+
+# Wzorzec pierwszej komórki wiersza z pomiarem
+DATE_PATTERN = r'\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}'
+
+# Wzorce wierszy nagłówkowych w pierwszej kolumnie, które usuwamy
+HEADER_PATTERNS = [
+    r'Kod stanowiska',
+    r'Jednostka',
+    r'Nr',
+    r'Wskaźnik',
+    r'Czas uśredniania'
+]
+
+# Wzorzec wiersza z jednostkami (podzbiór wierszy nagłówkowych)
+UNIT_PATTERN = r'Jednostka'
+
+# Profile formatów arkuszy GIOŚ. Wzorce 'header_patterns' są sprawdzane bez względu
+# na wielkość liter, 'exact_patterns' z jej uwzględnieniem. Nowy wariant formatu
+# obsługuje się, rejestrując nowy profil (register_profile) zamiast zmieniać kod.
+PROFILES = {
+    'default': {
+        'header_patterns': HEADER_PATTERNS,
+        'exact_patterns': [],
+    },
+    # W 2014 roku pod nagłówkiem jest dodatkowy wiersz z nazwą wskaźnika
+    'gios_2014': {
+        'header_patterns': HEADER_PATTERNS,
+        'exact_patterns': [r'^\s*PM2.5'],
+    },
+}
+
+YEAR_PROFILES = {
+    2014: 'gios_2014',
+}
+
+
+def register_profile(name, header_patterns, exact_patterns=(), years=()):
+    """Rejestruje profil formatu arkusza i przypisuje go do podanych lat."""
+    PROFILES[name] = {
+        'header_patterns': list(header_patterns),
+        'exact_patterns': list(exact_patterns),
+    }
+    for year in years:
+        YEAR_PROFILES[year] = name
+    _compiled_header_regex.cache_clear()
+
+
+def profile_for_year(year):
+    """Zwraca nazwę profilu formatu dla danego roku."""
+    return YEAR_PROFILES.get(year, 'default')
+
+
+@lru_cache(maxsize=None)
+def _compiled_header_regex(profile_name):
+    """Kompiluje wszystkie wzorce profilu do jednego wyrażenia regularnego."""
+    profile = PROFILES[profile_name]
+    parts = []
+    if profile['header_patterns']:
+        parts.append('(?i:' + '|'.join(profile['header_patterns']) + ')')
+    parts.extend(f'(?:{pattern})' for pattern in profile['exact_patterns'])
+    return re.compile('|'.join(parts) if parts else r'(?!)')
+
+
+def header_regex(year):
+    """Zwraca skompilowane wyrażenie rozpoznające wiersze nagłówkowe dla danego roku."""
+    return _compiled_header_regex(profile_for_year(year))
+
+
+class SheetLayout:
+    """
+    Opis układu arkusza GIOŚ (indeksy wierszy w oryginalnym DataFrame).
+
+    Atrybuty:
+    profile - nazwa użytego profilu formatu
+    header_rows - wiersze nagłówkowe do usunięcia
+    unit_rows - wiersze z jednostkami
+    station_row - wiersz z kodami stacji (pierwszy wiersz, który nie jest nagłówkiem)
+    data_start_row - pierwszy wiersz z datą pomiaru
+    n_rows - liczba wierszy arkusza
+    """
+
+    def __init__(self, profile, header_rows, unit_rows, station_row, data_start_row, n_rows):
+        self.profile = profile
+        self.header_rows = list(header_rows)
+        self.unit_rows = list(unit_rows)
+        self.station_row = station_row
+        self.data_start_row = data_start_row
+        self.n_rows = n_rows
+
+    def kept_rows(self):
+        """Indeksy wierszy pozostających po usunięciu nagłówków."""
+        keep = np.ones(self.n_rows, dtype=bool)
+        keep[self.header_rows] = False
+        return np.flatnonzero(keep)
+
+    def data_rows(self):
+        """Indeksy wierszy z danymi pomiarowymi (od pierwszej daty, bez nagłówków)."""
+        kept = self.kept_rows()
+        if self.data_start_row is None:
+            return kept[:0]
+        return kept[kept >= self.data_start_row]
+
+    def to_dict(self):
+        """Zwraca opis układu jako słownik (np. do zapisu w JSON)."""
+        return {
+            'profile': self.profile,
+            'header_rows': self.header_rows,
+            'unit_rows': self.unit_rows,
+            'station_row': self.station_row,
+            'data_start_row': self.data_start_row,
+            'n_rows': self.n_rows,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Odtwarza opis układu ze słownika utworzonego przez to_dict."""
+        return cls(**data)
+
+    def __repr__(self):
+        return (f"SheetLayout(profile={self.profile!r}, station_row={self.station_row}, "
+                f"data_start_row={self.data_start_row}, header_rows={len(self.header_rows)})")
+
+
+def _first_column(df):
+    """Pierwsza kolumna arkusza jako teksty (tak jak str() dla pojedynczej komórki)."""
+    return df.iloc[:, 0].astype(str)
+
+
+def date_row_mask(df):
+    """Maska wierszy, których pierwsza komórka zaczyna się od daty pomiaru."""
+    return _first_column(df).str.match(DATE_PATTERN).to_numpy(dtype=bool)
+
+
+def detect_layout(df, year):
+    """
+    Rozpoznaje układ arkusza jednym zwektoryzowanym przejściem po pierwszej kolumnie.
+
+    Parametry:
+    df - surowy arkusz (header=None)
+    year - rok danych (wybiera profil formatu)
+    """
+    first_column = _first_column(df)
+    profile = profile_for_year(year)
+
+    header_mask = first_column.str.contains(_compiled_header_regex(profile)).to_numpy(dtype=bool)
+    unit_mask = first_column.str.contains(UNIT_PATTERN, case=False).to_numpy(dtype=bool)
+    date_mask = first_column.str.match(DATE_PATTERN).to_numpy(dtype=bool)
+
+    kept = np.flatnonzero(~header_mask)
+    kept_dates = kept[date_mask[kept]]
+
+    return SheetLayout(
+        profile=profile,
+        header_rows=np.flatnonzero(header_mask).tolist(),
+        unit_rows=np.flatnonzero(unit_mask & header_mask).tolist(),
+        station_row=int(kept[0]) if len(kept) else None,
+        data_start_row=int(kept_dates[0]) if len(kept_dates) else None,
+        n_rows=len(df),
+    )
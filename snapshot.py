@@ -0,0 +1,172 @@
+import json
+import os
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from pollutants import VALUE_COLUMNS
+from timestamps import UNIT
+
+
+SNAPSHOT_SUFFIX = '.snapshot'
+MANIFEST_FILE = 'manifest.json'
+SNAPSHOT_FORMAT = 'pm25-snapshot'
+SNAPSHOT_VERSION = 1
+
+# Kolumny z wartościami pomiarów zapisywane jako float32 (jak w storage.py)
+FLOAT32_COLUMNS = VALUE_COLUMNS
+
+
+def snapshot_path(filepath):
+    """Ścieżka migawki zapisywanej obok pliku z danymi (np. pm25_cleaned.csv -> pm25_cleaned.snapshot)."""
+    return Path(filepath).with_suffix(SNAPSHOT_SUFFIX)
+
+
+def is_snapshot_path(path):
+    """Sprawdza, czy ścieżka wskazuje na migawkę (katalog .snapshot albo katalog z manifestem migawki)."""
+    path = Path(path)
+    return path.suffix == SNAPSHOT_SUFFIX or _read_manifest(path) is not None
+
+
+def _read_manifest(path):
+    """Wczytuje manifest migawki; zwraca None, jeśli go nie ma albo ma inny format."""
+    try:
+        manifest = json.loads((Path(path) / MANIFEST_FILE).read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return None
+    if manifest.get('format') != SNAPSHOT_FORMAT or manifest.get('version') != SNAPSHOT_VERSION:
+        return None
+    return manifest
+
+
+def _source_stat(source):
+    """Rozmiar i czas modyfikacji pliku źródłowego (do sprawdzania aktualności migawki)."""
+    stat = os.stat(source)
+    return {'path': str(source), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def _encode_column(name, series):
+    """Zamienia kolumnę na surową tablicę numpy i opis do manifestu."""
+    if pd.api.types.is_datetime64_any_dtype(series):
+        values = series.to_numpy().astype(UNIT).view(np.int64)
+        return values, {'kind': 'timestamp', 'unit': UNIT}
+    if name in FLOAT32_COLUMNS:
+        return series.to_numpy(dtype=np.float32), {'kind': 'values'}
+    if isinstance(series.dtype, pd.CategoricalDtype) or pd.api.types.is_string_dtype(series) \
+            or series.dtype == object:
+        categorical = pd.Categorical(series.astype(str).where(series.notna()))
+        return categorical.codes, {'kind': 'dictionary', 'categories': categorical.categories.tolist()}
+    if pd.api.types.is_numeric_dtype(series) and not isinstance(series.dtype, pd.api.extensions.ExtensionDtype):
+        return series.to_numpy(), {'kind': 'values'}
+    raise TypeError(f"Nieobsługiwany typ kolumny '{name}' w migawce: {series.dtype}")
+
+
+def save_snapshot(df, path, source=None):
+    """
+    Zapisuje migawkę danych: osobny surowy plik .npy dla każdej kolumny i mały manifest.
+
+    Kody stacji i miejscowości zapisywane są jako kody słownikowe (słowniki w manifeście),
+    znaczniki czasu jako int64 (mikrosekundy), wartości wskaźników (pm25, pm10, ...) jako float32.
+
+    Parametry:
+    df - dane w formacie długim (kolumny 'Miejscowość', 'kod_stacji', 'data', 'pm25', ...)
+    path - katalog migawki; istniejąca zawartość jest nadpisywana
+    source - opcjonalny plik, z którego pochodzą dane; jego rozmiar i czas modyfikacji
+             trafiają do manifestu, żeby load_data wiedział, czy migawka jest aktualna
+    """
+    df = df.reset_index() if 'kod_stacji' not in df.columns else df
+    path = Path(path)
+    tmp_path = path.with_name(path.name + '.tmp')
+    if tmp_path.exists():
+        shutil.rmtree(tmp_path)
+    tmp_path.mkdir(parents=True)
+
+    columns = []
+    for i, name in enumerate(df.columns):
+        values, column = _encode_column(name, df[name])
+        column = {'name': str(name), 'file': f'kolumna_{i}.npy', **column}
+        np.save(tmp_path / column['file'], np.ascontiguousarray(values))
+        columns.append(column)
+
+    manifest = {
+        'format': SNAPSHOT_FORMAT,
+        'version': SNAPSHOT_VERSION,
+        'rows': len(df),
+        'columns': columns,
+        'source': _source_stat(source) if source is not None else None,
+    }
+    (tmp_path / MANIFEST_FILE).write_text(json.dumps(manifest, ensure_ascii=False, indent=1), encoding='utf-8')
+
+    # Podmiana całego katalogu, żeby czytelnik nie zobaczył migawki w połowie zapisu
+    if path.exists():
+        shutil.rmtree(path)
+    tmp_path.rename(path)
+    print(f"Migawka zapisana do: {path}")
+    return str(path)
+
+
+def is_fresh(path, source):
+    """Sprawdza, czy migawka istnieje i powstała z obecnej wersji pliku source."""
+    manifest = _read_manifest(path)
+    if manifest is None or manifest.get('source') is None or not Path(source).exists():
+        return False
+    current = _source_stat(source)
+    return all(manifest['source'][key] == current[key] for key in ('size', 'mtime_ns'))
+
+
+def _decode_column(path, column):
+    """Otwiera plik kolumny przez mapowanie pamięci i zwraca Series bez kopiowania danych."""
+    # Tryb 'c': strony są współdzielone przez procesy czytające migawkę, a zapisy
+    # (np. przypisanie do kolumny) trafiają do prywatnej kopii strony, nie do pliku
+    values = np.load(path / column['file'], mmap_mode='c')
+    if column['kind'] == 'dictionary':
+        values = pd.Categorical.from_codes(values, categories=pd.Index(column['categories']), validate=False)
+    elif column['kind'] == 'timestamp':
+        values = values.view(column['unit'])
+    return pd.Series(values, name=column['name'], copy=False)
+
+
+def open_snapshot(path, columns=None, years=None, cities=None, stations=None):
+    """
+    Otwiera migawkę jako DataFrame, którego kolumny są mapowane z plików (bez parsowania i kopiowania).
+
+    Strony plików wczytywane są leniwie przy pierwszym dostępie i współdzielone przez
+    wszystkie procesy czytające tę samą migawkę. Filtry wybierają wiersze na kodach
+    słownikowych i znacznikach czasu; wynik z filtrami jest kopią wybranych wierszy.
+
+    Parametry:
+    path - katalog migawki zapisanej przez save_snapshot
+    columns - lista kolumn do wczytania (domyślnie wszystkie)
+    years, cities, stations - opcjonalne filtry: lata, miejscowości, kody stacji
+    """
+    path = Path(path)
+    manifest = _read_manifest(path)
+    if manifest is None:
+        raise FileNotFoundError(f"Brak migawki w: {path}")
+
+    by_name = {column['name']: column for column in manifest['columns']}
+    if columns is None:
+        columns = list(by_name)
+    missing = [col for col in columns if col not in by_name]
+    if missing:
+        raise KeyError(f"Brak kolumn w migawce: {missing}")
+
+    mask = None
+    for name, allowed in (('Miejscowość', cities), ('kod_stacji', stations), ('data', years)):
+        if allowed is None:
+            continue
+        series = _decode_column(path, by_name[name])
+        if name == 'data':
+            selected = series.dt.year.isin(list(allowed)).to_numpy()
+        else:
+            codes = series.array.codes
+            selected = np.isin(codes, series.cat.categories.get_indexer(list(allowed)))
+            selected &= codes >= 0
+        mask = selected if mask is None else mask & selected
+
+    df = pd.DataFrame({name: _decode_column(path, by_name[name]) for name in columns}, copy=False)
+    if mask is not None:
+        df = df[mask].reset_index(drop=True)
+    return df
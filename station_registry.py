@@ -0,0 +1,128 @@
+import numpy as np
+import pandas as pd
+
+
+# Kolumny metadanych GIOŚ
+CODE_COLUMN = 'Kod stacji'
+OLD_CODES_COLUMN = 'Stary Kod stacji \n(o ile inny od aktualnego)'
+CITY_COLUMN = 'Miejscowość'
+VOIVODESHIP_COLUMN = 'Województwo'
+LATITUDE_COLUMN = 'WGS84 φ N'
+LONGITUDE_COLUMN = 'WGS84 λ E'
+
+
+class StationRegistry:
+    """
+    Rejestr stacji budowany raz na podstawie metadanych GIOŚ.
+
+    Każda aktualna stacja dostaje zwarty identyfikator całkowity (pozycję w tablicy
+    codes), a miejscowość, województwo i współrzędne są przechowywane w tablicach
+    wyrównanych z identyfikatorami. Stare i aktualne kody są zamieniane na
+    identyfikatory hurtowo: przeliczane są tylko unikalne kody kolumny, a wynik
+    rozkładany jest na wiersze przez take.
+    """
+
+    def __init__(self, df_metadata):
+        if CODE_COLUMN not in df_metadata.columns:
+            raise KeyError(f"Brak kolumny '{CODE_COLUMN}' w metadanych")
+
+        stations = df_metadata.copy()
+        stations[CODE_COLUMN] = stations[CODE_COLUMN].astype(str).str.strip()
+        stations = stations.drop_duplicates(CODE_COLUMN).reset_index(drop=True)
+
+        self.codes = stations[CODE_COLUMN].to_numpy(dtype=object)
+        self.cities = self._column(stations, CITY_COLUMN)
+        self.voivodeships = self._column(stations, VOIVODESHIP_COLUMN)
+        if VOIVODESHIP_COLUMN in stations.columns:
+            # Nazwy województw w metadanych mają różną wielkość liter
+            self.voivodeships = stations[VOIVODESHIP_COLUMN].str.capitalize().to_numpy(dtype=object)
+        self.latitudes = self._numeric_column(stations, LATITUDE_COLUMN)
+        self.longitudes = self._numeric_column(stations, LONGITUDE_COLUMN)
+
+        self.has_cities = CITY_COLUMN in stations.columns
+        self.has_voivodeships = VOIVODESHIP_COLUMN in stations.columns
+        self.has_old_codes = OLD_CODES_COLUMN in stations.columns
+
+        # Kody aktualne, a następnie stare (stary kod ma pierwszeństwo, jak w clean_data)
+        lookup = dict(zip(self.codes, range(len(self.codes))))
+        if self.has_old_codes:
+            old = stations[OLD_CODES_COLUMN].astype('string').str.split(',').explode().str.strip()
+            old = old[old.notna() & (old != '')]
+            lookup.update(zip(old.to_numpy(dtype=object), old.index.to_numpy()))
+        self.n_old_codes = len(lookup) - len(self.codes) if self.has_old_codes else 0
+
+        self._lookup_index = pd.Index(list(lookup.keys()), dtype=object)
+        self._lookup_ids = np.fromiter(lookup.values(), dtype=np.int32, count=len(lookup))
+
+    @staticmethod
+    def _column(stations, name):
+        if name in stations.columns:
+            return stations[name].to_numpy(dtype=object)
+        return np.full(len(stations), np.nan, dtype=object)
+
+    @staticmethod
+    def _numeric_column(stations, name):
+        if name in stations.columns:
+            return pd.to_numeric(stations[name], errors='coerce').to_numpy(dtype='float64')
+        return np.full(len(stations), np.nan)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def _encode(self, codes):
+        """Zwraca (unikalne kody jako teksty, pozycje wierszy w unikalnych kodach)."""
+        categorical = pd.Categorical(pd.Series(codes, dtype=object).astype(str).str.strip())
+        return np.asarray(categorical.categories, dtype=object), categorical.codes
+
+    def ids(self, codes):
+        """Zamienia kody stacji (stare lub aktualne) na identyfikatory; -1 dla nieznanych."""
+        categories, positions = self._encode(codes)
+        category_ids = self._ids_of_unique(categories)
+        return category_ids.take(positions)
+
+    def _ids_of_unique(self, categories):
+        if len(self._lookup_ids) == 0:
+            return np.full(len(categories), -1, dtype=np.int32)
+        found = self._lookup_index.get_indexer(categories)
+        return np.where(found >= 0, self._lookup_ids.take(found), -1).astype(np.int32)
+
+    def remap(self, codes):
+        """Zamienia stare kody stacji na aktualne; nieznane kody pozostają bez zmian."""
+        categories, positions = self._encode(codes)
+        category_ids = self._ids_of_unique(categories)
+        current = np.where(category_ids >= 0, self.codes.take(np.maximum(category_ids, 0)), categories)
+        return current.take(positions)
+
+    def _attribute(self, values, codes):
+        ids = self.ids(codes)
+        result = values.take(np.maximum(ids, 0))
+        if len(result):
+            result[ids < 0] = np.nan
+        return result
+
+    def city(self, codes):
+        """Miejscowość dla każdego kodu stacji (NaN dla nieznanych)."""
+        return self._attribute(self.cities, codes)
+
+    def voivodeship(self, codes):
+        """Województwo dla każdego kodu stacji (NaN dla nieznanych)."""
+        return self._attribute(self.voivodeships, codes)
+
+    def coordinates(self, codes):
+        """Współrzędne (szerokość, długość) dla każdego kodu stacji."""
+        return self._attribute(self.latitudes, codes), self._attribute(self.longitudes, codes)
+
+    def station_to_city(self):
+        """Słownik kod stacji -> miejscowość."""
+        return dict(zip(self.codes, self.cities))
+
+    def station_to_voivodeship(self):
+        """Słownik kod stacji -> województwo."""
+        return dict(zip(self.codes, self.voivodeships))
+
+
+def as_registry(metadata_or_registry):
+    """Zwraca StationRegistry, budując go z metadanych, jeśli podano DataFrame."""
+    if isinstance(metadata_or_registry, StationRegistry):
+        return metadata_or_registry
+    return StationRegistry(metadata_or_registry)
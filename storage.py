@@ -0,0 +1,198 @@
+import json
+import shutil
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+from pollutants import VALUE_COLUMNS
+
+
+# Kolumny partycjonujące zbiór danych (rok i kod stacji)
+PARTITION_YEAR = 'rok'
+PARTITION_STATION = 'kod_stacji'
+
+# Klucz metadanych schematu z listą kolumn oryginalnego DataFrame
+_COLUMNS_METADATA_KEY = b'pm25_kolumny'
+
+DATASET_SUFFIX = '.parquet'
+
+# Plik znacznika w katalogu zbioru (pyarrow pomija pliki zaczynające się od '_')
+MARKER_FILE = '_pm25_dataset'
+
+
+def is_dataset_path(path):
+    """Sprawdza, czy ścieżka wskazuje na zbiór danych w formacie kolumnowym (rozszerzenie .parquet)."""
+    return Path(path).suffix == DATASET_SUFFIX
+
+
+def _is_own_dataset(path):
+    """
+    Czy katalog zawiera zbiór zapisany przez save_dataset.
+
+    Rozpoznawany po pliku znacznika albo (dla zbiorów zapisanych przed jego
+    wprowadzeniem) po układzie partycji: tylko katalogi rok=... i pliki ukryte.
+    """
+    if (path / MARKER_FILE).is_file():
+        return True
+    entries = list(path.iterdir())
+    return bool(entries) and all(
+        (entry.is_dir() and entry.name.startswith(f'{PARTITION_YEAR}=')) or entry.name.startswith(('_', '.'))
+        for entry in entries
+    )
+
+
+def _arrow_type(name, series):
+    """Dobiera typ Arrow dla kolumny oczyszczonych danych."""
+    if name == 'Miejscowość':
+        return pa.dictionary(pa.int32(), pa.string())
+    if name in VALUE_COLUMNS:
+        return pa.float32()
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return pa.timestamp('ns')
+    return None
+
+
+def save_dataset(df, output_path='pm25_cleaned.parquet'):
+    """
+    Zapisuje dane do kolumnowego zbioru Parquet partycjonowanego po roku i stacji.
+
+    Parametry:
+    df - dane w formacie długim (kolumny 'Miejscowość', 'kod_stacji', 'data', 'pm25', ...)
+    output_path - katalog docelowy; zastępowany jest tylko wcześniej zapisany zbiór
+                  (inny istniejący plik lub katalog powoduje FileExistsError)
+
+    Zbiór zapisywany jest do katalogu tymczasowego obok output_path i podmieniany
+    dopiero po udanym zapisie, więc przerwany zapis nie niszczy poprzedniego zbioru.
+    """
+    df = df.reset_index() if PARTITION_STATION not in df.columns else df
+    original_columns = [str(col) for col in df.columns]
+
+    df = df.copy()
+    df[PARTITION_STATION] = df[PARTITION_STATION].astype(str)
+    if PARTITION_YEAR not in df.columns:
+        df[PARTITION_YEAR] = df['data'].dt.year
+    df[PARTITION_YEAR] = df[PARTITION_YEAR].astype('Int16')
+
+    fields = []
+    for name in df.columns:
+        arrow_type = _arrow_type(name, df[name])
+        if name == PARTITION_YEAR:
+            arrow_type = pa.int16()
+        if arrow_type is None:
+            arrow_type = pa.Schema.from_pandas(df[[name]], preserve_index=False).field(name).type
+        fields.append(pa.field(name, arrow_type))
+
+    metadata = {_COLUMNS_METADATA_KEY: json.dumps(original_columns).encode('utf-8')}
+    schema = pa.schema(fields, metadata=metadata)
+    table = pa.Table.from_pandas(df, schema=schema, preserve_index=False)
+
+    output_path = Path(output_path)
+    if output_path.exists() and not (output_path.is_dir() and _is_own_dataset(output_path)):
+        raise FileExistsError(f"{output_path} istnieje i nie jest zbiorem zapisanym przez save_dataset")
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = Path(tempfile.mkdtemp(prefix=f'.{output_path.name}.', dir=output_path.parent))
+    try:
+        ds.write_dataset(
+            table,
+            tmp_path,
+            format='parquet',
+            partitioning=_partitioning(),
+            existing_data_behavior='overwrite_or_ignore',
+        )
+        (tmp_path / MARKER_FILE).write_text(json.dumps({'kolumny': original_columns}), encoding='utf-8')
+        # Podmiana: stary zbiór usuwany dopiero po przeniesieniu nowego na jego miejsce
+        old_path = None
+        if output_path.exists():
+            old_path = Path(tempfile.mkdtemp(prefix=f'.{output_path.name}.old.', dir=output_path.parent))
+            output_path.rename(old_path / output_path.name)
+        tmp_path.rename(output_path)
+        if old_path is not None:
+            shutil.rmtree(old_path)
+    except BaseException:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        raise
+    print(f"Dane zapisane do: {output_path}")
+    return str(output_path)
+
+
+def _partitioning(dictionaries=None):
+    """Schemat partycjonowania w stylu Hive: rok=YYYY/kod_stacji=XXX."""
+    return ds.partitioning(
+        pa.schema([(PARTITION_YEAR, pa.int16()), (PARTITION_STATION, pa.string())]),
+        flavor='hive',
+        dictionaries=dictionaries,
+    )
+
+
+def _build_filter(years=None, cities=None, stations=None):
+    """Buduje wyrażenie filtrujące dla lat, miejscowości i stacji."""
+    expression = None
+    conditions = [
+        (PARTITION_YEAR, years),
+        ('Miejscowość', cities),
+        (PARTITION_STATION, stations),
+    ]
+    for column, values in conditions:
+        if values is None:
+            continue
+        condition = ds.field(column).isin(list(values))
+        expression = condition if expression is None else expression & condition
+    return expression
+
+
+def open_dataset(path):
+    """Otwiera zbiór danych zapisany przez save_dataset (bez wczytywania danych)."""
+    return ds.dataset(str(path), format='parquet', partitioning=_partitioning(dictionaries='infer'))
+
+
+def _dataset_columns(dataset, columns=None):
+    """Kolumny do wczytania: domyślnie wszystkie w kolejności oryginalnego DataFrame."""
+    stored_columns = dataset.schema.names
+    metadata = dataset.schema.metadata or {}
+    if _COLUMNS_METADATA_KEY in metadata:
+        stored_columns = json.loads(metadata[_COLUMNS_METADATA_KEY].decode('utf-8'))
+
+    if columns is None:
+        columns = stored_columns
+    missing = [col for col in columns if col not in dataset.schema.names]
+    if missing:
+        raise KeyError(f"Brak kolumn w zbiorze danych: {missing}")
+    return list(columns)
+
+
+def table_to_frame(table):
+    """Zamienia tabelę Arrow ze zbioru danych na DataFrame o typach jak w load_dataset."""
+    df = table.to_pandas()
+
+    # Kod stacji przechowywany jest jako kategoria, tak samo jak miejscowość
+    for column in ('Miejscowość', PARTITION_STATION):
+        if column in df.columns and not isinstance(df[column].dtype, pd.CategoricalDtype):
+            df[column] = df[column].astype('category')
+    if PARTITION_YEAR in df.columns:
+        df[PARTITION_YEAR] = df[PARTITION_YEAR].astype('Int64')
+
+    return df
+
+
+def load_dataset(path='pm25_cleaned.parquet', columns=None, years=None, cities=None, stations=None):
+    """
+    Wczytuje kolumnowy zbiór danych z opcjonalnym wyborem kolumn i filtrami.
+
+    Parametry:
+    path - katalog zbioru danych
+    columns - lista kolumn do wczytania (domyślnie wszystkie zapisane kolumny)
+    years, cities, stations - listy lat, miejscowości i kodów stacji do wczytania
+
+    Filtry po roku i stacji odcinają całe partycje, więc czytane są tylko potrzebne pliki.
+    """
+    dataset = open_dataset(path)
+    columns = _dataset_columns(dataset, columns)
+    table = dataset.to_table(
+        columns=columns,
+        filter=_build_filter(years=years, cities=cities, stations=stations),
+    )
+    return table_to_frame(table)
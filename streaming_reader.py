@@ -0,0 +1,130 @@
+import re
+import shutil
+import tempfile
+import zipfile
+
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+
+from read_and_clean_data import _open, is_header_row
+from sheet_layout import DATE_PATTERN
+from station_registry import as_registry
+from timestamps import decode_timestamps, shift_midnight
+
+
+def _to_float(values):
+    """Konwertuje wartości komórek (liczby lub teksty z przecinkiem) na float."""
+    series = pd.Series(values, dtype=object)
+    return pd.to_numeric(series.astype(str).str.replace(',', '.'), errors='coerce').to_numpy(dtype='float64')
+
+
+def _rows_to_long(rows, station_codes, station_cities):
+    """Zamienia blok wierszy szerokiego arkusza na DataFrame w formacie długim."""
+    n_rows = len(rows)
+    n_stations = len(station_codes)
+
+    # Dekodowanie układu GIOŚ z korektą pomiarów z godziny 00:00
+    dates = shift_midnight(decode_timestamps([row[0] for row in rows]))
+
+    values = np.empty((n_rows, n_stations), dtype=object)
+    for i, row in enumerate(rows):
+        cells = list(row[1:n_stations + 1])
+        cells += [None] * (n_stations - len(cells))
+        values[i, :] = cells
+
+    return pd.DataFrame({
+        'Miejscowość': np.tile(station_cities, n_rows),
+        'kod_stacji': np.tile(station_codes, n_rows),
+        'data': np.repeat(dates, n_stations),
+        'pm25': _to_float(values.ravel()),
+    })
+
+
+def iter_long_chunks(rows, year, df_metadata, chunk_rows=2000):
+    """
+    Strumieniowo przetwarza wiersze arkusza GIOŚ na dane w formacie długim.
+
+    Wiersze nagłówkowe są rozpoznawane w locie: pierwszy wiersz, który nie jest
+    zbędnym nagłówkiem, zawiera kody stacji, a dane zaczynają się od pierwszego
+    wiersza z datą. Generator zwraca kolejne DataFrame'y z kolumnami
+    'Miejscowość', 'kod_stacji', 'data', 'pm25' (po chunk_rows godzin naraz),
+    więc zużycie pamięci nie zależy od liczby stacji ani długości roku.
+
+    Parametry:
+    rows - iterowalne wiersze arkusza (krotki wartości komórek)
+    year - rok danych
+    df_metadata - metadane ze stacjami (DataFrame lub StationRegistry)
+    chunk_rows - liczba wierszy arkusza w jednym fragmencie
+    """
+    registry = as_registry(df_metadata)
+    if not registry.has_cities:
+        raise KeyError("Brak kolumn 'Kod stacji' lub 'Miejscowość' w metadanych")
+
+    station_codes = None
+    station_cities = None
+    data_started = False
+    buffer = []
+
+    for row in rows:
+        if not row or all(cell is None for cell in row):
+            continue
+        first_cell = str(row[0])
+
+        if not data_started:
+            if is_header_row(first_cell, year):
+                continue
+            if station_codes is None:
+                # Kody stacji są w pierwszym wierszu, który nie jest nagłówkiem
+                station_codes = [str(code).strip() for code in row[1:]]
+                while station_codes and station_codes[-1] == 'None':
+                    station_codes.pop()
+                station_codes = registry.remap(station_codes)
+                station_cities = registry.city(station_codes)
+            if not re.match(DATE_PATTERN, first_cell):
+                continue
+            data_started = True
+
+        buffer.append(row)
+        if len(buffer) >= chunk_rows:
+            yield _rows_to_long(buffer, station_codes, station_cities)
+            buffer = []
+
+    if not data_started:
+        raise ValueError(f"Nie znaleziono wierszy z datami w pliku dla roku {year}")
+
+    if buffer:
+        yield _rows_to_long(buffer, station_codes, station_cities)
+
+
+def iter_sheet_rows(xlsx_file):
+    """Czyta pierwszy arkusz pliku XLSX wiersz po wierszu (tryb tylko do odczytu)."""
+    workbook = load_workbook(xlsx_file, read_only=True, data_only=True)
+    try:
+        sheet = workbook.worksheets[0]
+        for row in sheet.iter_rows(values_only=True):
+            yield row
+    finally:
+        workbook.close()
+
+
+def stream_gios_archive(year, config, gios_archive_url="https://powietrze.gios.gov.pl/pjp/archives/downloadFile/",
+                        df_metadata=None, cache=None, chunk_rows=2000):
+    """
+    Pobiera archiwum roku i strumieniowo zwraca fragmenty danych w formacie długim.
+
+    Plik XLSX jest rozpakowywany do pliku tymczasowego zamiast do pamięci,
+    a następnie czytany wiersz po wierszu przez iter_long_chunks.
+    """
+    archive_id = config['archive_id']
+    filename = config['pm25_filename']
+    archive = _open(f"{gios_archive_url}{archive_id}", cache=cache, key=f"archive:{archive_id}")
+
+    with archive, zipfile.ZipFile(archive) as z:
+        if filename not in z.namelist():
+            raise FileNotFoundError(f"Plik {filename} nie znaleziony w archiwum")
+        with tempfile.TemporaryFile() as tmp:
+            with z.open(filename) as f:
+                shutil.copyfileobj(f, tmp)
+            tmp.seek(0)
+            yield from iter_long_chunks(iter_sheet_rows(tmp), year, df_metadata, chunk_rows=chunk_rows)
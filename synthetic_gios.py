@@ -0,0 +1,131 @@
+import io
+import zipfile
+
+import numpy as np
+import pandas as pd
+
+from station_registry import CODE_COLUMN, OLD_CODES_COLUMN, CITY_COLUMN, VOIVODESHIP_COLUMN
+
+
+VOIVODESHIPS = [
+    'MAZOWIECKIE', 'ŚLĄSKIE', 'MAŁOPOLSKIE', 'ŁÓDZKIE', 'WIELKOPOLSKIE', 'DOLNOŚLĄSKIE',
+    'POMORSKIE', 'LUBELSKIE', 'PODKARPACKIE', 'ZACHODNIOPOMORSKIE', 'KUJAWSKO-POMORSKIE',
+    'WARMIŃSKO-MAZURSKIE', 'PODLASKIE', 'ŚWIĘTOKRZYSKIE', 'LUBUSKIE', 'OPOLSKIE',
+]
+
+# Do tego roku (włącznie) arkusze używają starych kodów stacji, jeśli stacja je ma
+OLD_CODES_UNTIL = 2016
+
+
+def generate_metadata(n_stations, n_cities=None, old_code_fraction=0.2, seed=0):
+    """
+    Generuje metadane stacji w formacie GIOŚ (kody, stare kody, miejscowości, województwa).
+
+    Parametry:
+    n_stations - liczba stacji
+    n_cities - liczba miejscowości (domyślnie około połowa liczby stacji)
+    old_code_fraction - część stacji, które mają stary kod (używany w arkuszach z wcześniejszych lat)
+    seed - ziarno generatora liczb losowych
+    """
+    rng = np.random.default_rng(seed)
+    if n_cities is None:
+        n_cities = max(1, n_stations // 2)
+
+    city_ids = np.arange(n_stations) % n_cities
+    cities = np.array([f"Miasto{i:03d}" for i in range(n_cities)], dtype=object)
+    voivodeships = np.array([VOIVODESHIPS[i % len(VOIVODESHIPS)] for i in range(n_cities)], dtype=object)
+    codes = [f"{voivodeships[c][:2].capitalize()}Syn{i:05d}" for i, c in enumerate(city_ids)]
+
+    old_codes = np.full(n_stations, np.nan, dtype=object)
+    with_old = rng.random(n_stations) < old_code_fraction
+    old_codes[with_old] = [f"{codes[i][:2]}Old{i:05d}" for i in np.flatnonzero(with_old)]
+
+    return pd.DataFrame({
+        'Nr': np.arange(1, n_stations + 1),
+        CODE_COLUMN: codes,
+        OLD_CODES_COLUMN: old_codes,
+        CITY_COLUMN: cities.take(city_ids),
+        VOIVODESHIP_COLUMN: voivodeships.take(city_ids),
+    })
+
+
+def _sheet_codes(year, df_metadata):
+    """Kody stacji tak, jak występują w arkuszu danego roku (stare kody we wcześniejszych latach)."""
+    codes = df_metadata[CODE_COLUMN].to_numpy(dtype=object)
+    if OLD_CODES_COLUMN in df_metadata.columns and year <= OLD_CODES_UNTIL:
+        old = df_metadata[OLD_CODES_COLUMN].to_numpy(dtype=object)
+        codes = np.where(pd.notna(old), old, codes)
+    return codes
+
+
+def _header_rows(year, codes):
+    """Wiersze nagłówkowe arkusza (w 2014 roku z dodatkowym wierszem 'PM2.5')."""
+    n = len(codes)
+    if year == 2014:
+        return [
+            ['Kod stacji'] + list(codes),
+            ['Wskaźnik'] + ['PM2.5'] * n,
+            ['PM2.5'] + ['1g'] * n,
+            ['Czas uśredniania'] + ['1g'] * n,
+        ]
+    return [
+        ['Nr'] + list(range(1, n + 1)),
+        ['Kod stacji'] + list(codes),
+        ['Wskaźnik'] + ['PM2.5'] * n,
+        ['Czas uśredniania'] + ['1g'] * n,
+        ['Jednostka'] + ['ug/m3'] * n,
+        ['Kod stanowiska'] + [f"{code}-PM2.5-1g" for code in codes],
+    ]
+
+
+def generate_sheet(year, df_metadata, missing_rate=0.05, seed=0):
+    """
+    Generuje surowy arkusz godzinowych pomiarów PM2.5 dla jednego roku (jak pd.read_excel(header=None)).
+
+    Arkusz odtwarza cechy plików GIOŚ: wiersze nagłówkowe (w 2014 roku w innym układzie),
+    stare kody stacji we wcześniejszych latach, znaczniki czasu jako teksty z ostatnią
+    godziną doby zapisaną jako 00:00 następnego dnia, puste komórki dla braków oraz
+    (w 2014 roku) liczby zapisane jako teksty z przecinkiem dziesiętnym.
+
+    Parametry:
+    year - rok danych
+    df_metadata - metadane stacji (np. z generate_metadata)
+    missing_rate - część pomiarów zastąpionych brakiem
+    seed - ziarno generatora liczb losowych
+    """
+    rng = np.random.default_rng([seed, year])
+    codes = _sheet_codes(year, df_metadata)
+    hours = pd.date_range(f"{year}-01-01 01:00", f"{year + 1}-01-01 00:00", freq='h')
+
+    # Sezonowość: wyższe stężenia zimą, do tego losowa zmienność stacji i godzin
+    season = 1 + 0.8 * np.cos(2 * np.pi * (hours.dayofyear.to_numpy() - 15) / 365)
+    station_level = rng.uniform(8, 25, len(codes))
+    values = np.round(rng.gamma(2.0, 0.5, (len(hours), len(codes))) * season[:, None] * station_level, 1)
+
+    cells = values.astype(object)
+    if year == 2014:
+        cells = np.char.replace(values.astype(str), '.', ',').astype(object)
+    cells[rng.random(values.shape) < missing_rate] = np.nan
+
+    data = np.column_stack([hours.strftime('%Y-%m-%d %H:%M:%S').to_numpy(dtype=object), cells])
+    header = np.array(_header_rows(year, codes), dtype=object)
+    return pd.DataFrame(np.vstack([header, data]))
+
+
+def sheet_to_xlsx(sheet):
+    """Zapisuje surowy arkusz do pliku XLSX w pamięci (bajty)."""
+    xlsx = io.BytesIO()
+    sheet.to_excel(xlsx, header=False, index=False)
+    return xlsx.getvalue()
+
+
+def pm25_filename(year):
+    return f"{year}_PM25_1g.xlsx"
+
+
+def generate_archive(year, df_metadata, missing_rate=0.05, seed=0):
+    """Generuje archiwum ZIP z arkuszem PM2.5 danego roku, takie jak archiwa GIOŚ (bajty)."""
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, 'w') as z:
+        z.writestr(pm25_filename(year), sheet_to_xlsx(generate_sheet(year, df_metadata, missing_rate, seed)))
+    return archive.getvalue()
@@ -0,0 +1,87 @@
+import pytest
+import numpy as np
+import pandas as pd
+import sys
+from pathlib import Path
+
+# Dodaj katalog nadrzędny do ścieżki, aby importować moduły
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from aggregation import *
+from aggregation import _kahan_sums
+
+
+def _values(rng, n, _):
+    pm25 = rng.uniform(0, 60, n).round(3)
+    pm25[rng.random(n) < 0.1] = np.nan
+    return pm25
+
+
+@pytest.fixture
+def hourly_data(make_hourly_data):
+    def _make(seed=0):
+        hours = pd.date_range("2020-01-30 01:00", "2020-03-02 00:00", freq="h")
+        stations = [("S1", "Warszawa"), ("S2", "Kraków"), ("S3", None), ("S4", "Kraków")]
+        df = make_hourly_data(hours, stations, _values, seed=seed)
+        # Cała doba bez pomiarów i nieposortowana kolejność wierszy
+        df.loc[(df["kod_stacji"] == "S2") & (df["data"].dt.day == 5), "pm25"] = np.nan
+        return df.sample(frac=1, random_state=seed).reset_index(drop=True)
+
+    return _make
+
+
+def _reference_daily(df, norm_threshold=15):
+    keys = df.assign(data_dzien=df["data"].dt.floor("D"))
+    daily = keys.groupby(["Miejscowość", "kod_stacji", "data_dzien"])["pm25"].mean().round(2).reset_index()
+    daily = daily.rename(columns={"pm25": "pm25_srednia_dobowa"})
+    daily["przekroczenie_normy"] = daily["pm25_srednia_dobowa"] >= norm_threshold
+    return daily
+
+
+def _reference_monthly(df):
+    keys = df.assign(rok=df["data"].dt.year.astype("Int64"), miesiac=df["data"].dt.month)
+    monthly = keys.groupby(["Miejscowość", "kod_stacji", "rok", "miesiac"])["pm25"].mean().round(2).reset_index()
+    return monthly.rename(columns={"pm25": "pm25_srednia_miesieczna"})
+
+
+def test_matches_groupby_reference(hourly_data):
+    """Testuje zgodność wyników z groupby z pandas (braki, stacja bez miejscowości, losowa kolejność)."""
+    df = hourly_data()
+    daily, monthly = aggregate_stats(df, norm_threshold=20)
+
+    pd.testing.assert_frame_equal(daily, _reference_daily(df, 20))
+    pd.testing.assert_frame_equal(monthly, _reference_monthly(df))
+    assert daily["pm25_srednia_dobowa"].isna().any()
+    assert "S3" not in set(daily["kod_stacji"])
+
+
+def test_does_not_modify_input_and_skips_levels(hourly_data):
+    """Testuje, że dane wejściowe nie są modyfikowane, a pominięty poziom zwracany jest jako None."""
+    df = hourly_data(seed=1)
+    columns = list(df.columns)
+
+    daily, monthly = aggregate_stats(df, monthly=False)
+    assert monthly is None and daily is not None
+    daily, monthly = aggregate_stats(df, daily=False)
+    assert daily is None and monthly is not None
+    assert list(df.columns) == columns
+
+
+def test_kahan_sums_per_group():
+    """Testuje sumy i liczby wartości w grupach dla nieposortowanych kluczy."""
+    keys = np.array([2, 0, 2, 2, 0])
+    values = np.array([1.0, 2.0, 3.0, 4.0, 5.0])
+    sums, counts = _kahan_sums(keys, values, 4)
+
+    np.testing.assert_array_equal(sums, [7.0, 0.0, 8.0, 0.0])
+    np.testing.assert_array_equal(counts, [2, 0, 3, 0])
+
+
+def test_exceedance_counts_per_group():
+    """Testuje liczby wartości powyżej progów w grupach (progi w dowolnej kolejności, NaN pomijany)."""
+    groups = np.array([0, 0, 0, 1, 1])
+    values = np.array([5.0, 15.0, np.nan, 25.0, 14.99])
+
+    counts = exceedance_counts(groups, values, [15, 5, 30], 3)
+
+    assert counts.tolist() == [[1, 2, 0], [1, 2, 0], [0, 0, 0]]
@@ -0,0 +1,53 @@
+import pytest
+import pandas as pd
+import sys
+from pathlib import Path
+
+# Dodaj katalog nadrzędny do ścieżki, aby importować moduły
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from batch_render import *
+from rollup import RollupIndex
+
+
+def _index():
+    df = pd.DataFrame({
+        "Miejscowość": ["Warszawa", "Warszawa", "Kraków", "Kraków"],
+        "kod_stacji": ["S1", "S1", "S2", "S2"],
+        "data": pd.to_datetime(["2023-01-01 01:00", "2024-02-01 01:00", "2023-03-01 01:00", "2024-03-01 01:00"]),
+        "pm25": [10.0, 30.0, 20.0, 5.0]
+    })
+    metadata = pd.DataFrame({"Kod stacji": ["S1", "S2"], "Województwo": ["mazowieckie", "małopolskie"]})
+    return RollupIndex.from_hourly(df, metadata)
+
+
+def test_plan_charts_variants():
+    """Testuje listę wykresów: warianty dla każdego roku i każdej miejscowości."""
+    names = [name for name, _, _ in plan_charts(_index())]
+
+    assert names == [
+        "trendy", "heatmapy", "dni_powyzej_normy_2023", "dni_powyzej_normy_2024",
+        "dni_powyzej_normy_wojewodztwa", "trendy_Kraków", "trendy_Warszawa"
+    ]
+
+
+def test_render_all_in_process(tmp_path):
+    """Testuje zapis wszystkich wykresów do PNG i SVG w bieżącym procesie i zamknięcie figur."""
+    import matplotlib.pyplot as plt
+
+    paths, errors = render_all(_index(), tmp_path, max_workers=1)
+
+    assert errors == {}
+    assert len(paths) == 7
+    assert all(Path(p).stat().st_size > 0 for chart in paths.values() for p in chart)
+    assert sorted(Path(p).suffix for p in paths["heatmapy"]) == [".png", ".svg"]
+    assert plt.get_fignums() == []
+
+
+def test_render_all_parallel(tmp_path):
+    """Testuje równoległe rysowanie wykresów w puli procesów."""
+    paths, errors = render_all(_index(), tmp_path, formats=["png"], max_workers=2, cities=["Kraków"], years=[2024])
+
+    assert errors == {}
+    assert sorted(paths) == ["dni_powyzej_normy_2024", "dni_powyzej_normy_wojewodztwa", "heatmapy", "trendy", "trendy_Kraków"]
+    assert (tmp_path / "trendy_Kraków.png").exists()
@@ -0,0 +1,47 @@
+import pytest
+import json
+import sys
+from pathlib import Path
+
+# Dodaj katalog nadrzędny do ścieżki, aby importować moduły
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmark import *
+
+
+def test_run_benchmarks_report(tmp_path):
+    """Testuje, czy raport zawiera wszystkie etapy z czasem i pamięcią."""
+    report = run_benchmarks(n_stations=2, years=[2014], include_read=False, workdir=tmp_path)
+
+    assert list(report["stages"]) == STAGES[1:]
+    assert report["config"]["hourly_rows"] == 2 * 8760
+    assert all(stage["seconds"] >= 0 for stage in report["stages"].values())
+    # Etapy wewnątrz clean_data mają tylko czas (pamięć mierzona jest dla całego clean_data)
+    assert all(stage["peak_bytes"] > 0 for name, stage in report["stages"].items() if name not in ("melt", "remap"))
+    assert report["stages"]["melt"]["peak_bytes"] is None
+    assert report["stages"]["remap"]["rows"] == 2 * 8760
+    json.dumps(report)
+
+
+def test_thresholds_and_baseline():
+    """Testuje wykrywanie przekroczeń progów i regresji względem raportu bazowego."""
+    report = {"config": {"hourly_rows": 10}, "stages": {"clean_data": {"seconds": 2.0, "peak_bytes": 100}}}
+    baseline = {"config": {"hourly_rows": 10}, "stages": {"clean_data": {"seconds": 1.0, "peak_bytes": 100}}}
+
+    assert check_thresholds(report, {"clean_data": {"max_seconds": 3}}) == []
+    assert len(check_thresholds(report, {"clean_data": {"max_seconds": 1, "max_peak_bytes": 50}})) == 2
+    assert compare_reports(report, baseline, tolerance=1.5) == ["clean_data: seconds = 2.0 (bazowo 1.0, x2.00)"]
+    assert compare_reports(report, baseline, tolerance=2.5) == []
+
+
+def test_main_writes_report(tmp_path):
+    """Testuje uruchomienie z linii poleceń: zapis raportu i kod wyjścia przy regresji."""
+    output = tmp_path / "report.json"
+    thresholds = tmp_path / "thresholds.json"
+    thresholds.write_text(json.dumps({"clean_data": {"max_seconds": 0}}))
+
+    code = main(["--stations", "1", "--years", "2020", "--no-read", "--no-memory",
+                 "--output", str(output), "--thresholds", str(thresholds)])
+
+    assert code == 1
+    assert json.loads(output.read_text())["regressions"][0].startswith("clean_data")
@@ -0,0 +1,104 @@
+import pytest
+import pandas as pd
+import sys
+from pathlib import Path
+
+# Dodaj katalog nadrzędny do ścieżki, aby importować moduły
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from chunked import *
+
+
+def _values(rng, n, offset):
+    values = [(i % 17) * 1.7 + offset for i in range(n)]
+    values[5] = float("nan")
+    return values
+
+
+@pytest.fixture
+def hourly_data(make_hourly_data):
+    times = pd.date_range("2024-01-30 20:00", periods=120, freq="h")
+    return make_hourly_data(times, [("S1", "Warszawa", 0.0), ("S2", "Warszawa", 7.5), ("S3", "Kraków", 3.25)], _values)
+
+
+@pytest.fixture(params=["pm25_cleaned.csv", "pm25_cleaned.parquet"])
+def stored(request, tmp_path, hourly_data):
+    from read_and_clean_data import save_cleaned_data
+
+    path = tmp_path / request.param
+    save_cleaned_data(hourly_data, path)
+    return path
+
+
+def _sorted(df, keys):
+    return df.sort_values(keys).reset_index(drop=True)
+
+
+def test_iter_chunks_bounded_size(stored):
+    """Testuje czytanie zapisanych danych fragmentami i filtry."""
+    chunks = list(iter_chunks(stored, chunk_rows=50))
+    assert sum(len(chunk) for chunk in chunks) == 360
+    if stored.suffix == ".csv":
+        assert max(len(chunk) for chunk in chunks) == 50
+    assert pd.api.types.is_datetime64_any_dtype(chunks[0]["data"])
+
+    filtered = pd.concat(iter_chunks(stored, chunk_rows=50, columns=["pm25"], stations=["S2"]))
+    assert list(filtered.columns) == ["pm25"] and len(filtered) == 120
+
+
+def test_chunked_stats_match_in_memory(stored):
+    """Testuje zgodność statystyk liczonych fragmentami z calculate_daily_stats i calculate_monthly_stats."""
+    from data_analysis import load_data, calculate_daily_stats, calculate_monthly_stats
+
+    df = load_data(stored)
+    # Fragmenty po 7 wierszy rozcinają doby i miesiące
+    daily, monthly = chunked_stats(stored, norm_threshold=12, chunk_rows=7)
+
+    keys = ["kod_stacji", "data_dzien"]
+    expected = _sorted(calculate_daily_stats(df, 12), keys)
+    pd.testing.assert_frame_equal(_sorted(daily, keys)[expected.columns], expected, check_dtype=False, check_categorical=False)
+
+    keys = ["kod_stacji", "rok", "miesiac"]
+    expected = _sorted(calculate_monthly_stats(df), keys)
+    pd.testing.assert_frame_equal(_sorted(monthly, keys)[expected.columns], expected, check_dtype=False, check_categorical=False)
+
+
+def test_merge_stats_chunked_matches_merge_stats(stored, tmp_path):
+    """Testuje zapis danych ze statystykami fragmentami (wynik jak merge_stats i save_to_csv)."""
+    from data_analysis import load_data, merge_stats, save_to_csv
+
+    daily, monthly = chunked_stats(stored, chunk_rows=40)
+    save_to_csv(merge_stats(load_data(stored), daily, monthly), tmp_path / "expected.csv")
+    merge_stats_chunked(stored, daily, monthly, tmp_path / "chunked.csv", chunk_rows=40)
+
+    keys = ["kod_stacji", "data"]
+    expected = _sorted(pd.read_csv(tmp_path / "expected.csv"), keys)
+    pd.testing.assert_frame_equal(_sorted(pd.read_csv(tmp_path / "chunked.csv"), keys), expected)
+
+
+def test_chunked_stats_requires_sorted_data(hourly_data, tmp_path):
+    """Testuje błąd dla danych nieuporządkowanych po stacji i czasie."""
+    df = hourly_data
+    df.iloc[::-1].to_csv(tmp_path / "shuffled.csv", index=False)
+    df.iloc[[0, 200, 1]].to_csv(tmp_path / "interleaved.csv", index=False)
+
+    with pytest.raises(ValueError, match="uporządkowane"):
+        chunked_stats(tmp_path / "interleaved.csv", chunk_rows=1)
+    # Dane w odwrotnej kolejności nie przeplatają grup, więc wynik jest poprawny
+    daily, _ = chunked_stats(tmp_path / "shuffled.csv", chunk_rows=25)
+    assert len(daily) == 3 * 6
+
+
+def test_chunked_stats_other_pollutant(hourly_data, tmp_path):
+    """Testuje statystyki fragmentami dla innego wskaźnika (plik pm10_cleaned.csv)."""
+    from read_and_clean_data import save_cleaned_data
+    from data_analysis import calculate_daily_stats
+
+    df = hourly_data.rename(columns={"pm25": "pm10"})
+    save_cleaned_data(df, tmp_path / "pm10_cleaned.csv")
+    daily, monthly = chunked_stats(tmp_path / "pm10_cleaned.csv", chunk_rows=50, pollutant="PM10")
+
+    keys = ["kod_stacji", "data_dzien"]
+    expected = _sorted(calculate_daily_stats(df, pollutant="PM10"), keys)
+    pd.testing.assert_frame_equal(_sorted(daily, keys)[expected.columns], expected, check_dtype=False)
+    assert "pm10_srednia_miesieczna" in monthly.columns
@@ -0,0 +1,62 @@
+import pytest
+import pandas as pd
+import sys
+from pathlib import Path
+
+# Dodaj katalog nadrzędny do ścieżki, aby importować moduły
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from completeness import *
+
+
+def _hourly(station, start, hours, missing=()):
+    times = pd.date_range(start, periods=hours, freq="h")
+    values = [float("nan") if i in missing else 10.0 for i in range(hours)]
+    return pd.DataFrame({"Miejscowość": "Warszawa", "kod_stacji": station, "data": times, "pm25": values})
+
+
+def test_bitmap_of_valid_hours():
+    """Testuje maski ważnych godzin i liczbę ważnych godzin w dobie."""
+    df = pd.concat([_hourly("S1", "2024-01-01", 48, missing=range(30, 40)), _hourly("S2", "2024-01-02", 3)])
+
+    index = CompletenessIndex.from_hourly(df)
+
+    assert index.stations.tolist() == ["S1", "S2"]
+    assert index.origin == pd.Timestamp("2024-01-01")
+    assert index.valid_hours().tolist() == [[24, 14], [0, 3]]
+    assert index.bits[1, 1] == 0b111
+    assert index.valid_days(min_hours=18).tolist() == [[True, False], [False, False]]
+    assert index.valid_days(min_hours=1, hours=[0, 1]).tolist() == [[True, True], [False, True]]
+
+    # Ten sam indeks dla innego wskaźnika (kolumna pm10)
+    pm10 = CompletenessIndex.from_hourly(df.rename(columns={"pm25": "pm10"}), pollutant="PM10")
+    assert (pm10.bits == index.bits).all()
+
+
+def test_coverage_and_station_selection():
+    """Testuje pokrycie w latach i miesiącach oraz wybór stacji z pokryciem w każdym roku."""
+    full = pd.concat([_hourly("S1", "2015-01-01", 365 * 24), _hourly("S1", "2016-01-01", 366 * 24)])
+    partial = pd.concat([_hourly("S2", "2015-01-01", 365 * 24), _hourly("S2", "2016-01-01", 100 * 24)])
+    only_first = _hourly("S3", "2015-01-01", 365 * 24)
+
+    index = CompletenessIndex.combine([CompletenessIndex.from_hourly(df) for df in [full, partial, only_first]])
+
+    coverage = index.coverage("year")
+    assert coverage.loc["S1"].tolist() == [1.0, 1.0]
+    assert coverage.loc["S2", 2016] == pytest.approx(100 / 366)
+    assert index.coverage("month").loc["S2", (2016, 4)] == pytest.approx(9 / 30)
+    assert index.stations_with_coverage(0.75) == ["S1"]
+    assert index.stations_with_coverage(0.25) == ["S1", "S2"]
+    assert index.stations_with_coverage(0.75, years=[2015]) == ["S1", "S2", "S3"]
+    assert index.stations_with_coverage(0.75, years=[2015, 2017]) == []
+
+
+def test_save_and_load(tmp_path):
+    """Testuje zapis i odczyt indeksu."""
+    index = CompletenessIndex.from_hourly(_hourly("S1", "2024-03-01 05:00", 30, missing=[2]))
+
+    loaded = CompletenessIndex.load(index.save(tmp_path / "completeness.npz"))
+
+    assert loaded.stations.tolist() == ["S1"]
+    assert loaded.origin == index.origin
+    assert (loaded.bits == index.bits).all()
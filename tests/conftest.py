@@ -0,0 +1,109 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+
+class _FileHandler(BaseHTTPRequestHandler):
+    """Serwuje pliki z atrybutu files serwera i zlicza żądania."""
+
+    def do_GET(self):
+        with self.server.lock:
+            self.server.request_count += 1
+            self.server.active += 1
+            self.server.max_active = max(self.server.max_active, self.server.active)
+        try:
+            self._respond()
+        finally:
+            with self.server.lock:
+                self.server.active -= 1
+
+    def _respond(self):
+        time.sleep(self.server.delay)
+        # Chwilowe błędy: pierwsze n żądań danej ścieżki kończy się kodem 503
+        if self.server.failures.get(self.path, 0) > 0:
+            self.server.failures[self.path] -= 1
+            self.send_response(503)
+            self.end_headers()
+            return
+        content = self.server.files.get(self.path)
+        if content is None:
+            self.send_response(404)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def local_http_server():
+    """Lokalny serwer HTTP zastępujący powietrze.gios.gov.pl w testach."""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _FileHandler)
+    server.files = {}
+    server.request_count = 0
+    server.failures = {}
+    server.delay = 0
+    server.active = 0
+    server.max_active = 0
+    server.lock = threading.Lock()
+    server.base_url = f"http://127.0.0.1:{server.server_port}"
+
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def make_gios_archive():
+    """Zwraca funkcję budującą archiwum ZIP z arkuszami w formacie GIOŚ."""
+    import io
+    import zipfile
+    import pandas as pd
+
+    def _make(sheets):
+        archive = io.BytesIO()
+        with zipfile.ZipFile(archive, 'w') as z:
+            for filename, rows in sheets.items():
+                xlsx = io.BytesIO()
+                pd.DataFrame(rows).to_excel(xlsx, header=False, index=False)
+                z.writestr(filename, xlsx.getvalue())
+        return archive.getvalue()
+
+    return _make
+
+
+@pytest.fixture
+def make_hourly_data():
+    """
+    Zwraca funkcję budującą dane godzinowe w formacie długim ('Miejscowość', 'kod_stacji', 'data', 'pm25').
+
+    Parametry funkcji:
+    times - znaczniki czasu pomiarów każdej stacji (np. pd.date_range)
+    stations - lista krotek (kod stacji, miejscowość[, parametr]); parametr trafia do values
+    values - funkcja (rng, liczba godzin, parametr) -> wartości 'pm25' stacji
+    seed - ziarno generatora wspólnego dla stacji (wywoływanego po kolei dla każdej z nich)
+    """
+    import numpy as np
+    import pandas as pd
+
+    def _make(times, stations, values, seed=0):
+        rng = np.random.default_rng(seed)
+        frames = []
+        for station in stations:
+            code, city = station[:2]
+            parameter = station[2] if len(station) > 2 else None
+            frames.append(pd.DataFrame({
+                "Miejscowość": city, "kod_stacji": code, "data": times,
+                "pm25": values(rng, len(times), parameter),
+            }))
+        return pd.concat(frames, ignore_index=True)
+
+    return _make
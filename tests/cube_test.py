@@ -0,0 +1,61 @@
+import pytest
+import numpy as np
+import pandas as pd
+import sys
+from pathlib import Path
+
+# Dodaj katalog nadrzędny do ścieżki, aby importować moduły
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from cube import *
+from data_analysis import calculate_daily_stats, calculate_monthly_stats
+
+
+def _values(rng, n, _):
+    pm25 = rng.integers(0, 40, n).astype(float)
+    pm25[::7] = np.nan
+    return pm25
+
+
+@pytest.fixture
+def hourly_data(make_hourly_data):
+    hours = pd.date_range("2020-01-30 01:00", "2020-02-02 00:00", freq="h")
+    return make_hourly_data(hours, [("S1", "Warszawa"), ("S2", "Kraków")], _values)
+
+
+def test_roundtrip_long_format(hourly_data):
+    """Testuje konwersję z formatu długiego do kostki i z powrotem."""
+    df = hourly_data
+    cube = PM25Cube.from_long(df)
+
+    assert cube.values.dtype == np.float32
+    assert cube.n_stations == 2
+    assert cube.n_hours % 24 == 0
+
+    back = cube.to_long().sort_values(["kod_stacji", "data"], ignore_index=True)
+    pd.testing.assert_frame_equal(back, df.sort_values(["kod_stacji", "data"], ignore_index=True), check_dtype=False)
+
+
+def test_daily_and_monthly_stats_match_groupby(hourly_data):
+    """Testuje zgodność średnich z kostki z calculate_daily_stats i calculate_monthly_stats."""
+    df = hourly_data
+    cube = PM25Cube.from_long(df)
+
+    pd.testing.assert_frame_equal(cube.daily_stats(), calculate_daily_stats(df.copy()), check_dtype=False)
+    pd.testing.assert_frame_equal(cube.monthly_stats(), calculate_monthly_stats(df.copy()), check_dtype=False)
+
+
+def test_missing_period_is_not_reported():
+    """Testuje, czy okres bez wierszy (przerwa między latami) nie trafia do statystyk."""
+    df = pd.DataFrame({
+        "Miejscowość": ["Warszawa", "Warszawa"],
+        "kod_stacji": ["S1", "S1"],
+        "data": pd.to_datetime(["2015-01-01 01:00", "2015-03-01 01:00"]),
+        "pm25": [10.0, 20.0]
+    })
+
+    cube = PM25Cube.from_long(df)
+
+    assert len(cube.daily_stats()) == 2
+    assert cube.monthly_stats()["miesiac"].tolist() == [1, 3]
+    assert cube.mask.sum() == cube.n_hours - 2
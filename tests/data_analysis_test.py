@@ -35,4 +35,43 @@ def test_calculate_monthly_stats():
 
     monthly = calculate_monthly_stats(df)
 
-    assert monthly.iloc[0]["pm25_srednia_miesieczna"] == 40  # średnia z 30 i 50
\ No newline at end of file
+    assert monthly.iloc[0]["pm25_srednia_miesieczna"] == 40  # średnia z 30 i 50
+
+
+def test_stats_for_other_pollutant():
+    """Testuje statystyki dla innego wskaźnika (kolumna pm10 i nazwy kolumn wynikowych)."""
+    df = pd.DataFrame({
+        "Miejscowość": ["Kraków", "Kraków"],
+        "kod_stacji": ["S3", "S3"],
+        "data": pd.to_datetime(["2020-03-01 01:00", "2020-03-01 12:00"]),
+        "pm10": [40, 70]
+    })
+
+    daily = calculate_daily_stats(df, norm_threshold=50, pollutant="PM10")
+    monthly = calculate_monthly_stats(df, pollutant="PM10")
+
+    assert daily.iloc[0]["pm10_srednia_dobowa"] == 55 and daily.iloc[0]["przekroczenie_normy"] == True
+    assert monthly.iloc[0]["pm10_srednia_miesieczna"] == 55
+
+def test_load_data_csv_filters(tmp_path):
+    """Testuje filtry lat i miejscowości przy wczytywaniu pliku CSV."""
+    path = tmp_path / "pm25.csv"
+    pd.DataFrame({
+        "Miejscowość": ["Warszawa", "Katowice", "Warszawa"],
+        "kod_stacji": ["S1", "S2", "S1"],
+        "data": ["2015-01-01 01:00:00", "2024-01-01 01:00:00", "2024-01-02 01:00:00"],
+        "pm25": [10, 20, 30]
+    }).to_csv(path, index=False)
+
+    df = load_data(path, columns=["pm25"], years=[2024], cities=["Warszawa"])
+
+    assert list(df.columns) == ["pm25"]
+    assert df["pm25"].tolist() == [30]
+
+
+def test_get_voivodeship_mapping():
+    """Testuje mapowanie stacji na województwa bez modyfikacji metadanych."""
+    metadata = pd.DataFrame({"Kod stacji": ["S1"], "Województwo": ["MAZOWIECKIE"]})
+
+    assert get_voivodeship_mapping(metadata) == {"S1": "Mazowieckie"}
+    assert metadata.iloc[0]["Województwo"] == "MAZOWIECKIE"
@@ -0,0 +1,96 @@
+import pytest
+import pandas as pd
+import sys
+from pathlib import Path
+
+# Dodaj katalog nadrzędny do ścieżki, aby importować moduły
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from download_cache import *
+from read_and_clean_data import download_gios_archive
+
+
+def test_fetch_hit_and_miss(tmp_path, local_http_server):
+    """Testuje, czy drugi odczyt nie wykonuje żądania HTTP."""
+    local_http_server.files["/622"] = b"metadane"
+    cache = DownloadCache(tmp_path / "cache")
+
+    assert cache.fetch(f"{local_http_server.base_url}/622") == b"metadane"
+    assert cache.fetch(f"{local_http_server.base_url}/622") == b"metadane"
+
+    assert local_http_server.request_count == 1
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_cache_persists_and_offline_mode(tmp_path, local_http_server):
+    """Testuje odczyt z dysku w nowej instancji oraz tryb offline."""
+    local_http_server.files["/1"] = b"abc"
+    DownloadCache(tmp_path / "cache").fetch(f"{local_http_server.base_url}/1")
+
+    offline = DownloadCache(tmp_path / "cache", offline=True)
+    assert offline.fetch(f"{local_http_server.base_url}/1") == b"abc"
+
+    with pytest.raises(ConnectionError):
+        offline.fetch(f"{local_http_server.base_url}/2")
+    assert local_http_server.request_count == 1
+
+
+def test_corrupted_entry_is_refetched(tmp_path, local_http_server):
+    """Testuje walidację skrótu uszkodzonego wpisu."""
+    local_http_server.files["/1"] = b"abc"
+    cache = DownloadCache(tmp_path / "cache")
+    url = f"{local_http_server.base_url}/1"
+    cache.fetch(url)
+
+    for obj in (tmp_path / "cache" / "objects").iterdir():
+        obj.write_bytes(b"zepsute")
+
+    assert cache.fetch(url) == b"abc"
+    assert local_http_server.request_count == 2
+
+
+def test_lru_eviction(tmp_path, local_http_server):
+    """Testuje usuwanie najdawniej używanych wpisów po przekroczeniu limitu."""
+    for name in ["/a", "/b", "/c"]:
+        local_http_server.files[name] = b"x" * 10 + name.encode()
+    cache = DownloadCache(tmp_path / "cache", max_size_bytes=25)
+
+    cache.fetch(f"{local_http_server.base_url}/a")
+    cache.fetch(f"{local_http_server.base_url}/b")
+    cache.fetch(f"{local_http_server.base_url}/a")  # /a staje się świeższe niż /b
+    cache.fetch(f"{local_http_server.base_url}/c")
+
+    assert cache.stats()["entries"] == 2
+    assert cache.total_size() <= 25
+    cache.fetch(f"{local_http_server.base_url}/a")
+    assert cache.stats()["hits"] == 2
+
+
+def test_entry_larger_than_limit(tmp_path, local_http_server):
+    """Testuje pobranie pliku większego niż limit pamięci podręcznej."""
+    local_http_server.files["/duzy"] = b"x" * 1000
+    local_http_server.files["/maly"] = b"y" * 5
+    cache = DownloadCache(tmp_path / "cache", max_size_bytes=10)
+
+    assert cache.fetch(f"{local_http_server.base_url}/duzy") == b"x" * 1000
+    assert cache.stats()["entries"] == 1
+    # Kolejny zapis usuwa zbyt duży wpis
+    assert cache.fetch(f"{local_http_server.base_url}/maly") == b"y" * 5
+    assert cache.stats()["entries"] == 1
+    assert cache.total_size() <= 10
+
+
+def test_download_gios_archive_uses_cache(tmp_path, local_http_server, make_gios_archive):
+    """Testuje pobieranie archiwum rocznego przez pamięć podręczną."""
+    local_http_server.files["/100"] = make_gios_archive({
+        "2020_PM25_1g.xlsx": [["Kod stacji", "S1"], ["2020-01-01 01:00:00", 5]]
+    })
+
+    cache = DownloadCache(tmp_path / "cache")
+    config = {"archive_id": "100", "pm25_filename": "2020_PM25_1g.xlsx"}
+    for _ in range(2):
+        df = download_gios_archive(2020, config, f"{local_http_server.base_url}/", cache=cache)
+        assert df.shape == (2, 2)
+
+    assert local_http_server.request_count == 1
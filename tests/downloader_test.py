@@ -0,0 +1,99 @@
+import pytest
+import pandas as pd
+import sys
+from pathlib import Path
+
+# Dodaj katalog nadrzędny do ścieżki, aby importować moduły
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from downloader import *
+
+
+def test_download_streams_to_file(local_http_server):
+    """Testuje pobieranie fragmentami do pliku tymczasowego z raportowaniem postępu."""
+    local_http_server.files["/a"] = b"x" * 10_000
+    progress = []
+    downloader = Downloader(chunk_size=4096, progress=lambda key, done, total: progress.append((key, done, total)))
+
+    with downloader.download(f"{local_http_server.base_url}/a", key="a") as f:
+        assert file_size(f) == 10_000
+        assert f.read() == b"x" * 10_000
+
+    assert progress[-1] == ("a", 10_000, 10_000) and len(progress) == 3
+    assert downloader.transfers[0]["bytes"] == 10_000 and downloader.transfers[0]["attempts"] == 1
+    assert downloader.throughput()["bytes"] == 10_000
+
+
+def test_download_retries_transient_errors(local_http_server):
+    """Testuje ponawianie po kodzie 503 i brak ponowień po 404."""
+    local_http_server.files["/a"] = b"abc"
+    local_http_server.failures["/a"] = 2
+    downloader = Downloader(retries=2, backoff=0.01)
+
+    with downloader.download(f"{local_http_server.base_url}/a") as f:
+        assert f.read() == b"abc"
+    assert downloader.transfers[-1]["attempts"] == 3
+
+    requests_before = local_http_server.request_count
+    with pytest.raises(requests.HTTPError):
+        downloader.download(f"{local_http_server.base_url}/brak")
+    assert local_http_server.request_count == requests_before + 1
+
+    local_http_server.failures["/a"] = 5
+    with pytest.raises(requests.HTTPError):
+        downloader.download(f"{local_http_server.base_url}/a")
+
+
+def test_fetch_many_concurrent_with_cache(local_http_server, tmp_path):
+    """Testuje równoczesne pobieranie z ograniczeniem liczby połączeń, błędy i pamięć podręczną."""
+    from download_cache import DownloadCache
+
+    local_http_server.delay = 0.2
+    urls = {}
+    for i in range(6):
+        local_http_server.files[f"/{i}"] = bytes([i]) * 1000
+        urls[f"archive:{i}"] = f"{local_http_server.base_url}/{i}"
+    urls["archive:brak"] = f"{local_http_server.base_url}/brak"
+    cache = DownloadCache(tmp_path / "cache")
+    downloader = Downloader(max_workers=3)
+
+    files, errors = downloader.fetch_many(urls, cache=cache)
+
+    assert sorted(files) == [f"archive:{i}" for i in range(6)] and list(errors) == ["archive:brak"]
+    assert 1 < local_http_server.max_active <= 3
+    with files["archive:4"] as f:
+        assert f.read() == bytes([4]) * 1000
+    for f in files.values():
+        f.close()
+
+    requests_before = local_http_server.request_count
+    files, _ = downloader.fetch_many({"archive:4": urls["archive:4"]}, cache=cache)
+    files["archive:4"].close()
+    assert local_http_server.request_count == requests_before
+
+
+def test_transfer_history_is_bounded(local_http_server, monkeypatch):
+    """Testuje ograniczoną historię pobrań przy łącznych licznikach przepustowości."""
+    import downloader as downloader_module
+
+    monkeypatch.setattr(downloader_module, "MAX_TRANSFERS", 2)
+    local_http_server.files["/a"] = b"abc"
+    downloader = Downloader()
+    for _ in range(5):
+        downloader.download(f"{local_http_server.base_url}/a").close()
+
+    assert len(downloader.transfers) == 2
+    assert downloader.throughput()["bytes"] == 15 and downloader.download_count == 5
+
+
+def test_cache_fetch_timeout_reuses_session(local_http_server, tmp_path, monkeypatch):
+    """Testuje, czy limit czasu w DownloadCache.fetch korzysta ze wspólnego Downloadera (bez nowej sesji)."""
+    from download_cache import DownloadCache
+
+    local_http_server.files["/a"] = b"abc"
+    shared = Downloader()
+    monkeypatch.setattr("download_cache.default_downloader", lambda: shared)
+
+    cache = DownloadCache(tmp_path / "cache")
+    assert cache.fetch(f"{local_http_server.base_url}/a", timeout=5) == b"abc"
+    assert shared.download_count == 1
@@ -0,0 +1,63 @@
+import pytest
+import pandas as pd
+import sys
+from pathlib import Path
+
+# Dodaj katalog nadrzędny do ścieżki, aby importować moduły
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from enriched_view import *
+from data_analysis import calculate_daily_stats, calculate_monthly_stats, merge_stats, enrich_stats, save_to_csv
+
+
+def _data():
+    return pd.DataFrame({
+        "Miejscowość": ["Warszawa", "Warszawa", "Warszawa", "Katowice", None],
+        "kod_stacji": ["S1", "S1", "S1", "S2", "S3"],
+        "data": pd.to_datetime([
+            "2020-01-01 01:00", "2020-01-01 12:00", "2020-02-03 05:00", "2020-01-01 01:00", "2020-01-01 01:00"
+        ]),
+        "pm25": [10.0, 20.0, 30.0, 40.0, 50.0]
+    })
+
+
+def _view_and_merged():
+    df = _data()
+    daily = calculate_daily_stats(df.copy())
+    monthly = calculate_monthly_stats(df.copy())
+    return enrich_stats(df, daily, monthly), merge_stats(df.copy(), daily, monthly)
+
+
+def test_materialize_matches_merge_stats():
+    """Testuje, czy zmaterializowany widok jest taki sam jak wynik merge_stats."""
+    view, merged = _view_and_merged()
+
+    assert view.columns == list(merged.columns)
+    pd.testing.assert_frame_equal(view.materialize(), merged, check_dtype=False)
+    assert "data_dzien" not in view.hourly.columns
+
+
+def test_select_columns():
+    """Testuje odczyt pojedynczych kolumn bez materializowania całości."""
+    view, merged = _view_and_merged()
+
+    assert view["pm25_srednia_dobowa"].tolist()[:3] == [15.0, 15.0, 30.0]
+    assert list(view.select(["kod_stacji", "pm25_srednia_miesieczna"]).columns) == ["kod_stacji", "pm25_srednia_miesieczna"]
+
+    # Wycinek wierszy składany jest tylko z pozycji tego wycinka
+    part = view.select(view.columns, slice(1, 4))
+    pd.testing.assert_frame_equal(part.reset_index(drop=True), merged.iloc[1:4].reset_index(drop=True), check_dtype=False)
+
+
+def test_export_and_save(tmp_path):
+    """Testuje eksport do CSV fragmentami oraz zapis znormalizowanych tabel."""
+    view, merged = _view_and_merged()
+
+    save_to_csv(view, tmp_path / "view.csv")
+    merged.to_csv(tmp_path / "merged.csv", index=False)
+    view.to_csv(tmp_path / "chunked.csv", chunk_rows=2)
+    assert (tmp_path / "view.csv").read_text() == (tmp_path / "merged.csv").read_text()
+    assert (tmp_path / "chunked.csv").read_text() == (tmp_path / "merged.csv").read_text()
+
+    loaded = EnrichedView.load(view.save(tmp_path / "view"))
+    pd.testing.assert_frame_equal(loaded.materialize(), merged, check_dtype=False)
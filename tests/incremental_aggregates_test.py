@@ -0,0 +1,74 @@
+import pytest
+import numpy as np
+import pandas as pd
+import sys
+from pathlib import Path
+
+# Dodaj katalog nadrzędny do ścieżki, aby importować moduły
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from incremental_aggregates import *
+from data_analysis import calculate_daily_stats, calculate_monthly_stats
+
+
+def _values(rng, n, _):
+    pm25 = rng.integers(0, 40, n).astype(float)
+    pm25[::5] = np.nan
+    return pm25
+
+
+@pytest.fixture
+def hourly_data(make_hourly_data):
+    """Dane godzinowe dwóch stacji dla godzin od start (włącznie) do end (bez end)."""
+    def _make(start, end, seed=0):
+        hours = pd.date_range(start, end, freq="h", inclusive="left")
+        return make_hourly_data(hours, [("S1", "Warszawa"), ("S2", "Kraków")], _values, seed=seed)
+
+    return _make
+
+
+def _assert_matches_full_rebuild(aggregates, df):
+    pd.testing.assert_frame_equal(
+        aggregates.daily_stats(), calculate_daily_stats(df.copy()), check_dtype=False, check_index_type=False
+    )
+    pd.testing.assert_frame_equal(
+        aggregates.monthly_stats(), calculate_monthly_stats(df.copy()), check_dtype=False, check_index_type=False
+    )
+
+
+def test_update_matches_full_rebuild(hourly_data):
+    """Testuje, czy dokładanie kolejnych miesięcy daje te same statystyki co pełne przeliczenie."""
+    january = hourly_data("2024-01-01", "2024-02-01", seed=1)
+    february = hourly_data("2024-02-01", "2024-03-01", seed=2)
+
+    aggregates = IncrementalAggregates().update(january).update(february)
+
+    _assert_matches_full_rebuild(aggregates, pd.concat([january, february], ignore_index=True))
+
+
+def test_update_replaces_revised_days(hourly_data):
+    """Testuje, czy poprawione doby zastępują poprzednie wartości zamiast się dublować."""
+    data = hourly_data("2024-01-01", "2024-01-03", seed=3)
+    aggregates = IncrementalAggregates().update(data)
+
+    revised = data.copy()
+    revised.loc[revised["data"] < "2024-01-02", "pm25"] = 100.0
+    aggregates.update(revised[revised["data"] < "2024-01-02"])
+
+    _assert_matches_full_rebuild(aggregates, revised)
+
+
+def test_append_hours_and_threshold_change(hourly_data, tmp_path):
+    """Testuje sumowanie pojedynczych godzin, zmianę progu oraz zapis i odczyt."""
+    data = hourly_data("2024-01-01", "2024-01-03", seed=4)
+    aggregates = IncrementalAggregates().append(data.iloc[::2]).append(data.iloc[1::2])
+
+    _assert_matches_full_rebuild(aggregates, data)
+
+    aggregates.set_threshold(30)
+    loaded = IncrementalAggregates.load(aggregates.save(tmp_path / "agg"))
+
+    expected_days = (calculate_daily_stats(data.copy(), norm_threshold=30)["przekroczenie_normy"]).sum()
+    assert loaded.norm_threshold == 30
+    assert loaded.monthly_exceedance_days()["dni_przekroczen"].sum() == expected_days
+    pd.testing.assert_frame_equal(loaded.daily_stats(), aggregates.daily_stats(), check_dtype=False)
@@ -0,0 +1,127 @@
+import pytest
+import pandas as pd
+import sys
+from pathlib import Path
+
+# Dodaj katalog nadrzędny do ścieżki, aby importować moduły
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from ingestion import *
+
+
+def _sheet(year, stations):
+    return [
+        ["Kod stanowiska"] + [f"{s}-PM2.5-1g" for s in stations],
+        ["Kod stacji"] + stations,
+        [f"{year}-01-01 01:00:00"] + [10] * len(stations),
+        [f"{year}-01-01 02:00:00"] + [20] * len(stations),
+    ]
+
+
+def test_ingest_years_parallel(local_http_server, make_gios_archive):
+    """Testuje równoległe pobieranie lat, kolejność wyników i zwracanie błędów."""
+    local_http_server.files["/1"] = make_gios_archive({"2018_PM25_1g.xlsx": _sheet(2018, ["S1", "S2"])})
+    local_http_server.files["/2"] = make_gios_archive({"2015_PM25_1g.xlsx": _sheet(2015, ["S1"])})
+    config = {
+        2018: {"archive_id": "1", "pm25_filename": "2018_PM25_1g.xlsx"},
+        2015: {"archive_id": "2", "pm25_filename": "2015_PM25_1g.xlsx"},
+        2021: {"archive_id": "3", "pm25_filename": "2021_PM25_1g.xlsx"},
+    }
+    metadata = pd.DataFrame({"Kod stacji": ["S1", "S2"], "Miejscowość": ["Warszawa", "Kraków"]})
+
+    df_all, errors = ingest_years(config, metadata, f"{local_http_server.base_url}/", max_workers=2)
+
+    assert list(errors) == [2021]
+    assert df_all["data"].dt.year.tolist() == [2015, 2015, 2018, 2018, 2018, 2018]
+
+    df_common, _ = ingest_years(config, metadata, f"{local_http_server.base_url}/", max_workers=1, common_only=True)
+    assert set(df_common["kod_stacji"]) == {"S1"}
+
+
+def test_ingest_years_collects_stage_measurements(local_http_server, make_gios_archive):
+    """Testuje zbieranie pomiarów etapów z procesów roboczych."""
+    from instrumentation import instrumentation
+
+    local_http_server.files["/1"] = make_gios_archive({"2018_PM25_1g.xlsx": _sheet(2018, ["S1"])})
+    local_http_server.files["/2"] = make_gios_archive({"2019_PM25_1g.xlsx": _sheet(2019, ["S1"])})
+    config = {
+        2018: {"archive_id": "1", "pm25_filename": "2018_PM25_1g.xlsx"},
+        2019: {"archive_id": "2", "pm25_filename": "2019_PM25_1g.xlsx"},
+    }
+    metadata = pd.DataFrame({"Kod stacji": ["S1"], "Miejscowość": ["Warszawa"]})
+
+    instrumentation.reset().enable()
+    try:
+        ingest_years(config, metadata, f"{local_http_server.base_url}/", max_workers=2)
+        frame = instrumentation.to_frame()
+    finally:
+        instrumentation.disable().reset()
+
+    downloads = frame[frame["stage"] == "download"]
+    assert sorted(downloads["year"]) == [2018, 2019]
+    assert downloads["bytes"].gt(0).all()
+    assert set(frame.loc[frame["stage"] == "clean_data", "rows_out"]) == {2}
+
+
+def test_ingest_years_prefetches_archives_concurrently(local_http_server, make_gios_archive, tmp_path):
+    """Testuje równoczesne pobieranie archiwów przed czyszczeniem (także przy jednym procesie)."""
+    from download_cache import DownloadCache
+
+    config = {}
+    for i, year in enumerate([2015, 2016, 2017]):
+        local_http_server.files[f"/{i}"] = make_gios_archive({f"{year}_PM25_1g.xlsx": _sheet(year, ["S1"])})
+        config[year] = {"archive_id": str(i), "pm25_filename": f"{year}_PM25_1g.xlsx"}
+    config[2021] = {"archive_id": "brak", "pm25_filename": "2021_PM25_1g.xlsx"}
+    metadata = pd.DataFrame({"Kod stacji": ["S1"], "Miejscowość": ["Warszawa"]})
+    local_http_server.delay = 0.2
+    cache = DownloadCache(tmp_path / "cache")
+
+    df_all, errors = ingest_years(config, metadata, f"{local_http_server.base_url}/", max_workers=1, cache=cache)
+
+    assert local_http_server.max_active > 1
+    assert sorted(df_all["data"].dt.year.unique()) == [2015, 2016, 2017]
+    assert list(errors) == [2021] and "HTTPError" in errors[2021]
+    # Procesy czyszczące czytają archiwa z pamięci podręcznej, bez ponownego pobierania
+    assert local_http_server.request_count == 4
+
+
+def test_ingest_pollutants_single_pass(local_http_server, make_gios_archive):
+    """Testuje wczytanie wielu wskaźników z jednego pobrania archiwum każdego roku."""
+    for i, year in enumerate([2018, 2019]):
+        local_http_server.files[f"/{i}"] = make_gios_archive({
+            f"{year}_PM25_1g.xlsx": _sheet(year, ["S1"]),
+            f"{year}_PM10_1g.xlsx": _sheet(year, ["S1", "S2"]),
+        })
+    config = {
+        2018: {"archive_id": "0", "pm25_filename": "2018_PM25_1g.xlsx"},
+        2019: {"archive_id": "1", "pollutants": {"PM25": "2019_PM25_1g.xlsx"}},
+    }
+    metadata = pd.DataFrame({"Kod stacji": ["S1", "S2"], "Miejscowość": ["Warszawa", "Kraków"]})
+
+    frames, errors = ingest_pollutants(config, metadata, ["PM25", "PM10", "NO2"], f"{local_http_server.base_url}/",
+                                       max_workers=2)
+
+    assert local_http_server.request_count == 2
+    assert sorted(frames["PM25"]) == [2018, 2019] and sorted(frames["PM10"]) == [2018, 2019]
+    assert list(frames["PM10"][2019].columns) == ["Miejscowość", "kod_stacji", "data", "pm10"]
+    assert set(frames["PM10"][2018]["kod_stacji"]) == {"S1", "S2"}
+    assert frames["NO2"] == {} and list(errors["NO2"]) == [2018, 2019]
+    assert "Brak pliku 2018_NO2_1g.xlsx w archiwum" in errors["NO2"][2018]
+    assert errors["PM25"] == {} and errors["PM10"] == {}
+
+
+def test_ingest_reports_corrupt_archive(local_http_server, make_gios_archive):
+    """Testuje, czy błąd odczytu uszkodzonego archiwum trafia do komunikatu błędu roku."""
+    local_http_server.files["/0"] = make_gios_archive({"2018_PM25_1g.xlsx": _sheet(2018, ["S1"])})
+    local_http_server.files["/1"] = b"to nie jest archiwum"
+    config = {
+        2018: {"archive_id": "0", "pm25_filename": "2018_PM25_1g.xlsx"},
+        2019: {"archive_id": "1", "pm25_filename": "2019_PM25_1g.xlsx"},
+    }
+    metadata = pd.DataFrame({"Kod stacji": ["S1"], "Miejscowość": ["Warszawa"]})
+
+    frames, errors = ingest_pollutants(config, metadata, ["PM25", "PM10"], f"{local_http_server.base_url}/", max_workers=1)
+
+    assert list(frames["PM25"]) == [2018]
+    assert errors["PM25"][2019] == "BadZipFile: File is not a zip file"
+    assert errors["PM10"][2019] == "BadZipFile: File is not a zip file"
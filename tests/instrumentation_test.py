@@ -0,0 +1,72 @@
+import pytest
+import json
+import pandas as pd
+import sys
+from pathlib import Path
+
+# Dodaj katalog nadrzędny do ścieżki, aby importować moduły
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from instrumentation import *
+from read_and_clean_data import clean_data
+
+
+@pytest.fixture
+def enabled():
+    instrumentation.reset().enable()
+    yield instrumentation
+    instrumentation.disable().reset()
+
+
+def _sheet():
+    return pd.DataFrame({
+        0: ["Kod stanowiska", "Kod stacji", "2020-01-01 01:00:00", "2020-01-02 00:00:00"],
+        1: ["-", "S1", "25,5", 10],
+        2: ["-", "S2", 5, None]
+    })
+
+
+def test_clean_data_stages_recorded(enabled):
+    """Testuje pomiary etapów clean_data: rok, wiersze wejściowe i wyjściowe."""
+    metadata = pd.DataFrame({"Kod stacji": ["S1", "S2"], "Miejscowość": ["Warszawa", "Kraków"]})
+    clean_data(_sheet(), 2020, metadata)
+
+    frame = enabled.to_frame()
+    assert frame["stage"].tolist() == ["filter", "timestamps", "melt", "convert", "city_lookup", "clean_data"]
+    assert frame["year"].eq(2020).all()
+    melt = frame[frame["stage"] == "melt"].iloc[0]
+    assert (melt["rows_in"], melt["rows_out"]) == (2, 4)
+    assert frame["seconds"].ge(0).all()
+    assert frame["peak_rss_bytes"].gt(0).all()
+
+
+def test_summary_and_json(enabled, tmp_path):
+    """Testuje tabelę podsumowującą i eksport do JSON."""
+    for year in [2019, 2020]:
+        with stage("download", year=year) as measured:
+            measured.bytes = 100
+    with stage("save", rows_in=5) as measured:
+        measured.rows_out = 5
+
+    summary = enabled.summary(by_year=False).set_index("stage")
+    assert summary.loc["download", "calls"] == 2
+    assert summary.loc["download", "bytes"] == 200
+    assert len(enabled.summary()) == 3
+
+    enabled.to_json(tmp_path / "stages.json")
+    records = json.loads((tmp_path / "stages.json").read_text(encoding="utf-8"))
+    assert [r["stage"] for r in records] == ["download", "download", "save"]
+
+
+def test_disabled_records_nothing():
+    """Testuje, że przy wyłączonych pomiarach nic nie jest zapisywane, a dekorator nie zmienia wyniku."""
+    instrumentation.disable().reset()
+
+    @instrumented()
+    def double(df, year=None):
+        return df * 2
+
+    with stage("download") as measured:
+        measured.bytes = 10
+    assert double(pd.DataFrame({"a": [1]}), year=2020)["a"].tolist() == [2]
+    assert instrumentation.records == []
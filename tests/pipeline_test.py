@@ -0,0 +1,123 @@
+import pytest
+import pandas as pd
+import sys
+from pathlib import Path
+
+# Dodaj katalog nadrzędny do ścieżki, aby importować moduły
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pipeline import *
+
+
+def _sheet(year, stations):
+    rows = [
+        ["Kod stanowiska"] + [f"{s}-PM2.5-1g" for s in stations],
+        ["Kod stacji"] + stations,
+    ]
+    for hour in range(1, 49):
+        timestamp = pd.Timestamp(f"{year}-01-01") + pd.Timedelta(hours=hour)
+        rows.append([timestamp.strftime("%Y-%m-%d %H:%M:%S")] + [10 + hour % 20] * len(stations))
+    return rows
+
+
+@pytest.fixture
+def gios_server(local_http_server, make_gios_archive):
+    import io
+
+    metadata = io.BytesIO()
+    pd.DataFrame({"Kod stacji": ["S1", "S2"], "Miejscowość": ["Warszawa", "Kraków"]}).to_excel(metadata, index=False)
+    local_http_server.files["/meta"] = metadata.getvalue()
+    local_http_server.files["/1"] = make_gios_archive({"2018_PM25_1g.xlsx": _sheet(2018, ["S1", "S2"])})
+    local_http_server.files["/2"] = make_gios_archive({"2019_PM25_1g.xlsx": _sheet(2019, ["S1"])})
+    return local_http_server
+
+
+def _pipeline(server, tmp_path, **kwargs):
+    config = {
+        2018: {"archive_id": "1", "pm25_filename": "2018_PM25_1g.xlsx"},
+        2019: {"archive_id": "2", "pm25_filename": "2019_PM25_1g.xlsx"},
+    }
+    return Pipeline(config, tmp_path / "build", tmp_path / "pm25_cleaned.csv", tmp_path / "pm25_with_stats.csv",
+                    gios_archive_url=f"{server.base_url}/", metadata_url=f"{server.base_url}/meta",
+                    max_workers=1, **kwargs)
+
+
+def test_pipeline_builds_everything_once(gios_server, tmp_path):
+    """Testuje pierwsze uruchomienie (wszystkie etapy) i drugie (brak pracy)."""
+    first = _pipeline(gios_server, tmp_path)
+    assert first.run(dry_run=True) == first.stage_names()
+    assert first.run() == first.stage_names()
+    assert set(pd.read_csv(tmp_path / "pm25_cleaned.csv")["kod_stacji"]) == {"S1"}
+    assert set(load_data(tmp_path / "pm25_cleaned.csv", use_snapshot=True)["kod_stacji"]) == {"S1"}
+    from completeness import CompletenessIndex
+    assert CompletenessIndex.load(tmp_path / "build" / "completeness.npz").years == [2018, 2019]
+
+    requests = gios_server.request_count
+    second = _pipeline(gios_server, tmp_path)
+    assert second.plan() == []
+    assert second.run() == []
+    assert gios_server.request_count == requests
+
+
+def test_pipeline_rebuilds_only_affected_stages(gios_server, tmp_path):
+    """Testuje, że zmiana progu normy przelicza tylko statystyki dobowe i wynik końcowy."""
+    _pipeline(gios_server, tmp_path).run()
+
+    changed = _pipeline(gios_server, tmp_path, norm_threshold=25)
+    assert changed.run() == ["daily", "merged"]
+
+    covered = _pipeline(gios_server, tmp_path, norm_threshold=25, min_coverage=0.75)
+    assert covered.run() == ["combined", "daily", "monthly", "merged"]
+
+    all_stations = _pipeline(gios_server, tmp_path, norm_threshold=25, common_only=False)
+    assert all_stations.run() == ["combined", "daily", "monthly", "merged"]
+    assert set(pd.read_csv(tmp_path / "pm25_cleaned.csv")["kod_stacji"]) == {"S1", "S2"}
+
+
+def test_pipeline_rebuilds_missing_outputs_and_failed_years(gios_server, tmp_path):
+    """Testuje ponowne budowanie usuniętych artefaktów i lat, które się nie pobrały."""
+    archive = gios_server.files.pop("/2")
+    pipeline = _pipeline(gios_server, tmp_path)
+    executed = pipeline.run()
+    assert "clean_2019" not in executed and "merged" in executed
+    assert list(pipeline.errors) == ["clean_2019"]
+
+    # Rok, który znów się nie pobiera: dry-run pokazuje to samo, co wykona run()
+    again = _pipeline(gios_server, tmp_path)
+    assert again.run(dry_run=True) == [] == again.run()
+    assert list(again.errors) == ["clean_2019"]
+
+    (tmp_path / "pm25_with_stats.csv").unlink()
+    assert _pipeline(gios_server, tmp_path).run(dry_run=True) == ["merged"]
+    assert _pipeline(gios_server, tmp_path).run() == ["merged"]
+
+    # Po przywróceniu archiwum rok jest ponawiany i budowany razem z etapami zależnymi
+    gios_server.files["/2"] = archive
+    assert _pipeline(gios_server, tmp_path).run() == ["clean_2019", "combined", "daily", "monthly", "merged"]
+
+
+def test_stage_modules_follow_imports():
+    """Testuje wyznaczanie modułów etapu z importów (także pośrednich), bez bibliotek zewnętrznych."""
+    clean = stage_modules("clean")
+    assert {"ingestion", "read_and_clean_data", "pollutants", "timestamps", "downloader"} <= set(clean)
+    assert "pandas" not in clean and "zipfile" not in clean
+    assert {"aggregation", "pollutants", "quantiles"} <= set(stage_modules("daily"))
+
+
+def test_main_dry_run(gios_server, tmp_path, capsys):
+    """Testuje uruchomienie z linii poleceń w trybie dry-run."""
+    code = main(["--years", "2018", "--build-dir", str(tmp_path / "build"),
+                 "--metadata-url", f"{gios_server.base_url}/meta", "--dry-run"])
+    assert code == 0
+    assert "clean_2018" in capsys.readouterr().out
+    assert main(["--years", "1999", "--dry-run"]) == 2
+
+
+def test_pipeline_chunked_stats_match(gios_server, tmp_path):
+    """Testuje, że statystyki liczone fragmentami dają taki sam plik wynikowy."""
+    _pipeline(gios_server, tmp_path).run()
+    expected = pd.read_csv(tmp_path / "pm25_with_stats.csv")
+
+    chunked = _pipeline(gios_server, tmp_path, chunk_rows=100)
+    assert chunked.run(force=True) == chunked.stage_names()
+    pd.testing.assert_frame_equal(pd.read_csv(tmp_path / "pm25_with_stats.csv"), expected)
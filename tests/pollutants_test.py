@@ -0,0 +1,42 @@
+import pytest
+import pandas as pd
+import sys
+from pathlib import Path
+
+# Dodaj katalog nadrzędny do ścieżki, aby importować moduły
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pollutants import *
+
+
+def test_value_column_and_member_name():
+    """Testuje nazwy kolumn wskaźników i nazwy plików w archiwum."""
+    assert value_column() == "pm25" and value_column("PM10") == "pm10"
+    with pytest.raises(ValueError):
+        value_column("PM1")
+
+    config = {"archive_id": "1", "pm25_filename": "PM25_2015.xlsx", "pollutants": {"NO2": "NO2_2015.xlsx"}}
+    assert member_name(2015, config) == "PM25_2015.xlsx"
+    assert member_name(2015, config, "NO2") == "NO2_2015.xlsx"
+    assert member_name(2015, config, "PM10") == "2015_PM10_1g.xlsx"
+
+
+def test_save_pollutant_data(tmp_path):
+    """Testuje zapis danych wielu wskaźników obok pliku PM2.5 i ich odczyt."""
+    from data_analysis import load_data
+    from read_and_clean_data import save_pollutant_data
+
+    times = pd.date_range("2024-01-01", periods=3, freq="h")
+    frames = {
+        "PM25": pd.DataFrame({"Miejscowość": "Warszawa", "kod_stacji": "S1", "data": times, "pm25": [1.0, 2.0, 3.0]}),
+        "PM10": pd.DataFrame({"Miejscowość": "Warszawa", "kod_stacji": "S1", "data": times, "pm10": [4.0, 5.0, 6.0]}),
+    }
+
+    paths = save_pollutant_data(frames, tmp_path / "pm25_cleaned.csv")
+    assert paths == {"PM25": tmp_path / "pm25_cleaned.csv", "PM10": tmp_path / "pm10_cleaned.csv"}
+    assert load_data(paths["PM10"])["pm10"].tolist() == [4.0, 5.0, 6.0]
+
+    paths = save_pollutant_data(frames, tmp_path / "pm25_cleaned.parquet")
+    df = load_data(paths["PM10"])
+    assert str(df["pm10"].dtype) == "float32" and df["pm10"].tolist() == [4.0, 5.0, 6.0]
+    assert cleaned_path("NO2", tmp_path / "dane.csv") == tmp_path / "dane_no2.csv"
@@ -0,0 +1,118 @@
+import pytest
+import pandas as pd
+import sys
+from pathlib import Path
+
+# Dodaj katalog nadrzędny do ścieżki, aby importować moduły
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from quantiles import *
+
+
+def _values(rng, n, scale):
+    values = rng.lognormal(2.5, 0.8, n) * scale
+    values[::10] = float("nan")
+    return values
+
+
+@pytest.fixture
+def hourly_data(make_hourly_data):
+    times = pd.date_range("2024-11-01 01:00", "2025-02-28 23:00", freq="h")
+    return make_hourly_data(times, [("S1", "Warszawa", 1.0), ("S2", "Warszawa", 2.0), ("S3", "Katowice", 3.0)], _values)
+
+
+def _metadata():
+    return pd.DataFrame({
+        "Kod stacji": ["S1", "S2", "S3"],
+        "Województwo": ["mazowieckie", "mazowieckie", "śląskie"]
+    })
+
+
+def _exact(df, keys, q):
+    df = df.dropna(subset=["pm25"]).assign(rok=df["data"].dt.year, miesiac=df["data"].dt.month)
+    return df.groupby(keys)["pm25"].quantile(q, interpolation="lower").unstack().reset_index()
+
+
+@pytest.mark.parametrize("level, period, keys", [
+    ("station", "month", ["Miejscowość", "kod_stacji", "rok", "miesiac"]),
+    ("city", "year", ["Miejscowość", "rok"]),
+    ("voivodeship", "all", ["Województwo"]),
+])
+def test_quantiles_within_relative_accuracy(hourly_data, level, period, keys):
+    """Testuje, czy percentyle na różnych poziomach i okresach różnią się od dokładnych najwyżej o błąd względny."""
+    df = hourly_data
+    sketches = QuantileSketches.from_hourly(df, _metadata())
+    result = sketches.quantiles([0.5, 0.9, 0.98], level=level, period=period)
+
+    if level == "voivodeship":
+        df = df.assign(Województwo=df["kod_stacji"].map({"S1": "Mazowieckie", "S2": "Mazowieckie", "S3": "Śląskie"}))
+    expected = _exact(df, keys, [0.5, 0.9, 0.98])
+    assert list(result[keys].itertuples(index=False)) == list(expected[keys].itertuples(index=False))
+    for q, column in [(0.5, "pm25_p50"), (0.9, "pm25_p90"), (0.98, "pm25_p98")]:
+        error = (result[column] / expected[q] - 1).abs()
+        assert error.max() <= DEFAULT_RELATIVE_ACCURACY + 1e-9
+    assert result.attrs["blad_wzgledny"] == DEFAULT_RELATIVE_ACCURACY
+
+
+def test_quantiles_counts_and_filters(hourly_data):
+    """Testuje liczbę pomiarów grup, filtry jednostek i lat oraz błędne parametry."""
+    df = hourly_data
+    sketches = QuantileSketches.from_hourly(df)
+    country = sketches.quantiles(0.5, level="country", period="all")
+    assert country["Kraj"].tolist() == ["Polska"]
+    assert country["liczba_pomiarow"].iloc[0] == df["pm25"].notna().sum()
+
+    result = sketches.quantiles(0.5, level="city", period="year", names=["Katowice"], years=[2025])
+    assert result[["Miejscowość", "rok"]].values.tolist() == [["Katowice", 2025]]
+
+    with pytest.raises(KeyError):
+        sketches.quantiles(0.5, level="voivodeship")
+    with pytest.raises(ValueError):
+        sketches.quantiles(1.5)
+    with pytest.raises(ValueError):
+        sketches.quantiles(0.5, period="week")
+
+
+def test_merge_equals_full_build(hourly_data):
+    """Testuje, czy połączone szkice fragmentów danych są identyczne ze szkicami całych danych."""
+    df = hourly_data
+    full = QuantileSketches.from_hourly(df)
+    parts = [QuantileSketches.from_hourly(df.iloc[start:start + 1000]) for start in range(0, len(df), 1000)]
+    merged = QuantileSketches.merge(parts)
+
+    pd.testing.assert_frame_equal(merged.keys, full.keys, check_dtype=False)
+    assert (merged.group == full.group).all()
+    assert (merged.bucket == full.bucket).all()
+    assert (merged.count == full.count).all()
+
+    with pytest.raises(ValueError):
+        QuantileSketches.merge([full, QuantileSketches.from_hourly(df, relative_accuracy=0.02)])
+
+
+def test_save_and_load(hourly_data, tmp_path):
+    """Testuje zapis i odczyt szkiców (także stacji bez województwa)."""
+    metadata = _metadata().iloc[:2]
+    sketches = QuantileSketches.from_hourly(hourly_data, metadata)
+    path = sketches.save(tmp_path / "szkice.npz")
+    loaded = QuantileSketches.load(path)
+
+    pd.testing.assert_frame_equal(
+        loaded.quantiles([0.5, 0.98], level="station"),
+        sketches.quantiles([0.5, 0.98], level="station"),
+        check_dtype=False
+    )
+    assert loaded.keys["Województwo"].isna().sum() == sketches.keys["Województwo"].isna().sum() > 0
+
+
+def test_chunked_stats_builds_sketches(hourly_data, tmp_path):
+    """Testuje budowę szkiców w tym samym przebiegu co statystyki liczone fragmentami."""
+    from chunked import chunked_stats
+    from read_and_clean_data import save_cleaned_data
+
+    df = hourly_data
+    save_cleaned_data(df, tmp_path / "pm25_cleaned.csv")
+    _, monthly, sketches = chunked_stats(tmp_path / "pm25_cleaned.csv", chunk_rows=500, sketches=True)
+
+    full = QuantileSketches.from_hourly(df)
+    assert (sketches.count == full.count).all() and (sketches.bucket == full.bucket).all()
+    assert sketches.n_groups == len(monthly)
@@ -52,6 +52,29 @@ def test_get_common_stations():
     assert get_common_stations(data) == {"B", "C"}
 
 
+def test_get_common_stations_with_min_coverage():
+    """Testuje wybór wspólnych stacji z wymaganym pokryciem ważnymi dobami w każdym roku"""
+    def year_data(year, days):
+        frames = [
+            pd.DataFrame({
+                "kod_stacji": station,
+                "data": pd.date_range(f"{year}-01-01", periods=n * 24, freq="h"),
+                "pm25": 10.0,
+            })
+            for station, n in days.items()
+        ]
+        return pd.concat(frames, ignore_index=True)
+
+    data = {
+        2015: year_data(2015, {"A": 365, "B": 365, "C": 3}),
+        2018: year_data(2018, {"A": 365, "B": 200, "C": 365}),
+    }
+
+    assert get_common_stations(data) == {"A", "B", "C"}
+    assert get_common_stations(data, min_coverage=0.75) == {"A"}
+    assert get_common_stations(data, min_coverage=0.5) == {"A", "B"}
+
+
 def test_clean_data_basic_flow():
     """Testuje podstawowy przepływ funkcji clean_data"""
     df = pd.DataFrame({
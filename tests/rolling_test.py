@@ -0,0 +1,106 @@
+import pytest
+import numpy as np
+import pandas as pd
+import sys
+from pathlib import Path
+
+# Dodaj katalog nadrzędny do ścieżki, aby importować moduły
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from rolling import *
+from cube import PM25Cube
+
+
+def _values(rng, n, scale):
+    values = rng.gamma(2.0, scale / 2, n)
+    values[rng.random(n) < 0.15] = np.nan
+    values[100:130] = np.nan  # dłuższa luka
+    return values
+
+
+@pytest.fixture
+def hourly_data(make_hourly_data):
+    times = pd.date_range("2024-12-20 01:00", "2025-01-10 23:00", freq="h")
+    stations = [("S1", "Warszawa", 10.0), ("S2", "Warszawa", 20.0), ("S3", "Katowice", 15.0)]
+    return make_hourly_data(times, stations, _values, seed=1)
+
+
+@pytest.mark.parametrize("window, min_coverage", [(24, 0.75), (8, 0.75), (5, 0.0)])
+def test_rolling_means_match_pandas(hourly_data, window, min_coverage):
+    """Testuje zgodność średnich kroczących z pd.Series.rolling dla każdej stacji."""
+    cube = PM25Cube.from_long(hourly_data)
+    means = running_means(cube, window, min_coverage)
+    assert means.shape == cube.values.shape
+
+    min_periods = max(1, int(np.ceil(min_coverage * window)))
+    for i in range(cube.n_stations):
+        expected = pd.Series(cube.values[i].astype("float64")).rolling(window, min_periods=min_periods).mean()
+        np.testing.assert_allclose(means[i], expected.to_numpy(), rtol=1e-9, equal_nan=True)
+
+
+def test_running_annual_means(hourly_data):
+    """Testuje kroczące średnie roczne ze średnich dobowych z regułami pokrycia dób i okna."""
+    cube = PM25Cube.from_long(hourly_data)
+    annual = running_annual_means(cube, days=7, min_coverage=0.5, min_daily_coverage=0.75)
+    assert annual.shape == (cube.n_stations, cube.n_days)
+
+    sums, counts = cube._daily_sums_counts()
+    daily = pd.DataFrame(np.where(counts >= 18, sums / np.maximum(counts, 1), np.nan).T)
+    expected = daily.rolling(7, min_periods=4).mean().to_numpy().T
+    np.testing.assert_allclose(annual, expected, rtol=1e-9, equal_nan=True)
+
+
+def test_daily_max_and_frames(hourly_data):
+    """Testuje dobowe maksima średnich kroczących i zamianę macierzy na format długi."""
+    cube = PM25Cube.from_long(hourly_data)
+    maxima = daily_max_running_means(cube, hours=8)
+    expected = np.nanmax(running_means(cube, 8)[:, 24:48], axis=1)
+    np.testing.assert_allclose(maxima[:, 1], expected)
+
+    frame = to_frame(cube, maxima, "pm25_max_8h")
+    assert list(frame.columns) == ["Miejscowość", "kod_stacji", "data_dzien", "pm25_max_8h"]
+    assert len(frame) == np.count_nonzero(~np.isnan(maxima))
+    assert "data" in to_frame(cube, running_means(cube), "pm25_24h").columns
+    with pytest.raises(ValueError):
+        to_frame(cube, maxima[:, :3], "x")
+
+
+def test_moving_exceedances_match_rollup(hourly_data):
+    """Testuje zgodność kroczących przekroczeń z RollupIndex.exceedance_counts na rolling_daily_stats."""
+    from rollup import RollupIndex
+
+    df = hourly_data
+    cube = PM25Cube.from_long(df)
+    daily = rolling_daily_stats(cube, hours=24, norm_threshold=15)
+    assert "pm25_max_kroczaca_24h" in daily.columns and "pm25_srednia_dobowa" not in daily.columns
+    index = RollupIndex(daily, cube.monthly_stats())
+
+    result = moving_exceedances(cube, [25, 15, 5], hours=24)
+    expected = index.exceedance_counts([25, 15, 5], level="station", column=rolling_column(24))
+    pd.testing.assert_frame_equal(result, expected, check_dtype=False)
+
+    # Przekroczenia z kolumny 'przekroczenie_normy' (jak w days_over_norm) zgadzają się z progiem 15
+    days = index.exceedance_days("station")
+    assert days["dni_powyzej_normy"].tolist() == result[result["prog"] == 15]["dni_powyzej_normy"].tolist()
+    assert (result["dni_powyzej_normy"] > 0).any()
+    # Domyślna kolumna średnich dobowych nie jest po cichu zastępowana kroczącą
+    with pytest.raises(KeyError):
+        index.exceedance_counts([15])
+
+
+def test_windows_follow_true_time_of_cleaned_data():
+    """Testuje chronologię okien dla danych z clean_data (godzina 24:00 zapisana jako 00:00 tej samej doby)."""
+    from timestamps import shift_midnight
+
+    raw = pd.date_range("2024-01-01 01:00", "2024-01-04 00:00", freq="h")
+    values = np.zeros(len(raw))
+    values[raw == pd.Timestamp("2024-01-02 00:00")] = 100.0
+    df = pd.DataFrame({"Miejscowość": "Warszawa", "kod_stacji": "S1",
+                       "data": shift_midnight(raw.to_numpy()), "pm25": values})
+    cube = PM25Cube.from_long(df)
+
+    expected = pd.Series(values, index=raw).rolling(8, min_periods=6).mean()
+    np.testing.assert_allclose(running_means(cube, 8)[0], expected.to_numpy(), equal_nan=True)
+    assert running_means(cube, 8)[0][cube.true_hours.get_loc(pd.Timestamp("2024-01-02 03:00"))] == 12.5
+    np.testing.assert_allclose(daily_max_running_means(cube, 8)[0], [12.5, 12.5, 0.0])
+    pd.testing.assert_frame_equal(cube.to_long(), df, check_dtype=False)
@@ -0,0 +1,102 @@
+import pytest
+import pandas as pd
+import sys
+from pathlib import Path
+
+# Dodaj katalog nadrzędny do ścieżki, aby importować moduły
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from rollup import *
+
+
+def _data():
+    return pd.DataFrame({
+        "Miejscowość": ["Warszawa", "Warszawa", "Warszawa", "Warszawa", "Katowice", "Katowice"],
+        "kod_stacji": ["S1", "S1", "S2", "S1", "S3", "S3"],
+        "data": pd.to_datetime([
+            "2024-01-01 01:00", "2024-01-01 02:00", "2024-01-01 01:00",
+            "2024-01-02 01:00", "2024-01-01 01:00", "2025-02-01 01:00"
+        ]),
+        "pm25": [10.0, 30.0, 40.0, 5.0, 16.0, 8.0]
+    })
+
+
+def _metadata():
+    return pd.DataFrame({
+        "Kod stacji": ["S1", "S2", "S3"],
+        "Województwo": ["MAZOWIECKIE", "mazowieckie", "śląskie"]
+    })
+
+
+def test_monthly_series_per_level():
+    """Testuje średnie miesięczne na poziomie stacji, miejscowości i kraju."""
+    index = RollupIndex.from_hourly(_data())
+
+    station = index.monthly_series("station", names=["Warszawa"])
+    assert station["pm25_srednia"].tolist() == [15.0, 40.0]
+
+    city = index.monthly_series("city", years=[2024])
+    assert city.set_index("Miejscowość")["pm25_srednia"].to_dict() == {"Katowice": 16.0, "Warszawa": 27.5}
+
+    country = index.series("country", "year")
+    assert country["rok"].tolist() == [2024, 2025]
+
+
+def test_exceedance_days_any_station():
+    """Testuje liczbę dni z przekroczeniem normy: dzień liczy się, gdy przekroczy ją choć jedna stacja."""
+    index = RollupIndex.from_hourly(_data(), _metadata())
+
+    stations = index.exceedance_days("station")
+    assert stations.set_index("kod_stacji")["dni_powyzej_normy"].to_dict() == {"S1": 1, "S2": 1, "S3": 0}
+
+    voivodeships = index.exceedance_days("voivodeship", years=[2024])
+    assert voivodeships.set_index("Województwo")["dni_powyzej_normy"].to_dict() == {"Mazowieckie": 1, "Śląskie": 1}
+
+
+
+def test_exceedance_counts_many_thresholds():
+    """Testuje liczbę dni z przekroczeniem wielu progów naraz i zgodność z exceedance_days."""
+    index = RollupIndex.from_hourly(_data(), _metadata())
+
+    cities = index.exceedance_counts([25, 5, 15, 50], "city")
+    counts = cities.set_index(["Miejscowość", "rok", "prog"])["dni_powyzej_normy"]
+    assert counts.loc["Warszawa", 2024].tolist() == [1, 2, 1, 0]
+    assert counts.loc["Katowice", 2024].tolist() == [0, 1, 1, 0]
+    assert counts.loc["Katowice", 2025].tolist() == [0, 1, 0, 0]
+
+    for level in ["station", "city", "voivodeship", "country"]:
+        pd.testing.assert_frame_equal(
+            index.exceedance_days(level, threshold=15), index.exceedance_days(level), check_dtype=False
+        )
+
+def test_queries_are_memoised():
+    """Testuje, czy powtórzone zapytanie jest obsługiwane z pamięci i zwraca niezależną kopię."""
+    index = RollupIndex.from_hourly(_data())
+    first = index.monthly_series("city", names=["Warszawa"], years=[2024])
+    first["pm25_srednia"] = 0
+    second = index.monthly_series("city", names=("Warszawa",), years=2024)
+
+    assert len(index._cache) == 1
+    assert second["pm25_srednia"].tolist() == [27.5]
+
+
+def test_voivodeship_level_requires_metadata():
+    """Testuje błąd przy zapytaniu o województwa bez metadanych oraz uzupełnienie ich przez as_rollup."""
+    index = RollupIndex.from_hourly(_data())
+    with pytest.raises(KeyError):
+        index.exceedance_days("voivodeship")
+
+    assert as_rollup(index, _metadata()).has_voivodeships
+
+
+def test_monthly_matrix_aligned_years():
+    """Testuje macierz miejscowość × rok × miesiąc ze wspólną osią lat."""
+    index = RollupIndex.from_hourly(_data())
+    cities, years, matrix = index.monthly_matrix("city")
+
+    assert list(cities) == ["Katowice", "Warszawa"]
+    assert list(years) == [2024, 2025]
+    assert matrix.shape == (2, 2, 12)
+    assert matrix[0, 1, 1] == 8.0
+    assert matrix[1, 0, 0] == 27.5
+    assert pd.isna(matrix[1, 1]).all()
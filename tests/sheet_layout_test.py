@@ -0,0 +1,46 @@
+import pytest
+import pandas as pd
+import sys
+from pathlib import Path
+
+# Dodaj katalog nadrzędny do ścieżki, aby importować moduły
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sheet_layout import *
+
+
+def test_detect_layout():
+    """Testuje rozpoznanie wierszy nagłówkowych, kodów stacji i początku danych."""
+    df = pd.DataFrame({
+        0: ["Nr", "Kod stacji", "Wskaźnik", "Jednostka", "2020-01-01 01:00:00", "2020-01-01 02:00:00"],
+        1: [1, "S1", "PM2.5", "ug/m3", 10, 20]
+    })
+
+    layout = detect_layout(df, 2020)
+
+    assert layout.header_rows == [0, 2, 3]
+    assert layout.unit_rows == [3]
+    assert layout.station_row == 1
+    assert layout.data_start_row == 4
+    assert layout.data_rows().tolist() == [4, 5]
+    assert SheetLayout.from_dict(layout.to_dict()).to_dict() == layout.to_dict()
+
+
+def test_detect_layout_2014_profile():
+    """Testuje dodatkowy wzorzec wiersza 'PM2.5' w profilu dla 2014 roku."""
+    df = pd.DataFrame({0: ["Kod stacji", "PM2.5", "2014-01-01 01:00:00"], 1: ["S1", "x", 5]})
+
+    assert detect_layout(df, 2014).header_rows == [1]
+    assert detect_layout(df, 2015).header_rows == []
+
+
+def test_register_profile():
+    """Testuje obsługę nowego wariantu formatu przez dodanie profilu."""
+    df = pd.DataFrame({0: ["Kod stacji", "Uwagi", "2030-01-01 01:00:00"], 1: ["S1", "-", 5]})
+    register_profile("test_2030", HEADER_PATTERNS, [r"^Uwagi"], years=[2030])
+
+    try:
+        assert detect_layout(df, 2030).header_rows == [1]
+    finally:
+        YEAR_PROFILES.pop(2030)
+        PROFILES.pop("test_2030")
@@ -0,0 +1,79 @@
+import pytest
+import pandas as pd
+import sys
+from pathlib import Path
+
+# Dodaj katalog nadrzędny do ścieżki, aby importować moduły
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from snapshot import *
+
+
+def _data():
+    times = pd.date_range("2024-12-31 22:00", periods=6, freq="h")
+    return pd.DataFrame({
+        "Miejscowość": ["Warszawa"] * 6 + ["Kraków"] * 6,
+        "kod_stacji": ["S1"] * 6 + ["S2"] * 6,
+        "data": list(times) * 2,
+        "pm25": [1.5, None, 3.25, 4.0, 5.0, 6.0] * 2,
+    })
+
+
+def _mapped(values):
+    """Sprawdza, czy tablica jest widokiem na plik mapowany z dysku."""
+    import mmap
+
+    base = values
+    while base is not None and not isinstance(base, mmap.mmap):
+        base = getattr(base, "base", None)
+    return base is not None
+
+
+def test_save_and_open_snapshot(tmp_path):
+    """Testuje zapis migawki i odczyt kolumn mapowanych z plików bez kopiowania."""
+    path = save_snapshot(_data(), tmp_path / "pm25.snapshot")
+
+    df = open_snapshot(path)
+
+    assert list(df.columns) == ["Miejscowość", "kod_stacji", "data", "pm25"]
+    assert isinstance(df["kod_stacji"].dtype, pd.CategoricalDtype)
+    assert str(df["data"].dtype) == "datetime64[us]" and str(df["pm25"].dtype) == "float32"
+    pd.testing.assert_frame_equal(df.astype({"Miejscowość": str, "kod_stacji": str, "pm25": float}), _data(),
+                                  check_dtype=False)
+    assert _mapped(df["pm25"].to_numpy()) and _mapped(df["data"].to_numpy())
+    assert _mapped(df["kod_stacji"].array.codes)
+
+    # Zapis do kolumny nie zmienia pliku migawki
+    df.loc[0, "pm25"] = 100.0
+    assert open_snapshot(path)["pm25"].iloc[0] == 1.5
+
+
+def test_open_snapshot_filters(tmp_path):
+    """Testuje wybór kolumn i filtry lat, miejscowości i stacji."""
+    path = save_snapshot(_data(), tmp_path / "pm25.snapshot")
+
+    df = open_snapshot(path, columns=["pm25"], stations=["S2"], years=[2025])
+    assert list(df.columns) == ["pm25"] and len(df) == 4
+    assert len(open_snapshot(path, cities=["Warszawa", "Gdańsk"])) == 6
+    with pytest.raises(KeyError):
+        open_snapshot(path, columns=["brak"])
+
+
+def test_load_data_uses_fresh_snapshot(tmp_path):
+    """Testuje zapis migawki obok pliku CSV, odczyt przez load_data i odświeżenie po zmianie pliku."""
+    from data_analysis import load_data
+    from read_and_clean_data import save_cleaned_data
+
+    csv_path = tmp_path / "pm25_cleaned.csv"
+    save_cleaned_data(_data(), csv_path, snapshot=True)
+    assert is_fresh(snapshot_path(csv_path), csv_path)
+
+    df = load_data(csv_path, use_snapshot=True, stations=["S1"])
+    expected = load_data(csv_path, stations=["S1"])
+    pd.testing.assert_frame_equal(df, expected, check_dtype=False, check_categorical=False)
+    assert load_data(snapshot_path(csv_path), columns=["kod_stacji"])["kod_stacji"].nunique() == 2
+
+    save_cleaned_data(_data().iloc[:3], csv_path)
+    assert not is_fresh(snapshot_path(csv_path), csv_path)
+    assert len(load_data(csv_path, use_snapshot=True)) == 3
+    assert is_fresh(snapshot_path(csv_path), csv_path)
@@ -0,0 +1,49 @@
+import pytest
+import numpy as np
+import pandas as pd
+import sys
+from pathlib import Path
+
+# Dodaj katalog nadrzędny do ścieżki, aby importować moduły
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from station_registry import *
+
+
+METADATA = pd.DataFrame({
+    "Kod stacji": ["S1", "S2", "S3"],
+    "Stary Kod stacji \n(o ile inny od aktualnego)": ["OLD1, OLD1B", None, ""],
+    "Miejscowość": ["Warszawa", "Kraków", "Katowice"],
+    "Województwo": ["MAZOWIECKIE", "małopolskie", "ŚLĄSKIE"],
+    "WGS84 φ N": [52.2, 50.0, 50.3],
+    "WGS84 λ E": [21.0, 19.9, 19.0]
+})
+
+
+def test_remap_and_ids():
+    """Testuje zamianę starych kodów na aktualne i identyfikatory całkowite."""
+    registry = StationRegistry(METADATA)
+    codes = pd.Series(["OLD1", " S2 ", "OLD1B", "X9", "S3"])
+
+    assert registry.remap(codes).tolist() == ["S1", "S2", "S1", "X9", "S3"]
+    assert registry.ids(codes).tolist() == [0, 1, 0, -1, 2]
+    assert registry.n_old_codes == 2
+
+
+def test_attributes():
+    """Testuje miejscowości, województwa i współrzędne wyrównane z kodami."""
+    registry = StationRegistry(METADATA)
+
+    assert registry.city(["S2", "OLD1"]).tolist() == ["Kraków", "Warszawa"]
+    assert pd.isna(registry.city(["X9"])[0])
+    assert registry.voivodeship(["S3"]).tolist() == ["Śląskie"]
+    lat, lon = registry.coordinates(["S1"])
+    assert (lat[0], lon[0]) == (52.2, 21.0)
+
+
+def test_as_registry_reuses_instance():
+    """Testuje, czy as_registry nie buduje rejestru ponownie."""
+    registry = StationRegistry(METADATA)
+
+    assert as_registry(registry) is registry
+    assert isinstance(as_registry(METADATA), StationRegistry)
@@ -0,0 +1,81 @@
+import pytest
+import pandas as pd
+import sys
+from pathlib import Path
+
+# Dodaj katalog nadrzędny do ścieżki, aby importować moduły
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from storage import *
+
+
+def _sample_data():
+    return pd.DataFrame({
+        "Miejscowość": ["Warszawa", "Warszawa", "Katowice", "Katowice"],
+        "kod_stacji": ["S1", "S1", "S2", "S2"],
+        "data": pd.to_datetime([
+            "2015-01-01 01:00", "2024-01-01 01:00",
+            "2015-01-01 01:00", "2024-01-01 01:00"
+        ]),
+        "pm25": [10.5, 20.0, 30.0, 40.0]
+    })
+
+
+def test_save_and_load_dataset_roundtrip(tmp_path):
+    """Testuje zapis i odczyt zbioru partycjonowanego po roku i stacji."""
+    path = tmp_path / "pm25.parquet"
+    save_dataset(_sample_data(), path)
+
+    assert (path / "rok=2015" / "kod_stacji=S1").is_dir()
+
+    df = load_dataset(path)
+
+    assert list(df.columns) == ["Miejscowość", "kod_stacji", "data", "pm25"]
+    assert len(df) == 4
+    assert df["pm25"].dtype == "float32"
+    assert isinstance(df["Miejscowość"].dtype, pd.CategoricalDtype)
+    assert isinstance(df["kod_stacji"].dtype, pd.CategoricalDtype)
+    assert pd.api.types.is_datetime64_any_dtype(df["data"])
+
+
+def test_load_dataset_filters(tmp_path):
+    """Testuje filtrowanie po latach, miejscowościach i wybór kolumn."""
+    path = tmp_path / "pm25.parquet"
+    save_dataset(_sample_data(), path)
+
+    df = load_dataset(path, columns=["data", "pm25"], years=[2024], cities=["Warszawa"])
+
+    assert list(df.columns) == ["data", "pm25"]
+    assert len(df) == 1
+    assert df.iloc[0]["pm25"] == 20.0
+
+    df_station = load_dataset(path, stations=["S2"])
+    assert set(df_station["kod_stacji"]) == {"S2"}
+
+
+def test_save_dataset_replaces_only_own_dataset(tmp_path):
+    """Testuje nadpisywanie zbioru i odmowę zapisu do obcego katalogu lub pliku."""
+    path = tmp_path / "pm25.parquet"
+    save_dataset(_sample_data(), path)
+    save_dataset(_sample_data().iloc[:2], path)
+    assert len(load_dataset(path)) == 2
+    assert [p.name for p in tmp_path.iterdir()] == ["pm25.parquet"]
+
+    other = tmp_path / "results.parquet"
+    other.mkdir()
+    (other / "important.txt").write_text("dane")
+    with pytest.raises(FileExistsError):
+        save_dataset(_sample_data(), other)
+    assert (other / "important.txt").read_text() == "dane"
+
+    _sample_data().to_parquet(tmp_path / "old.parquet")
+    with pytest.raises(FileExistsError):
+        save_dataset(_sample_data(), tmp_path / "old.parquet")
+
+
+def test_is_dataset_path():
+    """Testuje rozpoznawanie zbioru po rozszerzeniu .parquet."""
+    assert is_dataset_path("pm25_cleaned.parquet")
+    assert not is_dataset_path("out.txt")
+    assert not is_dataset_path("results")
+    assert not is_dataset_path(".")
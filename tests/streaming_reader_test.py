@@ -0,0 +1,70 @@
+import pytest
+import io
+import pandas as pd
+import sys
+from pathlib import Path
+
+# Dodaj katalog nadrzędny do ścieżki, aby importować moduły
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from streaming_reader import *
+from read_and_clean_data import clean_data
+
+
+ROWS = [
+    ["Nr", 1, 2],
+    ["Kod stacji", "OLD1", "S2"],
+    ["Wskaźnik", "PM2.5", "PM2.5"],
+    ["2020-01-01 01:00:00", 10, "12,5"],
+    ["2020-01-01 02:00:00", None, 20],
+    ["2020-01-02 00:00:00", 30, 40],
+]
+
+METADATA = pd.DataFrame({
+    "Kod stacji": ["S1", "S2"],
+    "Stary Kod stacji \n(o ile inny od aktualnego)": ["OLD1", None],
+    "Miejscowość": ["Warszawa", "Kraków"]
+})
+
+
+def _sorted(df):
+    return df.sort_values(["kod_stacji", "data"]).reset_index(drop=True)
+
+
+def test_iter_long_chunks_matches_clean_data():
+    """Testuje, czy strumieniowe przetwarzanie daje ten sam wynik co clean_data."""
+    chunks = list(iter_long_chunks(iter(ROWS), 2020, METADATA, chunk_rows=2))
+
+    assert len(chunks) == 2
+    streamed = _sorted(pd.concat(chunks, ignore_index=True))
+    expected = _sorted(clean_data(pd.DataFrame(ROWS), 2020, METADATA))
+
+    pd.testing.assert_frame_equal(streamed, expected, check_dtype=False)
+
+
+def test_iter_long_chunks_without_dates():
+    """Testuje błąd dla arkusza bez wierszy z datami."""
+    with pytest.raises(ValueError):
+        list(iter_long_chunks(iter(ROWS[:3]), 2020, METADATA))
+
+
+def test_iter_sheet_rows_reads_xlsx():
+    """Testuje odczyt pliku XLSX wiersz po wierszu."""
+    xlsx = io.BytesIO()
+    pd.DataFrame(ROWS).to_excel(xlsx, header=False, index=False)
+    xlsx.seek(0)
+
+    chunks = list(iter_long_chunks(iter_sheet_rows(xlsx), 2020, METADATA))
+
+    assert sum(len(chunk) for chunk in chunks) == 6
+
+
+def test_stream_gios_archive(local_http_server, make_gios_archive):
+    """Testuje strumieniowe czytanie arkusza z pobranego archiwum."""
+    local_http_server.files["/7"] = make_gios_archive({"2020_PM25_1g.xlsx": ROWS})
+    config = {"archive_id": "7", "pm25_filename": "2020_PM25_1g.xlsx"}
+
+    df = pd.concat(stream_gios_archive(2020, config, f"{local_http_server.base_url}/", df_metadata=METADATA))
+
+    assert set(df["kod_stacji"]) == {"S1", "S2"}
+    assert df["pm25"].sum() == 112.5
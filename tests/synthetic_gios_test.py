@@ -0,0 +1,45 @@
+import pytest
+import io
+import pandas as pd
+import sys
+from pathlib import Path
+
+# Dodaj katalog nadrzędny do ścieżki, aby importować moduły
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from synthetic_gios import *
+from read_and_clean_data import clean_data
+
+
+def test_generated_sheets_clean_to_full_years():
+    """Testuje, czy arkusze z 2014 roku i późniejsze (ze starymi kodami) dają pełne lata po clean_data."""
+    metadata = generate_metadata(6, old_code_fraction=0.5, seed=3)
+    old = metadata["Stary Kod stacji \n(o ile inny od aktualnego)"].dropna()
+    assert len(old) > 0
+
+    for year in [2014, 2016, 2020]:
+        sheet = generate_sheet(year, metadata, missing_rate=0.1, seed=3)
+        if year <= OLD_CODES_UNTIL:
+            assert set(old) <= set(sheet.iloc[:6].to_numpy().ravel())
+
+        df = clean_data(sheet, year, metadata)
+
+        assert len(df) == 6 * len(pd.date_range(f"{year}-01-01", f"{year}-12-31")) * 24
+        assert set(df["kod_stacji"]) == set(metadata["Kod stacji"])
+        assert df["data"].dt.year.eq(year).all()
+        assert df["Miejscowość"].notna().all()
+        assert 0.05 < df["pm25"].isna().mean() < 0.15
+
+
+def test_generate_archive_readable():
+    """Testuje, czy archiwum ZIP zawiera arkusz XLSX czytelny dla pd.read_excel."""
+    import zipfile
+
+    metadata = generate_metadata(2)
+    with zipfile.ZipFile(io.BytesIO(generate_archive(2019, metadata))) as z:
+        assert z.namelist() == [pm25_filename(2019)]
+        with z.open(pm25_filename(2019)) as f:
+            sheet = pd.read_excel(f, header=None)
+
+    assert sheet.iloc[1, 0] == "Kod stacji"
+    assert sheet.shape == (6 + 8760, 3)
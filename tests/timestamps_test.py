@@ -0,0 +1,72 @@
+import pytest
+import pandas as pd
+import sys
+from pathlib import Path
+
+# Dodaj katalog nadrzędny do ścieżki, aby importować moduły
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from timestamps import *
+
+
+def test_decode_timestamps_matches_pandas():
+    """Testuje zgodność szybkiego dekodowania z pd.to_datetime, także dla nietypowych wartości."""
+    import datetime
+
+    values = [
+        "2018-01-01 01:00:00", "2020-02-29 23:00:00", "2018-02-29 01:00:00", "1900-02-29 01:00:00",
+        "2018-01-01", "brak", "Łódź", None, float("nan"),
+        datetime.datetime(2019, 3, 4, 5), pd.Timestamp("2019-03-04 05:06:07"),
+    ]
+    expected = pd.to_datetime(pd.Series(values, dtype=object), errors="coerce", format="mixed")
+
+    result = decode_timestamps(values)
+
+    assert result.dtype == "datetime64[us]"
+    pd.testing.assert_series_equal(pd.Series(result), expected.dt.as_unit("us"), check_names=False)
+
+
+def test_decode_timestamps_reads_arrow_strings(tmp_path):
+    """Testuje dekodowanie kolumny tekstowej wczytanej przez read_csv (ścieżka pyarrow)."""
+    times = pd.date_range("2023-12-31 20:00", periods=10, freq="h")
+    pd.DataFrame({"data": times}).to_csv(tmp_path / "x.csv", index=False)
+    column = pd.read_csv(tmp_path / "x.csv")["data"]
+
+    assert (decode_timestamps(column) == times.to_numpy()).all()
+    assert (decode_timestamps(column.iloc[3:]) == times[3:].to_numpy()).all()
+
+
+def test_shift_midnight():
+    """Testuje przesunięcie pomiarów z godziny 00:00 na poprzednią dobę."""
+    times = decode_timestamps(["2018-01-02 00:00:00", "2018-01-02 01:00:00", None])
+
+    shifted = pd.Series(shift_midnight(times))
+
+    assert shifted[0] == pd.Timestamp("2018-01-01 00:00:00")
+    assert shifted[1] == pd.Timestamp("2018-01-02 01:00:00")
+    assert pd.isna(shifted[2])
+
+
+def test_decode_hours_detects_gaps_and_duplicates():
+    """Testuje przesunięcia godzinowe oraz wykrywanie luk i zduplikowanych godzin."""
+    values = [f"2018-01-01 {hour:02d}:00:00" for hour in [1, 2, 3, 6, 7, 7, 8]] + ["2018-01-02 00:00:00", "zła data"]
+
+    times, hours = decode_hours(values)
+
+    assert hours.origin == pd.Timestamp("2018-01-01 00:00:00")
+    assert hours.offsets.tolist() == [1, 2, 3, 6, 7, 7, 8, 0, -1]
+    assert hours.duplicates.tolist() == [7]
+    assert hours.gaps.tolist() == [[4, 2]]
+    assert hours.n_missing_hours == 2
+    assert hours.gap_ranges()["od"].tolist() == [pd.Timestamp("2018-01-01 04:00:00")]
+    assert (pd.Series(hours.to_datetime()).iloc[:8] == pd.Series(times).iloc[:8]).all()
+
+
+def test_decode_hours_full_year_has_no_gaps():
+    """Testuje, że pełny rok w układzie GIOŚ (01:00 ... 00:00 następnego roku) nie ma luk ani duplikatów."""
+    values = pd.date_range("2019-01-01 01:00", "2020-01-01 00:00", freq="h").strftime(GIOS_FORMAT)
+
+    times, hours = decode_hours(values)
+
+    assert len(hours.gaps) == 0 and len(hours.duplicates) == 0
+    assert pd.Series(times).dt.year.unique().tolist() == [2019]
@@ -7,47 +7,76 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from visualizations import *
+from rollup import RollupIndex
 
 
-def test_plot_monthly_trends(monkeypatch):
-    """Testuje, czy funkcja plot_monthly_trends działa."""
+def _index():
+    hours = pd.to_datetime(["2015-01-01 01:00", "2015-01-01 02:00", "2024-02-01 01:00", "2024-03-05 01:00"])
     df = pd.DataFrame({
-        "Miejscowość": ["Warszawa", "Katowice", "Gdańsk"],
-        "rok": [2015, 2024, 2024],
-        "miesiąc": [1, 2, 3],
-        "pm25_srednia_miesieczna": [10, 20, 15],
-        "data": pd.to_datetime(["2015-01-01", "2024-02-01", "2024-03-01"])
+        "Miejscowość": ["Warszawa", "Warszawa", "Katowice", "Gdańsk"],
+        "kod_stacji": ["S1", "S1", "S2", "S3"],
+        "data": hours,
+        "pm25": [10.0, 30.0, 20.0, 5.0]
+    })
+    metadata = pd.DataFrame({
+        "Kod stacji": ["S1", "S2", "S3"],
+        "Województwo": ["MAZOWIECKIE", "śląskie", "pomorskie"]
     })
+    return RollupIndex.from_hourly(df, metadata)
 
+
+def test_plot_monthly_trends(monkeypatch):
+    """Testuje, czy funkcja plot_monthly_trends działa."""
     monkeypatch.setattr("matplotlib.pyplot.show", lambda: None) # Zapobiega wyświetlaniu wykresu podczas testu
 
-    plot_monthly_trends(df)  # test przejdzie jeśli nie rzuci wyjątku
+    plot_monthly_trends(_index())  # test przejdzie jeśli nie rzuci wyjątku
 
 
 def test_heatmaps_runs(monkeypatch):
     """Testuje, czy funkcja heatmaps działa."""
-    df = pd.DataFrame({
-        "Miejscowość": ["Warszawa", "Katowice"],
-        "kod_stacji": ["S1", "S2"],
-        "rok": [2015, 2024],
-        "miesiąc": [1, 2],
-        "pm25_srednia_miesieczna": [12, 18],
-        "data": pd.to_datetime(["2015-01-01", "2024-02-01"])
-    })
-
     monkeypatch.setattr("matplotlib.pyplot.show", lambda: None) # Zapobiega wyświetlaniu wykresu podczas testu
-    heatmaps(df)
+    heatmaps(_index())
 
 
 def test_days_over_norm_runs(monkeypatch):
     """Testuje, czy funkcja days_over_norm działa."""
+    monkeypatch.setattr("matplotlib.pyplot.show", lambda: None) # Zapobiega wyświetlaniu wykresu podczas testu
+    days_over_norm(_index())
+
+
+def test_days_over_norm_by_voivodeship_runs(monkeypatch):
+    """Testuje, czy funkcja days_over_norm_by_voivodeship działa na indeksie z województwami."""
+    monkeypatch.setattr("matplotlib.pyplot.show", lambda: None) # Zapobiega wyświetlaniu wykresu podczas testu
+    days_over_norm_by_voivodeship(_index())
+
+
+def test_plots_accept_enriched_view(monkeypatch):
+    """Testuje, czy wykresy działają na leniwym widoku ze statystykami."""
+    from data_analysis import calculate_daily_stats, calculate_monthly_stats, enrich_stats
+
     df = pd.DataFrame({
-        "Miejscowość": ["Warszawa", "Katowice", "Warszawa"],
-        "kod_stacji": ["S1", "S2", "S3"],
-        "rok": [2024, 2024, 2024],
-        "przekroczenie_normy": [True, True, False],
-        "data": pd.to_datetime(["2024-01-01", "2024-01-02", "2024-01-03"])
+        "Miejscowość": ["Warszawa", "Katowice"],
+        "kod_stacji": ["S1", "S2"],
+        "data": pd.to_datetime(["2015-01-01 01:00", "2024-02-01 01:00"]),
+        "pm25": [12.0, 18.0]
     })
+    view = enrich_stats(df, calculate_daily_stats(df.copy()), calculate_monthly_stats(df.copy()))
 
     monkeypatch.setattr("matplotlib.pyplot.show", lambda: None) # Zapobiega wyświetlaniu wykresu podczas testu
-    days_over_norm(df)
+    plot_monthly_trends(view)
+    heatmaps(view)
+    days_over_norm(view)
+
+
+def test_heatmaps_explicit_years_and_pages():
+    """Testuje heatmapy z jawną osią lat (brakujące lata miejscowości) i stronicowaniem."""
+    import matplotlib.pyplot as plt
+
+    index = _index()
+    assert heatmap_pages(index, per_page=2) == 2
+
+    fig = heatmaps(index, show=False, page=1, per_page=2)
+    visible = [ax for ax in fig.axes if ax.get_visible() and ax.get_title()]
+    assert [ax.get_title() for ax in visible] == ["Warszawa"]
+    assert visible[0].get_images()[0].get_array().shape == (2, 12)
+    plt.close(fig)
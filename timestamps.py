@@ -0,0 +1,250 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+
+# Układ znaczników czasu w plikach GIOŚ i w zapisanych plikach CSV
+GIOS_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# Jednostka wyniku taka jak w pd.to_datetime dla tekstów
+UNIT = 'datetime64[us]'
+
+SECOND_US = 10**6
+DAY_US = 24 * 3600 * SECOND_US
+
+# Pozycje separatorów i cyfr w tekście 'YYYY-MM-DD HH:MM:SS'
+_WIDTH = 19
+_SEPARATORS = {4: '-', 7: '-', 10: ' ', 13: ':', 16: ':'}
+_DIGITS = [i for i in range(_WIDTH) if i not in _SEPARATORS]
+_FIELDS = {'year': (0, 4), 'month': (5, 7), 'day': (8, 10), 'hour': (11, 13), 'minute': (14, 16), 'second': (17, 19)}
+
+
+def _field(chars, start, stop):
+    """Liczba zapisana cyframi chars[:, start:stop]."""
+    value = chars[:, start].astype(np.int32)
+    for i in range(start + 1, stop):
+        value = value * 10 + chars[:, i]
+    return value
+
+
+# Długości miesięcy w roku nieprzestępnym (indeks 0 nieużywany)
+_MONTH_LENGTHS = np.array([0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])
+
+
+def _days_from_civil(year, month, day):
+    """Numer dnia od 1970-01-01 dla daty kalendarza gregoriańskiego (arytmetyka całkowita)."""
+    year = year - (month <= 2)
+    era = year // 400
+    year_of_era = year - era * 400
+    day_of_year = (153 * (month + np.where(month > 2, -3, 9)) + 2) // 5 + day - 1
+    day_of_era = year_of_era * 365 + year_of_era // 4 - year_of_era // 100 + day_of_year
+    return era * 146097 + day_of_era - 719468
+
+
+def _arrow_chars(values):
+    """
+    Macierz bajtów prosto z bufora kolumny tekstowej pyarrow (bez kopiowania), jeśli
+    wszystkie wartości są niepuste i mają dokładnie 19 znaków; w przeciwnym razie None.
+    """
+    if not isinstance(getattr(values, 'array', None), pd.arrays.ArrowStringArray):
+        return None
+    arrow = pa.array(values.array)
+    if isinstance(arrow, pa.ChunkedArray):
+        arrow = arrow.combine_chunks()
+    if arrow.null_count or len(arrow) == 0:
+        return None
+
+    _, offsets, data = arrow.buffers()
+    offset_type = np.int64 if pa.types.is_large_string(arrow.type) else np.int32
+    offsets = np.frombuffer(offsets, dtype=offset_type)[arrow.offset:arrow.offset + len(arrow) + 1]
+    if not np.all(np.diff(offsets) == _WIDTH):
+        return None
+    return np.frombuffer(data, dtype=np.uint8)[offsets[0]:offsets[-1]].reshape(len(arrow), _WIDTH)
+
+
+def _char_matrix(values):
+    """
+    Macierz kodów znaków tekstowego zapisu wartości (jeden wiersz na wartość, 19 kolumn).
+
+    Zwraca krotkę (macierz, maska wartości o długości dokładnie 19 znaków).
+    """
+    chars = _arrow_chars(values)
+    if chars is not None:
+        return chars, np.ones(len(chars), dtype=bool)
+
+    values = np.asarray(values, dtype=object)
+    n = len(values)
+    try:
+        # Bajty ASCII są 4 razy mniejsze niż znaki Unicode
+        chars = np.asarray(values, dtype=f'S{_WIDTH + 1}').view(np.uint8).reshape(n, _WIDTH + 1)
+    except UnicodeEncodeError:
+        chars = np.asarray(values, dtype=f'U{_WIDTH + 1}').view(np.uint32).reshape(n, _WIDTH + 1)
+    # Jeden znak zapasu pozwala odrzucić teksty dłuższe niż 19 znaków
+    return chars[:, :_WIDTH], chars[:, _WIDTH] == 0
+
+
+def _decode_fixed(values):
+    """
+    Dekoduje teksty w układzie 'YYYY-MM-DD HH:MM:SS' bez parsowania tekstu po stronie Pythona.
+
+    Teksty są zamieniane na macierz kodów znaków (jeden wiersz na znacznik), z której
+    pola daty i czasu liczone są arytmetycznie. Obiekty datetime mają ten sam zapis
+    tekstowy, więc też przechodzą tą ścieżką, a kolumny tekstowe pyarrow (np. z read_csv)
+    są czytane bezpośrednio z bufora.
+
+    Zwraca krotkę (mikrosekundy od epoki jako int64, maska poprawnie zdekodowanych wartości).
+    """
+    chars, valid = _char_matrix(values)
+    for position, separator in _SEPARATORS.items():
+        valid &= chars[:, position] == ord(separator)
+    digits = chars[:, _DIGITS].astype(np.int16) - ord('0')
+    valid &= ((digits >= 0) & (digits <= 9)).all(axis=1)
+
+    digits = np.where(valid[:, None], digits, 0)
+    fields = {}
+    position = 0
+    for name, (start, stop) in _FIELDS.items():
+        fields[name] = _field(digits, position, position + stop - start)
+        position += stop - start
+
+    year, month, day = fields['year'], fields['month'], fields['day']
+    valid &= (month >= 1) & (month <= 12) & (day >= 1)
+    leap = (year % 4 == 0) & ((year % 100 != 0) | (year % 400 == 0))
+    valid &= day <= _MONTH_LENGTHS[np.where(valid, month, 0)] + (leap & (month == 2))
+    valid &= (fields['hour'] < 24) & (fields['minute'] < 60) & (fields['second'] < 60)
+
+    seconds = fields['hour'] * 3600 + fields['minute'] * 60 + fields['second']
+    us = _days_from_civil(year, month, day).astype(np.int64) * DAY_US + seconds.astype(np.int64) * SECOND_US
+    return np.where(valid, us, np.iinfo(np.int64).min), valid
+
+
+def decode_timestamps(values):
+    """
+    Zamienia znaczniki czasu (teksty 'YYYY-MM-DD HH:MM:SS', obiekty datetime) na datetime64.
+
+    Wartości w układzie GIOŚ dekodowane są szybką ścieżką (_decode_fixed), a tylko
+    pozostałe (inny zapis, braki) przez pd.to_datetime; niepoprawne wartości dają NaT,
+    tak jak pd.to_datetime(..., errors='coerce').
+
+    Zwraca tablicę numpy datetime64[us] (kolumny już typu datetime zwracane są bez zmian).
+    """
+    if isinstance(values, (pd.Series, pd.Index)):
+        if pd.api.types.is_datetime64_any_dtype(values.dtype):
+            return values.to_numpy()
+    else:
+        values = np.asarray(values, dtype=object)
+    if len(values) == 0:
+        return np.array([], dtype=UNIT)
+
+    us, valid = _decode_fixed(values)
+    result = us.view(UNIT)
+    if not valid.all():
+        others = np.flatnonzero(~valid)
+        parsed = pd.to_datetime(pd.Series(np.asarray(values, dtype=object)[others]), errors='coerce', format='mixed')
+        result[others] = parsed.to_numpy().astype(UNIT)
+    return result
+
+
+def shift_midnight(times):
+    """
+    Przesuwa pomiary z godziny 00:00 na poprzednią dobę (arytmetycznie, bez maskowanego przypisania).
+
+    W plikach GIOŚ godzina 00:00 zamyka poprzednią dobę; wynik jest taki sam jak
+    odjęcie pd.Timedelta(days=1) od wierszy z godziną 0. NaT pozostaje NaT.
+    """
+    times = np.asarray(times)
+    hour_of_day = times.astype('datetime64[h]').view(np.int64) % 24
+    return np.where(hour_of_day == 0, times - np.timedelta64(1, 'D'), times)
+
+
+class HourIndex:
+    """
+    Kontrola ciągłości godzin: przesunięcia w godzinach od początku zbioru.
+
+    Powstaje w jednym przebiegu z dekodowaniem znaczników czasu (decode_hours), który
+    od razu wykrywa zduplikowane godziny i luki w ciągu godzin. Przesunięcia służą
+    tylko do tej kontroli (clean_data wypisuje ostrzeżenie); oczyszczone dane
+    zachowują czas w kolumnie 'data' jako datetime64.
+
+    Atrybuty:
+    origin - pierwsza godzina w danych (pd.Timestamp lub NaT dla samych braków)
+    offsets - przesunięcia w godzinach od origin (int64, -1 dla braków i czasów spoza pełnych godzin)
+    duplicates - godziny (przesunięcia), które występują więcej niż raz
+    gaps - tablica [n, 2]: pierwsza brakująca godzina luki i liczba brakujących godzin
+    """
+
+    def __init__(self, origin, offsets, duplicates, gaps):
+        self.origin = origin
+        self.offsets = offsets
+        self.duplicates = duplicates
+        self.gaps = gaps
+
+    @classmethod
+    def from_times(cls, times, origin=None):
+        """Buduje indeks z tablicy datetime64 (origin domyślnie pierwsza pełna godzina w danych)."""
+        times = np.asarray(times)
+        hours = times.astype('datetime64[h]')
+        valid = ~np.isnat(times) & (hours == times)
+        hours = hours.view(np.int64)
+        if origin is None:
+            origin_hour = hours[valid].min() if valid.any() else None
+        else:
+            origin_hour = np.datetime64(pd.Timestamp(origin), 'h').view(np.int64)
+        if origin_hour is None:
+            empty = np.array([], dtype=np.int64)
+            return cls(pd.NaT, np.full(len(times), -1, dtype=np.int64), empty, empty.reshape(0, 2))
+
+        offsets = np.where(valid, hours - origin_hour, -1)
+        valid &= offsets >= 0
+        offsets[~valid] = -1
+
+        present = offsets[valid]
+        if len(present) > 1 and not np.all(present[1:] >= present[:-1]):
+            present = np.sort(present)
+        steps = np.diff(present)
+        duplicates = np.unique(present[1:][steps == 0])
+        gap = steps > 1
+        gaps = np.column_stack([present[:-1][gap] + 1, steps[gap] - 1])
+        return cls(pd.Timestamp(np.datetime64(int(origin_hour), 'h')), offsets, duplicates, gaps)
+
+    @property
+    def n_missing_hours(self):
+        return int(self.gaps[:, 1].sum())
+
+    def to_datetime(self):
+        """Przesunięcia z powrotem jako datetime64[us] (NaT dla braków)."""
+        if self.origin is pd.NaT:
+            return np.full(len(self.offsets), np.datetime64('NaT'), dtype=UNIT)
+        times = np.datetime64(self.origin, 'h') + self.offsets.astype('timedelta64[h]')
+        return np.where(self.offsets >= 0, times, np.datetime64('NaT')).astype(UNIT)
+
+    def gap_ranges(self):
+        """Luki jako DataFrame z kolumnami 'od', 'do' (pierwsza i ostatnia brakująca godzina) i 'godzin'."""
+        start = self.origin + pd.to_timedelta(self.gaps[:, 0], unit='h') if len(self.gaps) else pd.DatetimeIndex([])
+        return pd.DataFrame({
+            'od': start,
+            'do': start + pd.to_timedelta(self.gaps[:, 1] - 1, unit='h'),
+            'godzin': self.gaps[:, 1],
+        })
+
+    def __repr__(self):
+        return (f"HourIndex(origin={self.origin}, n={len(self.offsets)}, "
+                f"duplicates={len(self.duplicates)}, missing_hours={self.n_missing_hours})")
+
+
+def decode_hours(values, midnight_shift=True, origin=None):
+    """
+    Dekoduje znaczniki czasu GIOŚ do HourIndex: dekodowanie, korekta godziny 00:00
+    oraz wykrywanie duplikatów i luk w jednym przebiegu.
+
+    Parametry:
+    values - znaczniki czasu (teksty lub obiekty datetime)
+    midnight_shift - czy przesunąć pomiary z godziny 00:00 na poprzednią dobę
+    origin - opcjonalny początek osi czasu (domyślnie pierwsza godzina w danych)
+
+    Zwraca krotkę (tablica datetime64, HourIndex).
+    """
+    times = decode_timestamps(values)
+    if midnight_shift:
+        times = shift_midnight(times)
+    return times, HourIndex.from_times(times, origin)
@@ -2,145 +2,142 @@ import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib import colormaps
+from matplotlib.colors import Normalize
 import seaborn as sns
-from data_analysis import get_voivodeship_mapping
+from rollup import as_rollup
 
 
-def plot_monthly_trends(df):
-    """Rysuje wykres średnich miesięcznych wartości PM2.5 dla wybranych miast i lat."""
-    df['data'] = pd.to_datetime(df['data'], errors='coerce')
-    
-    # Wyodrębnij rok i miesiąc
-    df['rok'] = df['data'].dt.year
-    df['miesiąc'] = df['data'].dt.month
-
-    # Wyciągnij dane tylko dla wybranych miast i lat
-    filtered_data = df[
-        (df['Miejscowość'].isin(['Warszawa', 'Katowice'])) &
-        (df['rok'].isin([2015, 2024]))
-    ]
-    
-    # Oblicz średnie miesięczne wartości PM2.5
-    cities_avg = filtered_data.groupby(['Miejscowość', 'rok', 'miesiąc'])['pm25_srednia_miesieczna'].mean().reset_index()
+# Domyślna liczba miejscowości na stronie przy stronicowaniu heatmap
+HEATMAPS_PER_PAGE = 30
+
+
+def plot_monthly_trends(index, cities=('Warszawa', 'Katowice'), years=(2015, 2024), show=True):
+    """
+    Rysuje wykres średnich miesięcznych wartości PM2.5 dla wybranych miast i lat.
+
+    index - RollupIndex (albo dane godzinowe lub EnrichedView, z których indeks zostanie zbudowany)
+    show - jeśli False, wykres nie jest wyświetlany (np. przy zapisie do pliku); figura jest zwracana
+    """
+    rollup = as_rollup(index)
+
+    # Średnie miesięczne dla wybranych miast i lat prosto z indeksu
+    cities_avg = rollup.monthly_series('city', cities, years)
     
     # Przygotowanie wykresu
-    plt.figure(figsize=(12,6))
+    fig = plt.figure(figsize=(12,6))
 
-    for city in ['Warszawa', 'Katowice']:
-        for year in [2015, 2024]:
+    for city in cities:
+        for year in years:
             # Filtruj dane dla danej kombinacji
             data = cities_avg[
                 (cities_avg['Miejscowość'] == city) & 
                 (cities_avg['rok'] == year)
-            ].sort_values('miesiąc')
+            ].sort_values('miesiac')
 
             if not data.empty:
                 # Rysuj linie
-                plt.plot(data['miesiąc'], data['pm25_srednia_miesieczna'], label=f'{city} {year}', linewidth=3)
+                plt.plot(data['miesiac'], data['pm25_srednia'], label=f'{city} {year}', linewidth=3)
 
     plt.xlabel('Miesiąc', weight='bold')
     plt.ylabel('Średnie stężenie PM2.5 (μg/m^3)', weight='bold')
-    plt.title('Średnie miesięczne stężenie PM2.5: Warszawa, Katowice', weight='bold', fontsize=16)
+    plt.title(f"Średnie miesięczne stężenie PM2.5: {', '.join(cities)}", weight='bold', fontsize=16)
     plt.legend()
     plt.tight_layout()
-    plt.show()
+    if show:
+        plt.show()
+    return fig
 
 
 
-def heatmaps(df):
-    """Rysuje heatmapy średnich miesięcznych wartości PM2.5 dla wszystkich miejscowości."""
-    df['data'] = pd.to_datetime(df['data'], errors='coerce')
-    
-    # Wyodrębnij rok i miesiąc
-    df['rok'] = df['data'].dt.year
-    df['miesiąc'] = df['data'].dt.month
-
-    # Uzyj wcześniej obliczonych średnich miesięcznych (weź pierwszą wartość, ponieważ wszystkie w tej samej grupie mają tę samą wartość)
-    monthly_avg = df.groupby([
-        'Miejscowość', 
-        'kod_stacji', 
-        'rok',
-        'miesiąc'
-    ])['pm25_srednia_miesieczna'].first().reset_index()
-    
-    miasta = []
-    macierze = []
+def heatmap_pages(index, per_page=HEATMAPS_PER_PAGE, years=None):
+    """Liczba stron heatmap (po per_page miejscowości na stronie)."""
+    cities, _, _ = as_rollup(index).monthly_matrix('city', years=years)
+    return max(1, -(-len(cities) // per_page))
+
 
-    for i, [miejscowosc, dfi] in enumerate(monthly_avg.groupby("Miejscowość")):
-        miasta.append(miejscowosc)
-        dane_z_lat = []
+def heatmaps(index, show=True, years=None, page=0, per_page=None, n_cols=3):
+    """
+    Rysuje heatmapy średnich miesięcznych wartości PM2.5 dla wszystkich miejscowości.
 
-        for j, [rok, dfj] in enumerate(dfi.groupby("rok")):
-            df_mean = dfj.groupby("miesiąc")["pm25_srednia_miesieczna"].mean()
-            # Upewnij się, że mamy wartości dla wszystkich miesięcy
-            df_mean = df_mean.reindex(range(1, 13))
-            dane_z_lat.append(df_mean.to_numpy())
+    Macierz miejscowość × rok × miesiąc pochodzi z jednego wektorowego rozmieszczenia
+    wartości (RollupIndex.monthly_matrix), więc wiersze wszystkich miejscowości odpowiadają
+    tym samym latom, a brakujące lata są zaznaczone kolorem braków. Każda heatmapa jest
+    rysowana jako obraz (imshow) ze wspólną skalą kolorów i jedną legendą dla całej figury.
 
-        macierze.append(np.vstack(dane_z_lat))
+    show - jeśli False, wykres nie jest wyświetlany (np. przy zapisie do pliku); figura jest zwracana
+    years - lata na osi (domyślnie wszystkie lata w indeksie)
+    page, per_page - numer strony i liczba miejscowości na stronie (domyślnie wszystkie na jednej)
+    n_cols - liczba kolumn siatki
+    """
+    rollup = as_rollup(index)
 
-    years = [2015, 2018, 2021, 2024]
+    # Średnie miesięczne miejscowości (średnie ze średnich miesięcznych stacji)
+    miasta, years, macierze = rollup.monthly_matrix('city', years=years)
+    if per_page is not None:
+        miasta = miasta[page * per_page:(page + 1) * per_page]
+        macierze = macierze[page * per_page:(page + 1) * per_page]
 
     # Ustawienia wykresu
-    n_cities = len(macierze)
-    n_cols = 3  # Liczba kolumn
-    n_rows = (n_cities + n_cols - 1) // n_cols  # Oblicz liczbę potrzebnych wierszy 
+    n_cities = len(miasta)
+    n_cols = min(n_cols, max(n_cities, 1))
+    n_rows = max(1, (n_cities + n_cols - 1) // n_cols)  # Oblicz liczbę potrzebnych wierszy
     
-    fig, axes = plt.subplots(n_rows, n_cols, figsize=(12, 3*n_rows))
-    cmap = colormaps["viridis"].copy()
-    cmap.set_bad(color="red")
-
-    # Spłaszczanie osi dla pojedynczej miejscowości
-    if n_cities == 1:
-        axes = [axes]
-    else:
-        axes = axes.flatten()
-
-    for idx, (miasto, arr) in enumerate(zip(miasta, macierze)):
-        ax = axes[idx]
-        sns.heatmap(arr, 
-                    ax=ax, 
-                    xticklabels=range(1,13), 
-                    yticklabels=years,
-                    annot=False,
-                    cmap=cmap,
-                    vmin=0,             
-                    vmax=65,           
-                    mask=np.isnan(arr),
-                    cbar_kws={'shrink': 0.8})
+    # Wspólne osie: etykiety osi tylko na brzegach siatki, a nie przy każdej miejscowości
+    fig, axes = plt.subplots(n_rows, n_cols, figsize=(12, 0.8 + (0.3 * len(years) + 0.9) * n_rows),
+                             sharex=True, sharey=True, squeeze=False)
+    axes = axes.flatten()
+    cmap = colormaps["viridis"].with_extremes(bad="red")
+    norm = Normalize(vmin=0, vmax=65)
+
+    image = None
+    for ax, miasto, arr in zip(axes, miasta, macierze):
+        image = ax.imshow(np.ma.masked_invalid(arr), cmap=cmap, norm=norm, aspect='auto', interpolation='nearest')
         ax.set_title(miasto, fontsize=10, weight='bold')
-        ax.set_xlabel('Miesiąc', fontsize=9)
-        ax.set_ylabel('Rok', fontsize=9)
+    axes[0].set_xticks(range(12), range(1, 13), fontsize=7)
+    axes[0].set_yticks(range(len(years)), years, fontsize=7)
+    fig.supxlabel('Miesiąc', fontsize=9)
+    fig.supylabel('Rok', fontsize=9)
     
     # Schowaj puste osie
-    for idx in range(n_cities, len(axes)):
-        axes[idx].set_visible(False)
+    for ax in axes[n_cities:]:
+        ax.set_visible(False)
 
-    plt.tight_layout()
-    plt.show()
+    # Wspólna skala kolorów dla wszystkich miejscowości, w stałym miejscu (bez kosztownego układania)
+    fig.subplots_adjust(left=0.08, right=0.88, hspace=0.5, wspace=0.15)
+    if image is not None:
+        fig.colorbar(image, cax=fig.add_axes([0.91, 0.2, 0.015, 0.6]), label='PM2.5 (μg/m^3)')
+
+    if show:
+        plt.show()
+    return fig
+
+
+def days_over_norm(index, year=2024, show=True, verbose=True):
+    """
+    Rysuje wykres słupkowy liczby dni z przekroczeniem normy PM2.5 dla najlepszych i najgorszych stacji.
 
+    year - rok, z którego wybierane są 3 najgorsze i 3 najlepsze stacje
+    show - jeśli False, wykres nie jest wyświetlany (np. przy zapisie do pliku); figura jest zwracana
+    verbose - czy wypisać tabele wybranych stacji
+    """
+    rollup = as_rollup(index)
 
-def days_over_norm(df):
-    """Rysuje wykres słupkowy liczby dni z przekroczeniem normy PM2.5 dla najlepszych i najgorszych stacji."""
-    # Zlicz dni powyżej normy dla każdej stacji i roku
-    dni_powyzej_normy = (
-        df[df['przekroczenie_normy'] == True]
-        .groupby(['kod_stacji', 'Miejscowość', 'rok'])
-        .size()
-        .reset_index(name='dni_powyzej_normy')
-    )
+    # Liczba dni powyżej normy dla każdej stacji i roku
+    dni_powyzej_normy = rollup.exceedance_days('station')
 
     dni_powyzej_normy['rok'] = dni_powyzej_normy['rok'].astype(int)
     
-    # Znajdź top 3 i bottom 3 stacje z 2024 roku
-    dni_2024 = dni_powyzej_normy[dni_powyzej_normy['rok'] == 2024]
+    # Znajdź top 3 i bottom 3 stacje z wybranego roku
+    dni_w_roku = dni_powyzej_normy[dni_powyzej_normy['rok'] == year]
     
-    top3 = dni_2024.nlargest(3, 'dni_powyzej_normy')
-    bottom3 = dni_2024.nsmallest(3, 'dni_powyzej_normy')
+    top3 = dni_w_roku.nlargest(3, 'dni_powyzej_normy')
+    bottom3 = dni_w_roku.nsmallest(3, 'dni_powyzej_normy')
     
-    print("Top 3 stacje z największą liczbą dni powyżej normy (2024):")
-    print(top3)
-    print("\nBottom 3 stacje z najmniejszą liczbą dni powyżej normy (2024):")
-    print(bottom3)
+    if verbose:
+        print(f"Top 3 stacje z największą liczbą dni powyżej normy ({year}):")
+        print(top3)
+        print(f"\nBottom 3 stacje z najmniejszą liczbą dni powyżej normy ({year}):")
+        print(bottom3)
     
     # Przygotuj dane do wykresu
     selected_stations = pd.concat([top3, bottom3])
@@ -151,39 +148,34 @@ def days_over_norm(df):
     label_order = df_plot.drop_duplicates('kod_stacji').set_index('kod_stacji').loc[station_order]['label']
     
     # Rysuj wykres
-    plt.figure(figsize=(14, 6))
+    fig = plt.figure(figsize=(14, 6))
     sns.barplot(data=df_plot, x='label', y='dni_powyzej_normy', hue='rok', order=label_order)
     plt.xlabel('Stacja (Miejscowość)', weight='bold', fontsize=11)
     plt.ylabel('Dni powyżej normy (>15 μg/m^3)', weight='bold', fontsize=11)
     plt.title('Liczba dni z przekroczeniem normy (15 μg/m^3)', weight='bold', fontsize=14)
     plt.legend()
     plt.tight_layout()
-    plt.show()
+    if show:
+        plt.show()
+    return fig
     
-def days_over_norm_by_voivodeship(df, df_metadata):
-    """Rysuje wykres słupkowy liczby dni z przekroczeniem normy PM2.5 dla województw."""
-
-    # Przypisz województwa do kodów stacji
-    voivodenship_mapping = get_voivodeship_mapping(df_metadata)
-    df = df.copy()
-    df['Województwo'] = df['kod_stacji'].map(voivodenship_mapping)
-
-    # Czy w danym województwie danego dnia było przekroczenie
-    woj_dzien = (
-        df.groupby(['Województwo', 'rok', 'data_dzien'])['przekroczenie_normy']
-        .any()  # co najmniej jedna stacja
-        .reset_index()
-    )
-
-    # Zlicz dni z przekroczeniem
-    woj_agg = (
-        woj_dzien[woj_dzien['przekroczenie_normy']]
-        .groupby(['Województwo', 'rok'])
-        .size()
-        .reset_index(name='dni_powyzej_normy')
-    )
+def days_over_norm_by_voivodeship(index, df_metadata=None, show=True):
+    """
+    Rysuje wykres słupkowy liczby dni z przekroczeniem normy PM2.5 dla województw.
+
+    index - RollupIndex (albo dane godzinowe lub EnrichedView)
+    df_metadata - DataFrame metadanych albo StationRegistry; potrzebne, jeśli indeks
+                  zbudowano bez województw
+    show - jeśli False, wykres nie jest wyświetlany (np. przy zapisie do pliku); figura jest zwracana
+    """
+    rollup = as_rollup(index, df_metadata)
+    if not rollup.has_voivodeships:
+        raise KeyError("Brak kolumny 'Kod stacji' lub 'Województwo' w metadanych")
+
+    # Dzień z przekroczeniem w województwie: co najmniej jedna stacja powyżej normy
+    woj_agg = rollup.exceedance_days('voivodeship')
     # Rysuj wykres
-    plt.figure(figsize=(14, 6))
+    fig = plt.figure(figsize=(14, 6))
     sns.barplot(data=woj_agg, x='Województwo', y='dni_powyzej_normy', hue='rok')
     plt.xlabel('Województwo', weight='bold', fontsize=11)
     plt.xticks(rotation=45, ha='right')
@@ -191,4 +183,6 @@ def days_over_norm_by_voivodeship(df, df_metadata):
     plt.title('Liczba dni z przekroczeniem normy (15 μg/m^3) według województw', weight='bold', fontsize=14)
     plt.legend()
     plt.tight_layout()
-    plt.show()
\ No newline at end of file
+    if show:
+        plt.show()
+    return fig
\ No newline at end of file